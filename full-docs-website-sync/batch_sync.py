@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Batch re-scrape of every site in full-docs-website/MANIFEST.yaml
+Stale sites run concurrently; each site's scrapers (httrack, crawl4ai, playwright) run in parallel
+
+Limits:
+  --max-jobs      scraper processes running at once across all sites
+  --per-domain    scraper processes hitting the same registrable domain at once (politeness)
+  --browser-jobs  browser-based scrapers (crawl4ai, playwright) at once (default: one per core)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from browser_profile import site_domain
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent / "tools"))
+from manifest_store import ManifestStore, parse_timestamp  # noqa: E402
+
+DEFAULT_KNOWLEDGE_ROOT = SCRIPT_DIR.parent.parent / ".knowledge"
+# Same venv sync.sh uses for crawl4ai and playwright
+DEFAULT_VENV_PYTHON = Path.home() / "GITHUB" / ".web-context-builder" / "venv" / "bin" / "python3"
+
+STALENESS_DAYS = 30
+ALL_SCRAPERS = ("httrack", "crawl4ai", "playwright")
+BROWSER_SCRAPERS = frozenset({"crawl4ai", "playwright"})
+DEFAULT_MAX_JOBS = 6
+DEFAULT_PER_DOMAIN = 3
+
+
+def site_age_days(site: dict, now: datetime):
+    """Days since the site was last scraped (None if never)"""
+    last_synced = parse_timestamp(site.get("last_synced"))
+    if last_synced is None:
+        return None
+    return (now - last_synced).days
+
+
+def is_stale(site: dict, now: datetime, staleness_days: int = STALENESS_DAYS) -> bool:
+    """Same rule as sync.sh: never scraped, or scraped more than staleness_days ago"""
+    age = site_age_days(site, now)
+    return age is None or age > staleness_days
+
+
+def scraper_command(scraper: str, url: str, site_dir: Path, args) -> list:
+    """argv for one scraper job (mirrors the scrape_* functions in sync.sh)"""
+    if scraper == "httrack":
+        return ["httrack", url, "-O", str(site_dir / "httrack"), "-v", "-s0", "-%P", "-N0"]
+
+    extra = []
+    if args.incremental:
+        extra.append("--incremental")
+    if args.daemon:
+        extra.append("--daemon")
+
+    if scraper == "crawl4ai":
+        return [str(args.python), str(SCRIPT_DIR / "crawl4ai_scraper.py"), url, str(site_dir)] + extra
+    return [str(args.python), str(SCRIPT_DIR / "playwright_scraper.py"), url, str(site_dir),
+            "--concurrency", str(args.concurrency)] + extra
+
+
+class BatchScheduler:
+    """Runs scraper jobs under the global, per-domain and browser limits"""
+
+    def __init__(self, max_jobs: int, per_domain: int, browser_jobs: int):
+        self.global_slots = asyncio.Semaphore(max_jobs)
+        self.browser_slots = asyncio.Semaphore(browser_jobs)
+        self.per_domain = per_domain
+        self.domain_slots = {}
+
+    def domain_slot(self, domain: str) -> asyncio.Semaphore:
+        if domain not in self.domain_slots:
+            self.domain_slots[domain] = asyncio.Semaphore(self.per_domain)
+        return self.domain_slots[domain]
+
+    async def run_job(self, site_name: str, domain: str, scraper: str, argv: list, log_file: Path) -> dict:
+        """
+        Run one scraper process once every limit it needs has a free slot
+
+        Most specific limits are taken first, so global slots are only held
+        by jobs that can actually start.
+
+        Returns:
+            Job record: scraper, status, exit_code, wall_s, queued_s, log
+        """
+        queued_at = time.monotonic()
+        async with self.domain_slot(domain):
+            if scraper in BROWSER_SCRAPERS:
+                await self.browser_slots.acquire()
+            try:
+                async with self.global_slots:
+                    started_at = time.monotonic()
+                    print(f"==> [{site_name}] {scraper} started", flush=True)
+                    exit_code = await run_logged(argv, log_file)
+                    wall_s = time.monotonic() - started_at
+            finally:
+                if scraper in BROWSER_SCRAPERS:
+                    self.browser_slots.release()
+
+        status = "ok" if exit_code == 0 else "failed"
+        print(f"    [{site_name}] {scraper} {status} in {wall_s:.1f}s", flush=True)
+        return {
+            "scraper": scraper,
+            "status": status,
+            "exit_code": exit_code,
+            "wall_s": round(wall_s, 2),
+            "queued_s": round(started_at - queued_at, 2),
+            "log": str(log_file),
+        }
+
+
+async def run_logged(argv: list, log_file: Path) -> int:
+    """Run a process with stdout+stderr going to log_file; returns its exit code (127 if not found)"""
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, 'wb') as log:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv, stdin=asyncio.subprocess.DEVNULL, stdout=log, stderr=asyncio.subprocess.STDOUT
+            )
+        except FileNotFoundError as e:
+            log.write(f"ERROR: {e}\n".encode('utf-8'))
+            return 127
+        return await process.wait()
+
+
+async def sync_site(site: dict, full_docs_dir: Path, scheduler: BatchScheduler, args) -> dict:
+    """Run the selected scrapers for one site in parallel, then cross-validate"""
+    name = site["name"]
+    url = site["url"]
+    site_dir = full_docs_dir / name
+    site_dir.mkdir(parents=True, exist_ok=True)
+    log_dir = site_dir / "batch-logs"
+    domain = site_domain(url)
+
+    start = time.monotonic()
+    jobs = await asyncio.gather(*[
+        scheduler.run_job(name, domain, scraper, scraper_command(scraper, url, site_dir, args),
+                          log_dir / f"{scraper}.log")
+        for scraper in args.scrapers
+    ])
+
+    validation = None
+    succeeded = [job["scraper"] for job in jobs if job["status"] == "ok"]
+    if len(succeeded) > 1:
+        exit_code = await run_logged(
+            [sys.executable, str(SCRIPT_DIR / "validate_scrapers.py"), str(site_dir)],
+            log_dir / "validate.log"
+        )
+        validation = "ok" if exit_code == 0 else "issues"
+
+    return {
+        "name": name,
+        "url": url,
+        "status": "ok" if len(succeeded) == len(jobs) else "failed",
+        "wall_s": round(time.monotonic() - start, 2),
+        "scrapers": jobs,
+        "validation": validation,
+        "finished_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+async def run_batch(sites: list, full_docs_dir: Path, args) -> list:
+    """Sync all sites concurrently; the scheduler's limits do the throttling"""
+    scheduler = BatchScheduler(args.max_jobs, args.per_domain, args.browser_jobs)
+    return await asyncio.gather(*[sync_site(site, full_docs_dir, scheduler, args) for site in sites])
+
+
+def update_manifest_entries(manifest_file: Path, results: list, scrapers_used: str):
+    """Stamp last_synced for every site whose scrapers all succeeded (same rule as sync.sh)"""
+    synced = {
+        result["name"]: {"last_synced": result["finished_at"], "scraper": scrapers_used}
+        for result in results if result["status"] == "ok"
+    }
+    if synced:
+        with ManifestStore(manifest_file) as store:
+            store.upsert_many("websites", synced)
+
+
+def print_summary(summary: dict):
+    """Human-readable run summary"""
+    print()
+    print("=" * 70)
+    print(f"BATCH SYNC SUMMARY ({summary['sites_synced']} synced, {summary['sites_skipped']} fresh, "
+          f"{summary['wall_s']:.1f}s wall)")
+    print("=" * 70)
+    for site in summary["sites"]:
+        icon = "✅" if site["status"] == "ok" else "❌"
+        print(f"{icon} {site['name']:<40} {site['wall_s']:>8.1f}s")
+        for job in site["scrapers"]:
+            print(f"     {job['scraper']:<12} {job['status']:<8} {job['wall_s']:>8.1f}s"
+                  f"  (queued {job['queued_s']:.1f}s)")
+        if site["validation"]:
+            print(f"     {'validation':<12} {site['validation']}")
+    print("=" * 70)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="batch_sync.py",
+        description="Re-scrape all stale sites in full-docs-website/MANIFEST.yaml concurrently"
+    )
+    parser.add_argument("sites", nargs="*", metavar="SITE",
+                        help="Only these manifest names (default: every site)")
+    parser.add_argument("--scraper", choices=["httrack", "crawl4ai", "playwright", "both"], default="both",
+                        help="Scraper(s) to run per site; 'both' runs all three, like sync.sh (default: both)")
+    parser.add_argument("--force", action="store_true", help="Re-scrape fresh sites too")
+    parser.add_argument("--staleness-days", type=int, default=STALENESS_DAYS,
+                        help=f"Age after which a site is stale (default: {STALENESS_DAYS})")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help=f"Scraper processes at once across all sites (default: {DEFAULT_MAX_JOBS})")
+    parser.add_argument("--per-domain", type=int, default=DEFAULT_PER_DOMAIN,
+                        help=f"Scraper processes at once per domain (default: {DEFAULT_PER_DOMAIN})")
+    parser.add_argument("--browser-jobs", type=int, default=os.cpu_count() or 1,
+                        help="Browser-based scrapers at once (default: number of cores)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Passed to playwright_scraper.py --concurrency (default: 1)")
+    parser.add_argument("--incremental", action="store_true", help="Passed to the Python scrapers")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Passed to the Python scrapers (use a running scraper_daemon.py)")
+    parser.add_argument("--python", type=Path, default=DEFAULT_VENV_PYTHON,
+                        help=f"Python with crawl4ai/playwright installed (default: {DEFAULT_VENV_PYTHON})")
+    parser.add_argument("--knowledge-root", type=Path, default=DEFAULT_KNOWLEDGE_ROOT,
+                        help=f".knowledge directory (default: {DEFAULT_KNOWLEDGE_ROOT})")
+    parser.add_argument("--dry-run", action="store_true", help="List the sites that would be scraped")
+    args = parser.parse_args()
+
+    for flag in ("max_jobs", "per_domain", "browser_jobs", "concurrency"):
+        if getattr(args, flag) < 1:
+            parser.error(f"--{flag.replace('_', '-')} must be at least 1")
+
+    args.scrapers = list(ALL_SCRAPERS) if args.scraper == "both" else [args.scraper]
+    full_docs_dir = args.knowledge_root / "full-docs-website"
+    manifest_file = full_docs_dir / "MANIFEST.yaml"
+    full_docs_dir.mkdir(parents=True, exist_ok=True)
+    with ManifestStore(manifest_file) as store:
+        websites = [site for site in store.entries("websites") if site.get("url")]
+
+    if args.sites:
+        unknown = set(args.sites) - {site["name"] for site in websites}
+        if unknown:
+            print(f"ERROR: Not in {manifest_file}: {', '.join(sorted(unknown))}", file=sys.stderr)
+            sys.exit(1)
+        websites = [site for site in websites if site["name"] in args.sites]
+
+    now = datetime.now(timezone.utc)
+    stale = [site for site in websites if args.force or is_stale(site, now, args.staleness_days)]
+
+    print(f"==> {len(websites)} site(s) in manifest, {len(stale)} to scrape")
+    for site in websites:
+        age = site_age_days(site, now)
+        state = "scrape" if site in stale else "fresh"
+        print(f"    {site['name']:<40} {'never' if age is None else f'{age}d ago':>10}  {state}")
+
+    if args.dry_run or not stale:
+        sys.exit(0)
+
+    if set(args.scrapers) & BROWSER_SCRAPERS and not args.python.exists():
+        print(f"ERROR: web-context-builder venv not found at {args.python}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.monotonic()
+    results = asyncio.run(run_batch(stale, full_docs_dir, args))
+
+    update_manifest_entries(manifest_file, results, ",".join(args.scrapers))
+
+    summary = {
+        "started_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "wall_s": round(time.monotonic() - start, 2),
+        "limits": {
+            "max_jobs": args.max_jobs,
+            "per_domain": args.per_domain,
+            "browser_jobs": args.browser_jobs,
+        },
+        "sites_synced": len(results),
+        "sites_skipped": len(websites) - len(stale),
+        "sites_failed": sum(1 for r in results if r["status"] != "ok"),
+        "sites": results,
+    }
+    summary_file = full_docs_dir / "batch-summary.json"
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print_summary(summary)
+    print(f"📄 Summary saved: {summary_file}")
+    sys.exit(0 if summary["sites_failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
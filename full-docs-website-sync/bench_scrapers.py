@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the docs scrapers
+Serves a synthetic hash-routed SPA docs site from a local server, runs each scraper against it
+and reports pages/sec, per-section latency, peak memory and coverage against the known page set
+
+Results are written as JSON so runs can be compared over time (--compare previous.json)
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from crawl_scope import parse_hash_url, sanitize_filename
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+ALL_SCRAPERS = ("playwright", "crawl4ai")
+STYLES = ("query", "simple")  # #s=section&ss=subsection, #section
+DEFAULT_PAGES = 100
+DEFAULT_RENDER_DELAY_MS = 50
+DEFAULT_NAV_DEPTH = 2
+DEFAULT_WORDS = 250
+DEFAULT_TIMEOUT_S = 1800
+TOKEN_RE = re.compile(rb'benchpage(\d{6})')
+MISSING_SAMPLE = 20
+
+WORDS = (
+    "render route component state config build deploy cache token request response module "
+    "plugin option server client stream query schema index layout session export import "
+    "handler middleware runtime bundle compile template context provider hook effect"
+).split()
+
+SHELL_HTML = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>Bench docs</title></head>
+<body>
+<nav id="sitenav">__SITE_NAV__</nav>
+<nav id="subnav"></nav>
+<main id="content"></main>
+<script>
+const ROUTES = __ROUTES__;
+const API = "/docs/api/";
+let current = 0;
+
+function link(l) {
+    return '<a href="#' + l.hash + '">' + l.title + '</a>';
+}
+
+// Every navigation fetches the page from the API; the server holds the response for the render delay
+async function route() {
+    const id = ROUTES[decodeURIComponent(location.hash.slice(1))];
+    const request = ++current;
+    const response = await fetch(API + (id === undefined ? "landing" : id) + ".json");
+    const page = await response.json();
+    if (request !== current) return;  // a newer navigation won
+    document.title = page.title;
+    document.getElementById("content").innerHTML = page.html;
+    document.getElementById("subnav").innerHTML = page.children.map(link).join(" ");
+}
+
+window.addEventListener("hashchange", route);
+route();
+</script>
+</body>
+</html>
+"""
+
+
+class FixtureSite:
+    """
+    Synthetic docs site: a tree of pages reached through hash routes
+
+    The landing page's nav links the top-level sections; every page links
+    its children, so reaching the deepest pages takes nav_depth hops. Each
+    page carries a unique token (benchpage000042) so any scraper output can
+    be matched back to the page it came from.
+    """
+
+    def __init__(self, pages: int, nav_depth: int, style: str, words: int, render_delay_ms: int,
+                 jitter: float = 0.5, seed: int = 1):
+        self.style = style
+        self.render_delay_ms = render_delay_ms
+        rng = random.Random(seed)
+        branching = max(2, math.ceil(pages ** (1 / nav_depth)))
+
+        # Breadth-first, `branching` children per page: branching ** nav_depth >= pages
+        self.pages = []
+        level = [self._add_page(None, rng, words, jitter) for _ in range(min(branching, pages))]
+        while len(self.pages) < pages:
+            next_level = []
+            for parent in level:
+                for _ in range(min(branching, pages - len(self.pages))):
+                    next_level.append(self._add_page(parent, rng, words, jitter))
+            level = next_level
+        self.depth = max(page["depth"] for page in self.pages)
+        self.routes = {page["hash"]: page["id"] for page in self.pages}
+
+    def _add_page(self, parent, rng, words, jitter):
+        page_id = len(self.pages)
+        top = parent["top"] if parent else page_id
+        if parent is None:
+            name, title = f"sec{page_id}", f"Section {page_id}"
+            hash_ = f"s={name}" if self.style == "query" else name
+        else:
+            name, title = f"p{page_id}", f"Page {page_id}"
+            hash_ = f"s=sec{top}&ss={name}" if self.style == "query" else name
+        section, subsection = parse_hash_url(f"http://fixture/docs#{hash_}")
+        page = {
+            "id": page_id,
+            "top": top,
+            "depth": parent["depth"] + 1 if parent else 1,
+            "hash": hash_,
+            "title": title,
+            "children": [],
+            "file": f"{sanitize_filename(section)}/{sanitize_filename(subsection)}.md",
+            "delay_s": self.render_delay_ms * (1 + jitter * (2 * rng.random() - 1)) / 1000,
+            "html": self._page_html(page_id, title, rng, words),
+        }
+        if parent:
+            parent["children"].append({"hash": hash_, "title": title})
+        self.pages.append(page)
+        return page
+
+    @staticmethod
+    def _page_html(page_id, title, rng, words):
+        def sentence(n):
+            return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+        paragraphs = [f"<p>benchpage{page_id:06d} {sentence(20)}</p>"]
+        remaining = max(words - 20, 0)
+        while remaining > 0:
+            n = min(remaining, 40)
+            paragraphs.append(f"<h2>{sentence(3)}</h2><p>{sentence(n)}</p>"
+                              f"<ul><li>{sentence(5)}</li><li><code>{rng.choice(WORDS)}()</code></li></ul>")
+            remaining -= n
+        paragraphs.append(f'<pre><code class="language-python">{rng.choice(WORDS)} = {page_id}</code></pre>')
+        return f"<h1>{title}</h1>" + "".join(paragraphs)
+
+    def shell(self) -> bytes:
+        nav = " ".join(f'<a href="#{p["hash"]}">{p["title"]}</a>' for p in self.pages if p["depth"] == 1)
+        return SHELL_HTML.replace("__SITE_NAV__", nav).replace("__ROUTES__", json.dumps(self.routes)).encode()
+
+    def landing(self) -> dict:
+        return {"title": "Bench docs", "children": [],
+                "html": "<h1>Bench docs</h1><p>Synthetic documentation site for scraper benchmarks.</p>"}
+
+    def api(self, page_id: int) -> dict:
+        page = self.pages[page_id]
+        return {"title": page["title"], "html": page["html"], "children": page["children"]}
+
+
+class FixtureServer:
+    """Serves a FixtureSite on 127.0.0.1 and records when each page was first requested"""
+
+    def __init__(self, site: FixtureSite):
+        self.site = site
+        self.requested = {}
+        self.api_requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/docs"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.requested.clear()
+            self.api_requests = 0
+
+    def _handler(self):
+        server = self
+        site = self.site
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?")[0].split("#")[0]
+                if path in ("/docs", "/docs/"):
+                    return self._send(site.shell(), "text/html; charset=utf-8")
+                m = re.fullmatch(r"/docs/api/(landing|\d+)\.json", path)
+                if not m or (m.group(1) != "landing" and int(m.group(1)) >= len(site.pages)):
+                    return self.send_error(404)
+
+                if m.group(1) == "landing":
+                    time.sleep(site.render_delay_ms / 1000)
+                    payload = site.landing()
+                else:
+                    page_id = int(m.group(1))
+                    with server.lock:
+                        server.api_requests += 1
+                        server.requested.setdefault(page_id, time.time())
+                    time.sleep(site.pages[page_id]["delay_s"])
+                    payload = site.api(page_id)
+                self._send(json.dumps(payload).encode(), "application/json")
+
+        return Handler
+
+
+def scraper_command(scraper: str, url: str, output_dir: Path, args) -> list:
+    """argv for one benchmarked scraper run"""
+    if scraper == "playwright":
+        return [str(args.python), str(SCRIPT_DIR / "playwright_scraper.py"), url, str(output_dir),
+                "--concurrency", str(args.concurrency)] + shlex.split(args.playwright_args)
+    return [str(args.python), str(SCRIPT_DIR / "crawl4ai_scraper.py"), url, str(output_dir)] \
+        + shlex.split(args.crawl4ai_args)
+
+
+def run_measured(argv: list, log_file: Path, timeout_s: float):
+    """
+    Run a scraper process to completion
+
+    Returns:
+        (exit_code, wall_s, peak_rss_mb): peak RSS is the largest resident set
+        of the process or any child it waited for (the browser included)
+    """
+    with open(log_file, 'wb') as log:
+        start = time.monotonic()
+        process = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        killer = threading.Timer(timeout_s, process.kill)
+        killer.start()
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            killer.cancel()
+        wall_s = time.monotonic() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return process.returncode, wall_s, peak_rss_mb
+
+
+def percentile(sorted_values: list, p: float):
+    """Nearest-rank percentile of an already sorted list (None if empty)"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+def scan_output(scraper_dir: Path) -> dict:
+    """Page id -> (file, mtime) for every page token found in the scraper's markdown files"""
+    found = {}
+    for path in sorted(scraper_dir.rglob("*.md")) if scraper_dir.is_dir() else []:
+        mtime = path.stat().st_mtime
+        for m in TOKEN_RE.finditer(path.read_bytes()):
+            found.setdefault(int(m.group(1)), (path, mtime))
+    return found
+
+
+def evaluate_run(site: FixtureSite, server: FixtureServer, scraper: str, output_dir: Path,
+                 exit_code: int, wall_s: float, peak_rss_mb: float, log_file: Path) -> dict:
+    """Compare one scraper's output with the fixture's ground truth"""
+    scraper_dir = output_dir / scraper
+    found = scan_output(scraper_dir)
+    expected = {page["id"] for page in site.pages}
+    covered = expected & found.keys()
+
+    # Request-to-saved time for every page that was both requested and saved
+    latencies = sorted(
+        (found[page_id][1] - server.requested[page_id]) * 1000
+        for page_id in covered if page_id in server.requested
+    )
+
+    # Playwright's tree has a known file per page: count files holding another page's content
+    misrouted = []
+    if scraper == "playwright":
+        for page in site.pages:
+            path = scraper_dir / page["file"]
+            if path.is_file() and f"benchpage{page['id']:06d}".encode() not in path.read_bytes():
+                misrouted.append(page["file"])
+
+    missing = sorted(expected - covered)
+    return {
+        "scraper": scraper,
+        "style": site.style,
+        "exit_code": exit_code,
+        "wall_s": round(wall_s, 3),
+        "pages_found": len(covered),
+        "pages_per_s": round(len(covered) / wall_s, 3) if wall_s else None,
+        "latency_ms": {
+            "count": len(latencies),
+            "p50": None if not latencies else round(percentile(latencies, 50), 1),
+            "p95": None if not latencies else round(percentile(latencies, 95), 1),
+            "max": None if not latencies else round(latencies[-1], 1),
+        },
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "coverage": {
+            "expected": len(expected),
+            "found": len(covered),
+            "ratio": round(len(covered) / len(expected), 4) if expected else 0,
+            "misrouted": len(misrouted),
+            "missing_sample": [site.pages[i]["hash"] for i in missing[:MISSING_SAMPLE]],
+        },
+        "api_requests": server.api_requests,
+        "log": str(log_file),
+    }
+
+
+def git_commit() -> str:
+    """Commit of the scrapers being benchmarked (None outside a git checkout)"""
+    try:
+        return subprocess.run(["git", "-C", str(SCRIPT_DIR), "rev-parse", "HEAD"],
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, previous: dict = None):
+    """Human-readable results, with deltas against a previous report"""
+    before = {(r["scraper"], r["style"]): r for r in (previous or {}).get("runs", [])}
+    print()
+    print("=" * 78)
+    config = report["config"]
+    print(f"SCRAPER BENCHMARK ({config['pages']} pages, depth {config['nav_depth']}, "
+          f"{config['render_delay_ms']}ms render delay)")
+    print("=" * 78)
+    print(f"{'scraper':<12} {'style':<7} {'pages/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>8} {'coverage':>9}")
+    for run in report["runs"]:
+        latency = run["latency_ms"]
+        line = (f"{run['scraper']:<12} {run['style']:<7} {run['pages_per_s'] or 0:>8.2f} "
+                f"{latency['p50'] if latency['p50'] is not None else '-':>8} "
+                f"{latency['p95'] if latency['p95'] is not None else '-':>8} "
+                f"{run['peak_rss_mb']:>8.1f} {run['coverage']['ratio']:>9.1%}")
+        old = before.get((run["scraper"], run["style"]))
+        if old and old.get("pages_per_s") and run["pages_per_s"]:
+            line += f"  ({run['pages_per_s'] / old['pages_per_s'] - 1:+.0%} pages/s)"
+        if run["exit_code"] != 0:
+            line += f"  ❌ exit {run['exit_code']}"
+        print(line)
+    print("=" * 78)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="bench_scrapers.py",
+        description="Benchmark the docs scrapers against a local synthetic hash-routed SPA"
+    )
+    parser.add_argument("--scraper", action="append", choices=ALL_SCRAPERS, dest="scrapers",
+                        help="Scraper to run (repeatable; default: all)")
+    parser.add_argument("--style", choices=STYLES + ("both",), default="both",
+                        help="Hash route style: query (#s=..&ss=..), simple (#section) or both (default: both)")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help=f"Pages per site (default: {DEFAULT_PAGES})")
+    parser.add_argument("--nav-depth", type=int, default=DEFAULT_NAV_DEPTH,
+                        help=f"Link hops from the landing nav to the deepest pages (default: {DEFAULT_NAV_DEPTH})")
+    parser.add_argument("--render-delay-ms", type=int, default=DEFAULT_RENDER_DELAY_MS,
+                        help=f"Server delay before each page renders (default: {DEFAULT_RENDER_DELAY_MS})")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="Render delay varies by ± this fraction per page (default: 0.5)")
+    parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help=f"Words per page (default: {DEFAULT_WORDS})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Passed to playwright_scraper.py --concurrency (default: 1)")
+    parser.add_argument("--playwright-args", default="", metavar="ARGS",
+                        help="Extra playwright_scraper.py arguments, e.g. \"--settle-ms 100\"")
+    parser.add_argument("--crawl4ai-args", default="", metavar="ARGS",
+                        help="Extra crawl4ai_scraper.py arguments")
+    parser.add_argument("--python", type=Path, default=Path(sys.executable),
+                        help="Python with the scrapers' dependencies (default: this interpreter)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, metavar="SECONDS",
+                        help=f"Kill a scraper run after this long (default: {DEFAULT_TIMEOUT_S})")
+    parser.add_argument("--work-dir", type=Path, help="Keep scraper output here (default: a temp dir, removed)")
+    parser.add_argument("--output", type=Path, help="Report file (default: bench-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, metavar="REPORT", help="Previous report to show deltas against")
+    args = parser.parse_args()
+
+    if args.pages < 1 or args.nav_depth < 1 or args.concurrency < 1:
+        parser.error("--pages, --nav-depth and --concurrency must be at least 1")
+
+    scrapers = args.scrapers or list(ALL_SCRAPERS)
+    styles = list(STYLES) if args.style == "both" else [args.style]
+    started_at = datetime.now(timezone.utc)
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="bench-scrapers-"))
+    output_file = args.output or Path(f"bench-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+
+    runs = []
+    depths = {}
+    try:
+        for style in styles:
+            site = FixtureSite(args.pages, args.nav_depth, style, args.words, args.render_delay_ms,
+                               args.jitter, args.seed)
+            depths[style] = site.depth
+            with FixtureServer(site) as server:
+                for scraper in scrapers:
+                    output_dir = work_dir / f"{scraper}-{style}"
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                    output_dir.mkdir(parents=True)
+                    log_file = work_dir / f"{scraper}-{style}.log"
+                    server.reset()
+                    print(f"==> {scraper} on {style}-style site ({len(site.pages)} pages, depth {site.depth}): "
+                          f"{server.url}", file=sys.stderr)
+                    exit_code, wall_s, peak_rss_mb = run_measured(
+                        scraper_command(scraper, server.url, output_dir, args), log_file, args.timeout)
+                    run = evaluate_run(site, server, scraper, output_dir, exit_code, wall_s, peak_rss_mb, log_file)
+                    print(f"    {run['pages_found']}/{len(site.pages)} pages in {wall_s:.1f}s "
+                          f"(exit {exit_code}, log: {log_file})", file=sys.stderr)
+                    runs.append(run)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "started_at": started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "git_commit": git_commit(),
+        "python": str(args.python),
+        "platform": sys.platform,
+        "config": {
+            "pages": args.pages,
+            "nav_depth": args.nav_depth,
+            "site_depth": depths,
+            "render_delay_ms": args.render_delay_ms,
+            "jitter": args.jitter,
+            "words": args.words,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "playwright_args": args.playwright_args,
+            "crawl4ai_args": args.crawl4ai_args,
+        },
+        "runs": runs,
+    }
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    print(f"📄 Report saved: {output_file}")
+    sys.exit(0 if all(run["exit_code"] == 0 for run in runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
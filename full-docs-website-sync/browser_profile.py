@@ -0,0 +1,146 @@
+"""
+Lean browser profile shared by the Playwright and crawl4ai scrapers
+Blocks images, media, fonts and third-party requests, and counts what was transferred
+"""
+
+import asyncio
+from urllib.parse import urlparse
+
+# Only text from main/article is extracted, so none of these are ever needed
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Analytics/tag managers that are blocked even when first-party allowlisting would pass them
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "segment.com",
+    "segment.io", "hotjar.com", "mixpanel.com", "intercom.io", "plausible.io",
+    "fullstory.com", "sentry.io", "clarity.ms", "facebook.net", "posthog.com",
+)
+
+LEAN_VIEWPORT = {"width": 1280, "height": 800}
+
+# Chromium flags: no image decoding, no extension/background work
+LEAN_LAUNCH_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--mute-audio",
+]
+
+
+def lean_context_options() -> dict:
+    """Playwright new_context() options for the lean profile (JS on, no service workers)"""
+    return {
+        "viewport": LEAN_VIEWPORT,
+        "java_script_enabled": True,
+        "service_workers": "block",
+        "reduced_motion": "reduce",
+    }
+
+
+def site_domain(url: str) -> str:
+    """Approximate registrable domain of a URL (docs.example.com -> example.com)"""
+    host = (urlparse(url).hostname or "").lower()
+    labels = host.split('.')
+    return '.'.join(labels[-2:]) if len(labels) > 2 else host
+
+
+def allowed_domains_for(url: str, extra_domains=None) -> list:
+    """First-party domains for a site, plus any explicitly allowed ones"""
+    domains = [site_domain(url)]
+    for domain in extra_domains or []:
+        domain = domain.lower().lstrip('.')
+        if domain and domain not in domains:
+            domains.append(domain)
+    return domains
+
+
+def host_matches(host: str, domains) -> bool:
+    """True if host is one of domains or a subdomain of one"""
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+def block_reason(url: str, resource_type: str, allowed_domains) -> str:
+    """
+    Decide whether a request should be aborted
+
+    Returns:
+        Reason string ('type:<resource_type>', 'tracker' or 'third-party'),
+        or None to let the request through
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return f"type:{resource_type}"
+
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        return None
+
+    host = (parsed.hostname or "").lower()
+    if host_matches(host, TRACKER_DOMAINS):
+        return "tracker"
+    if resource_type != "document" and not host_matches(host, allowed_domains):
+        return "third-party"
+    return None
+
+
+class NetworkStats:
+    """
+    Request interception and transfer accounting for one scrape
+
+    One instance can be installed on any number of pages/contexts; the
+    counters aggregate across all of them.
+    """
+
+    def __init__(self, allowed_domains, block=True):
+        self.allowed_domains = list(allowed_domains)
+        self.block = block
+        self.requests = 0
+        self.blocked = 0
+        self.blocked_by_reason = {}
+        self.bytes_transferred = 0
+        self._pending = set()
+
+    async def install(self, target):
+        """Attach blocking and accounting to a Playwright page or browser context"""
+        if self.block:
+            await target.route("**/*", self._handle_route)
+        target.on("requestfinished", self._on_request_finished)
+
+    async def _handle_route(self, route):
+        request = route.request
+        reason = block_reason(request.url, request.resource_type, self.allowed_domains)
+        if reason:
+            self.blocked += 1
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _on_request_finished(self, request):
+        self.requests += 1
+        task = asyncio.ensure_future(self._add_sizes(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _add_sizes(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.bytes_transferred += max(sizes.get("responseBodySize", 0), 0) + max(sizes.get("responseHeadersSize", 0), 0)
+
+    async def drain(self):
+        """Wait for outstanding size lookups (call before the browser closes)"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def as_dict(self) -> dict:
+        """Summary block for sitemap.json / metadata.json"""
+        return {
+            "blocking_enabled": self.block,
+            "allowed_domains": self.allowed_domains,
+            "requests_finished": self.requests,
+            "requests_blocked": self.blocked,
+            "blocked_by_reason": dict(sorted(self.blocked_by_reason.items())),
+            "bytes_transferred": self.bytes_transferred,
+        }
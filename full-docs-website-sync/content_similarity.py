@@ -0,0 +1,366 @@
+"""
+Content-level cross-validation of scraper outputs with MinHash sketches and LSH
+Each page becomes a compact 64-value sketch of its word shingles; pages are matched
+across scrapers through an LSH index instead of pairwise full-text diffs.
+Also provides the SimHash duplicate index the playwright scraper checks before each write
+"""
+
+import hashlib
+import html
+import json
+import re
+from collections import defaultdict
+
+NUM_PERM = 64          # sketch size (one-permutation MinHash bins)
+LSH_BANDS = 16         # 16 bands x 4 rows: candidates from ~0.5 Jaccard upwards
+SHINGLE_WORDS = 4
+MIN_SHINGLES = 8       # pages with fewer shingles count as empty
+MATCH_CONTAINMENT = 0.5
+DUPLICATE_JACCARD = 0.9
+SIMHASH_MAX_DISTANCE = 3  # differing bits (of 64) that still count as a near-duplicate
+_SIMHASH_BLOCKS = 4       # > SIMHASH_MAX_DISTANCE, so near-duplicates share a whole block
+
+_BIN_MASK = NUM_PERM - 1
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_ROWS = NUM_PERM // LSH_BANDS
+_EMPTY = (1 << 64) - 1
+# Above every bin value: a bin borrowed from t bins away gets t * _ROTATION_OFFSET added
+_ROTATION_OFFSET = 1 << (64 - _BIN_BITS)
+
+_WORD_RE = re.compile(r'\w+')
+_DROP_BLOCKS_RE = re.compile(r'<(script|style|noscript|svg|template)\b.*?</\1\s*>', re.I | re.S)
+_MAIN_RE = re.compile(r'<(main|article)\b[^>]*>(.*)</\1\s*>', re.I | re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+_FRONTMATTER_RE = re.compile(r'\A---\n.*?\n---\n', re.S)
+
+
+def text_from_html(page_html: str) -> str:
+    """Visible text of an HTML page, preferring <main>/<article> when present"""
+    page_html = _DROP_BLOCKS_RE.sub(' ', page_html)
+    main = _MAIN_RE.search(page_html)
+    if main:
+        page_html = main.group(2)
+    return html.unescape(_TAG_RE.sub(' ', page_html))
+
+
+def text_from_markdown(markdown: str) -> str:
+    """Markdown body without the scraper's YAML frontmatter"""
+    return _FRONTMATTER_RE.sub('', markdown, count=1)
+
+
+def split_markdown_sections(markdown: str) -> list:
+    """Split one long markdown document (crawl4ai content.md) at '#'/'##' headings"""
+    sections, current = [], []
+    for line in markdown.split('\n'):
+        if line.startswith(('# ', '## ')) and current:
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append('\n'.join(current))
+    return sections
+
+
+def shingles(text: str) -> set:
+    """Distinct lowercase SHINGLE_WORDS-word shingles (the whole text if shorter)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _hash64(gram: str) -> int:
+    return int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def sketch(text: str) -> dict:
+    """
+    One-permutation MinHash sketch of the text's word shingles
+
+    Each shingle is hashed once; the low bits pick one of NUM_PERM bins and
+    each bin keeps its minimum. Empty bins borrow from the next non-empty
+    bin plus an offset for the distance borrowed from (rotation
+    densification), so two pages only agree on a borrowed bin if they
+    borrowed it from the same place.
+
+    Returns:
+        {"n": shingle count, "sig": [NUM_PERM ints]} (sig is None for empty pages)
+    """
+    grams = shingles(text)
+    if not grams:
+        return {"n": 0, "sig": None}
+
+    bins = [_EMPTY] * NUM_PERM
+    for gram in grams:
+        h = _hash64(gram)
+        b = h & _BIN_MASK
+        v = h >> _BIN_BITS
+        if v < bins[b]:
+            bins[b] = v
+
+    if _EMPTY in bins:
+        filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+        for i, v in enumerate(bins):
+            if v == _EMPTY:
+                j = next((k for k in filled if k > i), filled[0])
+                bins[i] = bins[j] + ((j - i) % NUM_PERM) * _ROTATION_OFFSET
+
+    return {"n": len(grams), "sig": bins}
+
+
+def sketch_file(path, fmt: str):
+    """
+    Sketch a scraped file from disk (module-level so it can run in a process pool)
+
+    Args:
+        path: File to read
+        fmt: 'html' (httrack page), 'markdown' (playwright/crawl4ai page) or
+             'content_md' (crawl4ai content.md, JSON envelope or plain; split at headings)
+
+    Returns:
+        One sketch, or a list of sketches for 'content_md'
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        content = f.read()
+
+    if fmt == 'html':
+        return sketch(text_from_html(content))
+    if fmt == 'markdown':
+        return sketch(text_from_markdown(content))
+
+    try:
+        content = json.loads(content).get("markdown", {}).get("raw_markdown", "")
+    except (json.JSONDecodeError, AttributeError):
+        pass
+    return [sketch(section) for section in split_markdown_sections(content)]
+
+
+def is_empty(page_sketch: dict) -> bool:
+    return page_sketch["sig"] is None or page_sketch["n"] < MIN_SHINGLES
+
+
+def jaccard(a: dict, b: dict) -> float:
+    """Estimated Jaccard similarity of two sketches"""
+    if a["sig"] is None or b["sig"] is None:
+        return 0.0
+    return sum(1 for x, y in zip(a["sig"], b["sig"]) if x == y) / NUM_PERM
+
+
+def containment(a: dict, b: dict) -> float:
+    """Estimated share of a's shingles that also appear in b (tolerates chrome around b)"""
+    j = jaccard(a, b)
+    if not j:
+        return 0.0
+    return min(1.0, j * (a["n"] + b["n"]) / ((1 + j) * a["n"]))
+
+
+class LSHIndex:
+    """Banded LSH over sketch signatures: keys sharing any band are candidates"""
+
+    def __init__(self):
+        self.buckets = [defaultdict(list) for _ in range(LSH_BANDS)]
+        self.sketches = {}
+
+    def add(self, key, page_sketch: dict):
+        if page_sketch["sig"] is None:
+            return
+        self.sketches[key] = page_sketch
+        sig = page_sketch["sig"]
+        for band in range(LSH_BANDS):
+            self.buckets[band][tuple(sig[band * _ROWS:(band + 1) * _ROWS])].append(key)
+
+    def candidates(self, page_sketch: dict) -> set:
+        if page_sketch["sig"] is None:
+            return set()
+        sig = page_sketch["sig"]
+        found = set()
+        for band in range(LSH_BANDS):
+            found.update(self.buckets[band].get(tuple(sig[band * _ROWS:(band + 1) * _ROWS]), ()))
+        return found
+
+
+def path_buckets(key: str) -> set:
+    """Lowercase path components of a page key (file extension and '#chunk' suffix dropped)"""
+    parts = key.split('#')[0].replace('\\', '/').lower().split('/')
+    parts[-1] = parts[-1].rsplit('.', 1)[0]
+    return {part for part in parts if part}
+
+
+def best_match(page_sketch: dict, index: LSHIndex, bucket=()):
+    """
+    (key, containment) of the indexed page that best contains this one, or (None, 0.0)
+
+    Banding finds pages by Jaccard similarity, so a short section inside a
+    much longer page (low Jaccard, high containment) is easily missed. If no
+    LSH candidate reaches MATCH_CONTAINMENT, every page in bucket (keys of
+    pages from the same section/path) is compared directly.
+    """
+    best_key, best_score = None, 0.0
+    for keys in (index.candidates(page_sketch), bucket):
+        for key in keys:
+            score = containment(page_sketch, index.sketches[key])
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_score >= MATCH_CONTAINMENT:
+            break
+    return best_key, best_score
+
+
+def near_duplicate_groups(sketches: dict, threshold: float = DUPLICATE_JACCARD) -> list:
+    """
+    Groups of pages whose estimated Jaccard similarity is at least threshold
+
+    Returns:
+        List of sorted key lists (only groups with 2+ pages), largest first
+    """
+    index = LSHIndex()
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key, page_sketch in sketches.items():
+        if is_empty(page_sketch):
+            continue
+        parent[key] = key
+        for other in index.candidates(page_sketch):
+            if jaccard(page_sketch, index.sketches[other]) >= threshold:
+                parent[find(key)] = find(other)
+        index.add(key, page_sketch)
+
+    groups = defaultdict(list)
+    for key in parent:
+        groups[find(key)].append(key)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+
+def cross_validate(reference: dict, outputs: dict) -> dict:
+    """
+    Match every reference page (playwright section) against each scraper's pages
+
+    Args:
+        reference: Reference page key -> sketch
+        outputs: Scraper name -> {page key -> sketch}
+
+    Returns:
+        Dict with per-scraper summaries (empty pages, near-duplicates,
+        sections matched/missing), per-section agreement, and the reference's
+        own empty pages and near-duplicates
+    """
+    result = {
+        "reference": {
+            "pages": len(reference),
+            "empty_pages": sorted(k for k, s in reference.items() if is_empty(s)),
+            "near_duplicates": near_duplicate_groups(reference),
+        },
+        "scrapers": {},
+        "sections": [],
+    }
+    checked = [k for k in sorted(reference) if not is_empty(reference[k])]
+    agreement = {key: {} for key in checked}
+
+    for name, pages in outputs.items():
+        index = LSHIndex()
+        # Fallback candidates: pages by path component ("" holds pages without a directory,
+        # e.g. content.md chunks, which could belong to any section)
+        buckets = defaultdict(list)
+        for key, page_sketch in pages.items():
+            if not is_empty(page_sketch):
+                index.add(key, page_sketch)
+                for part in (path_buckets(key) if '/' in key.replace('\\', '/') else ("",)):
+                    buckets[part].append(key)
+
+        missing = []
+        for key in checked:
+            section = key.split('/')[0] if '/' in key else ""
+            bucket = buckets.get(section, []) + (buckets.get("", []) if section else [])
+            match, score = best_match(reference[key], index, bucket)
+            matched = score >= MATCH_CONTAINMENT
+            agreement[key][name] = {"match": match if matched else None, "score": round(score, 3)}
+            if not matched:
+                missing.append(key)
+
+        result["scrapers"][name] = {
+            "pages": len(pages),
+            "empty_pages": sum(1 for s in pages.values() if is_empty(s)),
+            "near_duplicates": near_duplicate_groups(pages),
+            "sections_checked": len(checked),
+            "sections_matched": len(checked) - len(missing),
+            "agreement": (len(checked) - len(missing)) / len(checked) if checked else 0,
+            "missing_sections": missing,
+        }
+
+    result["sections"] = [{"file": key, "scrapers": agreement[key]} for key in checked]
+    return result
+
+
+def simhash(text: str):
+    """
+    64-bit SimHash of the text's word shingles: similar texts differ in few bits
+
+    Returns:
+        The fingerprint as an int, or None if the text has fewer than
+        MIN_SHINGLES shingles (too short for near-duplicate matching)
+    """
+    grams = shingles(text)
+    if len(grams) < MIN_SHINGLES:
+        return None
+    # Per-bit votes: count the set bits of every column of the hashes' bit strings
+    columns = zip(*(format(_hash64(gram), '064b') for gram in grams))
+    half = len(grams) / 2
+    return int(''.join('1' if column.count('1') > half else '0' for column in columns), 2)
+
+
+class DuplicateIndex:
+    """
+    Exact (content hash) and near (SimHash) duplicate lookup over saved pages
+
+    Near-duplicate lookup splits each fingerprint into _SIMHASH_BLOCKS
+    blocks; two fingerprints within SIMHASH_MAX_DISTANCE bits must agree on
+    at least one whole block, so only pages sharing a block are compared.
+    """
+
+    def __init__(self, max_distance: int = SIMHASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.by_digest = {}
+        self.fingerprints = {}
+        self.blocks = [defaultdict(list) for _ in range(_SIMHASH_BLOCKS)]
+
+    @staticmethod
+    def _block_values(fingerprint: int):
+        bits = 64 // _SIMHASH_BLOCKS
+        return [(fingerprint >> (i * bits)) & ((1 << bits) - 1) for i in range(_SIMHASH_BLOCKS)]
+
+    def add(self, key, digest: str, fingerprint=None):
+        self.by_digest.setdefault(digest, key)
+        if fingerprint is not None and key not in self.fingerprints:
+            self.fingerprints[key] = fingerprint
+            for block, value in zip(self.blocks, self._block_values(fingerprint)):
+                block[value].append(key)
+
+    def find(self, digest: str, fingerprint=None, exclude=None):
+        """
+        Page this content duplicates, ignoring the page stored under `exclude`
+
+        Returns:
+            (key, distance): distance 0 for identical content, the number of
+            differing SimHash bits for a near-duplicate; (None, None) if unique
+        """
+        key = self.by_digest.get(digest)
+        if key is not None and key != exclude:
+            return key, 0
+        if fingerprint is None:
+            return None, None
+
+        best_key, best_distance = None, None
+        for block, value in zip(self.blocks, self._block_values(fingerprint)):
+            for key in block.get(value, ()):
+                if key == exclude:
+                    continue
+                distance = bin(fingerprint ^ self.fingerprints[key]).count('1')
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best_key, best_distance = key, distance
+        return best_key, best_distance
@@ -6,12 +6,25 @@ Uses the correct parameters to handle single-page apps with hash routing
 Uses web-context-builder's venv which has crawl4ai installed
 """
 
+import argparse
 import asyncio
 import json
 import sys
 import os
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse, urljoin
+
+from browser_profile import LEAN_LAUNCH_ARGS, LEAN_VIEWPORT, NetworkStats, allowed_domains_for
+from crawl_scope import in_scope, normalize_url, page_relpath, scope_prefix_for
+from dom_cache import DomCache
+from html_markdown import main_html
+from incremental import content_hash, http_validators, check_not_modified, load_previous_records, is_unchanged
+from scraper_daemon import DEFAULT_SOCKET, run_job_via_daemon
+from section_log import RecordLog, iter_records, sorted_records, write_json_atomic, write_listing_atomic
+from stage_timing import NO_TIMING, StageTimer
 
 # Add web-context-builder venv to path if not already activated
 venv_site_packages = Path.home() / "GITHUB/.web-context-builder/venv/lib/python3.13/site-packages"
@@ -19,7 +32,7 @@ if venv_site_packages.exists() and str(venv_site_packages) not in sys.path:
     sys.path.insert(0, str(venv_site_packages))
 
 try:
-    from crawl4ai import AsyncWebCrawler
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
 except ImportError:
     print("ERROR: crawl4ai not installed", file=sys.stderr)
     print("       Install with: pipx install crawl4ai", file=sys.stderr)
@@ -28,78 +41,205 @@ except ImportError:
     sys.exit(1)
 
 
-async def scrape_website(url: str, output_dir: str) -> bool:
+# Options shared by single-URL and multi-page crawls
+SPA_CRAWL_OPTIONS = {
+    # ⭐ CRITICAL FOR SPAs: Wait for JavaScript to fully load
+    "wait_for": "networkidle",
+    # ⭐ CRITICAL FOR SPAs: Give React/Vue time to render
+    "delay_before_return_html": 3.0,
+    # Nice-to-haves
+    "remove_overlay_elements": True,
+    "exclude_external_links": True,
+}
+
+DEFAULT_MAX_PAGES = 500
+DEFAULT_BATCH_SIZE = 8
+
+
+def lean_crawler(block_resources: bool = True) -> "AsyncWebCrawler":
+    """Create an AsyncWebCrawler using the shared lean browser profile"""
+    browser_config = BrowserConfig(
+        headless=True,
+        verbose=False,
+        viewport_width=LEAN_VIEWPORT["width"],
+        viewport_height=LEAN_VIEWPORT["height"],
+        text_mode=block_resources,
+        light_mode=True,
+        extra_args=LEAN_LAUNCH_ARGS,
+    )
+    return AsyncWebCrawler(config=browser_config, verbose=False)
+
+
+def attach_network_stats(crawler, url: str, block_resources: bool = True, allow_domains=None) -> NetworkStats:
+    """
+    Route every page the crawler opens through a fresh NetworkStats
+
+    Args:
+        crawler: AsyncWebCrawler (new or long-lived)
+        url: Site being crawled (decides which domains are first-party)
+        block_resources: Abort image/media/font, tracker and third-party requests
+        allow_domains: Extra domains whose requests are not treated as third-party
+
+    Returns:
+        The NetworkStats to report in metadata.json
+    """
+    network = NetworkStats(allowed_domains_for(url, allow_domains), block=block_resources)
+
+    async def on_page_context_created(page, context=None, **kwargs):
+        await network.install(page)
+        return page
+
+    crawler.crawler_strategy.set_hook("on_page_context_created", on_page_context_created)
+    return network
+
+
+@asynccontextmanager
+async def crawler_session(crawler=None, block_resources: bool = True, timer=NO_TIMING):
+    """Yield the given warm crawler, or start (and later close) a lean one"""
+    if crawler is not None:
+        yield crawler
+        return
+
+    started_at = timer.now()
+    async with lean_crawler(block_resources) as started:
+        timer.add("crawler_start", started_at, timer.now() - started_at)
+        yield started
+
+
+def load_previous_metadata(metadata_file: Path) -> dict:
+    """Load metadata.json from the previous run (empty dict if missing or unreadable)"""
+    if not metadata_file.exists():
+        return {}
+    try:
+        with open(metadata_file) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def write_content_file(content_file: Path, url: str, markdown: str, scraped_at: str, stats: dict):
+    """
+    Write content.md in its JSON envelope, streaming the markdown straight to disk
+
+    Same document as json.dump({url, markdown: {raw_markdown}, scraped_at,
+    scraper, success, stats}, indent=2), without building the dict around
+    the page text. Written to a temp file and renamed into place.
+    """
+    tmp_file = content_file.with_name(content_file.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('{\n  "url": ' + json.dumps(url) + ',\n  "markdown": {\n    "raw_markdown": ')
+        json.dump(markdown, f)
+        f.write('\n  },\n  "scraped_at": ' + json.dumps(scraped_at))
+        f.write(',\n  "scraper": "crawl4ai-spa",\n  "success": true,\n  "stats": ')
+        f.write(json.dumps(stats, indent=2).replace("\n", "\n  "))
+        f.write("\n}")
+    os.replace(tmp_file, content_file)
+
+
+async def scrape_website(url: str, output_dir: str, incremental: bool = False,
+                         block_resources: bool = True, allow_domains=None, crawler=None,
+                         trace_file: str = None, dom_cache: bool = True) -> bool:
     """
     Scrape a documentation website using crawl4ai with SPA support
 
     Args:
         url: Website URL to scrape
         output_dir: Directory to save output (will create crawl4ai/ subdirectory)
+        incremental: Skip unchanged content (HTTP 304 or identical content hash)
+        block_resources: Abort image/media/font, tracker and third-party requests
+        allow_domains: Extra domains whose requests are not treated as third-party
+        crawler: Already-running AsyncWebCrawler to reuse (e.g., from scraper_daemon.py);
+                 started and closed here if None
+        trace_file: Also write every timing span as Chrome trace-event JSON here
+                    (per-stage aggregates always go to metadata.json's timings block)
+        dom_cache: Save the rendered main-content HTML to {output_dir}/dom-cache/ (see rebuild_tree.py)
 
     Returns:
         True if successful, False otherwise
     """
     output_path = Path(output_dir) / "crawl4ai"
     output_path.mkdir(parents=True, exist_ok=True)
+    content_file = output_path / "content.md"
+    metadata_file = output_path / "metadata.json"
+
+    previous = load_previous_metadata(metadata_file) if incremental else {}
+    timer = StageTimer(trace=bool(trace_file))
+
+    # Incremental: a 304 from the server means there is nothing to re-crawl
+    if previous.get("http_validators") and content_file.exists():
+        with timer.span("not_modified_check"):
+            not_modified = check_not_modified(url, previous["http_validators"])
+        if not_modified:
+            print(f"    Not modified since {previous.get('scraped_at')} (HTTP 304), keeping existing output", file=sys.stderr)
+            previous["checked_at"] = datetime.utcnow().isoformat() + "Z"
+            previous["status"] = "not_modified"
+            previous["timings"] = timer.as_dict()
+            write_json_atomic(metadata_file, previous)
+            if trace_file:
+                timer.write_trace(trace_file, f"crawl4ai {url}")
+            return True
 
     print(f"    Crawling {url} with SPA support...", file=sys.stderr)
 
     try:
-        async with AsyncWebCrawler(verbose=False) as crawler:
-            result = await crawler.arun(
-                url=url,
-                # ⭐ CRITICAL FOR SPAs: Wait for JavaScript to fully load
-                wait_for="networkidle",
-                # ⭐ CRITICAL FOR SPAs: Give React/Vue time to render
-                delay_before_return_html=3.0,
-                # Nice-to-haves
-                remove_overlay_elements=True,
-                exclude_external_links=True,
-            )
+        async with crawler_session(crawler, block_resources, timer) as crawler:
+            network = attach_network_stats(crawler, url, block_resources, allow_domains)
+            with timer.span("crawl", url=url):
+                result = await crawler.arun(url=url, **SPA_CRAWL_OPTIONS)
 
             if not result.success:
                 print(f"ERROR: Crawl failed: {result.error_message}", file=sys.stderr)
                 return False
 
+            with timer.span("network_drain"):
+                await network.drain()
+
             # Extract the markdown content
             markdown = result.markdown
-
-            # Save as JSON (matching existing format for compatibility)
-            content_file = output_path / "content.md"
-            output_data = {
-                "url": url,
-                "markdown": {
-                    "raw_markdown": markdown,
-                },
-                "scraped_at": datetime.utcnow().isoformat() + "Z",
-                "scraper": "crawl4ai-spa",
-                "success": True,
-                "stats": {
-                    "markdown_length": len(markdown),
-                    "links_found": len(result.links.get('internal', [])),
-                }
+            digest = content_hash(markdown)
+            snapshot = cache_snapshot(DomCache(output_dir), result) if dom_cache else None
+            unchanged = previous.get("content_hash") == digest and content_file.exists()
+            scraped_at = datetime.utcnow().isoformat() + "Z"
+            stats = {
+                "markdown_length": len(markdown),
+                "links_found": len(result.links.get('internal', [])),
             }
 
-            with open(content_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
+            # Incremental: leave an unchanged content.md untouched (bytes and mtime)
+            if unchanged:
+                scraped_at = previous.get("scraped_at", scraped_at)
+                print(f"    Content unchanged, kept: {content_file}", file=sys.stderr)
+            else:
+                # Same JSON envelope as before (for compatibility), streamed to disk
+                with timer.span("file_write"):
+                    write_content_file(content_file, url, markdown, scraped_at, stats)
 
-            print(f"    Saved markdown to: {content_file}", file=sys.stderr)
+                print(f"    Saved markdown to: {content_file}", file=sys.stderr)
 
             # Create metadata file
-            metadata_file = output_path / "metadata.json"
             metadata = {
                 "url": url,
-                "scraped_at": output_data["scraped_at"],
+                "scraped_at": scraped_at,
+                "checked_at": datetime.utcnow().isoformat() + "Z",
                 "scraper": "crawl4ai-spa",
                 "output": "content.md",
-                "stats": output_data["stats"]
+                "status": "unchanged" if unchanged else "updated",
+                "content_hash": digest,
+                "dom_hash": snapshot,
+                "http_validators": http_validators(getattr(result, "response_headers", None)),
+                "stats": stats,
+                "network": network.as_dict(),
+                "timings": timer.as_dict(),
             }
 
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            write_json_atomic(metadata_file, metadata)
+            if trace_file:
+                timer.write_trace(trace_file, f"crawl4ai {url}")
 
             print(f"    Saved metadata to: {metadata_file}", file=sys.stderr)
             print(f"    Stats: {len(markdown):,} chars, {len(result.links.get('internal', []))} links", file=sys.stderr)
+            if trace_file:
+                print(f"    ⏱️  Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
 
             return True
 
@@ -110,16 +250,278 @@ async def scrape_website(url: str, output_dir: str) -> bool:
         return False
 
 
+def cache_snapshot(cache: DomCache, result):
+    """Save a crawl result's main content area to the DOM cache; returns its dom_hash (None if it has none)"""
+    html = main_html(result.html) if getattr(result, "html", None) else None
+    return cache.put(html) if html else None
+
+
+def internal_links(result, base_url: str):
+    """Absolute hrefs from result.links['internal'] (entries may be dicts or strings)"""
+    hrefs = []
+    for link in (result.links or {}).get('internal', []):
+        href = link.get('href') if isinstance(link, dict) else link
+        if href:
+            hrefs.append(urljoin(base_url, href))
+    return hrefs
+
+
+async def crawl_website(url: str, output_dir: str, max_pages: int = DEFAULT_MAX_PAGES,
+                        batch_size: int = DEFAULT_BATCH_SIZE, scope_prefix: str = None,
+                        incremental: bool = False, block_resources: bool = True,
+                        allow_domains=None, crawler=None, resume: bool = False,
+                        trace_file: str = None, dom_cache: bool = True) -> bool:
+    """
+    Crawl a documentation website page by page into a markdown directory tree
+
+    Breadth-first over internal links, fetching each frontier batch
+    concurrently with crawler.arun_many().
+
+    Args:
+        url: Root URL; its internal links seed the frontier
+        output_dir: Directory to save output (will create crawl4ai/pages/)
+        max_pages: Stop after this many pages have been fetched
+        batch_size: URLs fetched concurrently per arun_many() call
+        scope_prefix: Only follow links under this path (default: root URL's path)
+        incremental: Only rewrite pages whose content hash changed since the last run
+        block_resources: Abort image/media/font, tracker and third-party requests
+        allow_domains: Extra domains whose requests are not treated as third-party
+        crawler: Already-running AsyncWebCrawler to reuse (e.g., from scraper_daemon.py);
+                 started and closed here if None
+        resume: Continue an interrupted crawl from pages.jsonl instead of starting over
+        trace_file: Also write every timing span as Chrome trace-event JSON here
+                    (per-stage aggregates always go to metadata.json's timings block)
+        dom_cache: Save each page's rendered main-content HTML to {output_dir}/dom-cache/ (see rebuild_tree.py)
+
+    Returns:
+        True if at least one page was saved, False otherwise
+    """
+    output_path = Path(output_dir) / "crawl4ai"
+    pages_path = output_path / "pages"
+    pages_path.mkdir(parents=True, exist_ok=True)
+    metadata_file = output_path / "metadata.json"
+    # Every saved page is appended here as it finishes; metadata.json is built from it
+    log_file = output_path / "pages.jsonl"
+
+    root = normalize_url(url)
+    netloc = urlparse(root).netloc
+    prefix = scope_prefix.rstrip('/') if scope_prefix is not None else scope_prefix_for(root)
+
+    previous_pages = load_previous_records(metadata_file, "pages", "file") if incremental else {}
+
+    frontier = deque([root])
+    seen = {root}
+    failed = []
+    timer = StageTimer(trace=bool(trace_file))
+    snapshots = DomCache(output_dir) if dom_cache else None
+
+    # Resume: logged pages are done; the links they found rebuild the frontier
+    if resume:
+        done = set()
+        for _, record in iter_records(log_file):
+            done.add(record["url"])
+            for link in record.get("links", []):
+                if link not in seen:
+                    seen.add(link)
+                    frontier.append(link)
+        seen |= done
+        frontier = deque(link for link in frontier if link not in done)
+        if done:
+            print(f"    Resuming: {len(done)} pages already in {log_file.name}, {len(frontier)} in the frontier", file=sys.stderr)
+
+    print(f"    Crawling {root} (scope: {netloc}{prefix or '/'}, batch size {batch_size}, max {max_pages} pages)...", file=sys.stderr)
+
+    try:
+        async with crawler_session(crawler, block_resources, timer) as crawler:
+            network = attach_network_stats(crawler, url, block_resources, allow_domains)
+            with RecordLog(log_file, resume=resume) as page_log:
+                fetched = 0
+                while frontier and fetched < max_pages:
+                    batch = [frontier.popleft() for _ in range(min(batch_size, len(frontier), max_pages - fetched))]
+                    fetched += len(batch)
+                    print(f"    [{fetched}/{fetched + len(frontier)}] Fetching batch of {len(batch)}", file=sys.stderr)
+
+                    with timer.span("batch_fetch", urls=len(batch)):
+                        results = await crawler.arun_many(urls=batch, **SPA_CRAWL_OPTIONS)
+
+                    for result in results:
+                        page_url = normalize_url(result.url)
+
+                        if not result.success:
+                            print(f"      ❌ {page_url}: {result.error_message}", file=sys.stderr)
+                            failed.append({"url": page_url, "error": str(result.error_message)})
+                            continue
+
+                        # Grow the frontier from this page's internal links
+                        page_links = []
+                        for href in internal_links(result, result.url):
+                            link = normalize_url(href)
+                            if in_scope(link, netloc, prefix):
+                                page_links.append(link)
+                                if link not in seen:
+                                    seen.add(link)
+                                    frontier.append(link)
+
+                        markdown = str(result.markdown or '')
+                        if not markdown.strip():
+                            print(f"      ⚠️  No content: {page_url}", file=sys.stderr)
+                            continue
+
+                        rel_file = page_relpath(page_url)
+                        file_path = pages_path / rel_file
+                        digest = content_hash(markdown)
+                        previous = previous_pages.get(rel_file, {})
+                        snapshot = cache_snapshot(snapshots, result) if snapshots is not None else None
+
+                        # Incremental: leave unchanged files untouched (bytes and mtime)
+                        if is_unchanged(file_path, digest, previous):
+                            status = "unchanged"
+                            scraped_at = previous.get("scraped_at")
+                        else:
+                            status = "updated" if previous else "new"
+                            scraped_at = datetime.utcnow().isoformat() + "Z"
+                            file_path.parent.mkdir(parents=True, exist_ok=True)
+                            frontmatter = f"""---
+source_url: {page_url}
+scraped_at: {scraped_at}
+scraper: crawl4ai-crawl
+---
+
+"""
+                            with timer.span("page_write", file=rel_file):
+                                file_path.write_text(frontmatter + markdown, encoding='utf-8')
+
+                        page_log.append({
+                            "url": page_url,
+                            "file": rel_file,
+                            "size": len(markdown),
+                            "content_hash": digest,
+                            "dom_hash": snapshot,
+                            "scraped_at": scraped_at,
+                            "status": status,
+                            "http_validators": http_validators(getattr(result, "response_headers", None)),
+                            # Only kept in the log, so a resumed crawl can rebuild its frontier
+                            "links": list(dict.fromkeys(page_links)),
+                        })
+                        print(f"      ✓ {page_url} -> pages/{rel_file}" + (" (unchanged)" if status == "unchanged" else ""), file=sys.stderr)
+
+                with timer.span("network_drain"):
+                    await network.drain()
+
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return False
+
+    # Keep the page list stable across runs regardless of batch completion order
+    totals = {"pages": 0, "unchanged": 0, "markdown_length": 0}
+
+    def metadata_pages():
+        for page in sorted_records(log_file, "url", lambda record: record["file"]):
+            page.pop("links", None)
+            totals["pages"] += 1
+            totals["unchanged"] += page["status"] == "unchanged"
+            totals["markdown_length"] += page["size"]
+            yield page
+
+    def metadata_tail():
+        return {
+            "failed": failed,
+            "stats": {
+                "pages_saved": totals["pages"],
+                "pages_failed": len(failed),
+                "pages_unchanged": totals["unchanged"],
+                "urls_discovered": len(seen),
+                "frontier_remaining": len(frontier),
+                "markdown_length": totals["markdown_length"],
+            },
+            "network": network.as_dict(),
+            "timings": timer.as_dict(),
+        }
+
+    with timer.span("metadata_write"):
+        write_listing_atomic(metadata_file, {
+            "url": url,
+            "scraped_at": datetime.utcnow().isoformat() + "Z",
+            "scraper": "crawl4ai-crawl",
+            "output": "pages/",
+            "output_structure": "directory-tree",
+            "scope": {"netloc": netloc, "path_prefix": prefix},
+        }, "pages", metadata_pages(), metadata_tail)
+    if trace_file:
+        timer.write_trace(trace_file, f"crawl4ai {url}")
+    unchanged = totals["unchanged"]
+
+    print(f"    Saved {totals['pages']} pages to: {pages_path} ({unchanged} unchanged, {len(failed)} failed)", file=sys.stderr)
+    print(f"    Network: {network.bytes_transferred:,} bytes transferred, {network.blocked} requests blocked", file=sys.stderr)
+    if frontier:
+        print(f"    ⚠️  Stopped at --max-pages={max_pages} with {len(frontier)} URLs left in the frontier", file=sys.stderr)
+    print(f"    Saved metadata to: {metadata_file}", file=sys.stderr)
+    if trace_file:
+        print(f"    ⏱️  Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
+
+    return totals["pages"] > 0
+
+
 def main():
     """CLI entry point"""
-    if len(sys.argv) != 3:
-        print("Usage: crawl4ai_scraper.py <url> <output_dir>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        prog="crawl4ai_scraper.py",
+        description="Scrape a documentation website to markdown with crawl4ai"
+    )
+    parser.add_argument("url", help="Website URL to scrape")
+    parser.add_argument("output_dir", help="Domain output directory")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip re-crawling/rewriting when the page is unchanged since the last run")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Follow internal links and save every page into crawl4ai/pages/")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Crawl mode: maximum pages to fetch (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Crawl mode: pages fetched concurrently per batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--scope-prefix", default=None, metavar="PATH",
+                        help="Crawl mode: only follow links under this path (default: the URL's path)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Crawl mode: continue an interrupted crawl from crawl4ai/pages.jsonl")
+    parser.add_argument("--no-block-resources", dest="block_resources", action="store_false",
+                        help="Load images, fonts, media and third-party requests")
+    parser.add_argument("--allow-domain", action="append", default=[], metavar="DOMAIN",
+                        help="Domain to treat as first-party when blocking (repeatable)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write per-stage timing spans as Chrome trace-event JSON (chrome://tracing)")
+    parser.add_argument("--no-dom-cache", dest="dom_cache", action="store_false",
+                        help="Don't save each page's main-content HTML to dom-cache/")
+    parser.add_argument("--daemon", nargs="?", const=str(DEFAULT_SOCKET), default=None, metavar="SOCKET",
+                        help="Run the job on a warm scraper_daemon.py (falls back to in-process if none is running)")
+    args = parser.parse_args()
+
+    if args.max_pages < 1 or args.batch_size < 1:
+        parser.error("--max-pages and --batch-size must be at least 1")
+    if args.resume and not args.crawl:
+        parser.error("--resume only applies to --crawl")
+
+    options = {
+        "incremental": args.incremental,
+        "block_resources": args.block_resources,
+        "allow_domains": args.allow_domain,
+        "trace_file": str(Path(args.trace).resolve()) if args.trace else None,
+        "dom_cache": args.dom_cache,
+    }
+    if args.crawl:
+        options.update(max_pages=args.max_pages, batch_size=args.batch_size, scope_prefix=args.scope_prefix,
+                       resume=args.resume)
 
-    url = sys.argv[1]
-    output_dir = sys.argv[2]
+    if args.daemon:
+        success = run_job_via_daemon(args.daemon, "crawl4ai", args.url, args.output_dir,
+                                     dict(options, crawl=args.crawl))
+        if success is not None:
+            sys.exit(0 if success else 1)
 
-    success = asyncio.run(scrape_website(url, output_dir))
+    if args.crawl:
+        success = asyncio.run(crawl_website(args.url, args.output_dir, **options))
+    else:
+        success = asyncio.run(scrape_website(args.url, args.output_dir, **options))
     sys.exit(0 if success else 1)
 
 
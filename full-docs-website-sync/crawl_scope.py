@@ -0,0 +1,110 @@
+"""
+URL scope and output path helpers shared by the full-docs-website-sync scrapers
+Normalizes page URLs for frontier dedupe and maps them to files in the output trees
+"""
+
+import re
+from urllib.parse import urlparse, urlunparse
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for frontier dedupe
+
+    Lowercases scheme and host, drops fragments and default ports, and strips
+    trailing slashes so /docs and /docs/ are the same page.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and (scheme, parsed.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parsed.port}"
+    path = re.sub(r'/{2,}', '/', parsed.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunparse((scheme, host, path, '', parsed.query, ''))
+
+
+def scope_prefix_for(url: str) -> str:
+    """Default path prefix for a crawl: the root URL's path (e.g., /docs)"""
+    path = urlparse(normalize_url(url)).path
+    return '' if path == '/' else path
+
+
+def in_scope(url: str, netloc: str, prefix: str) -> bool:
+    """True if url is on the same host and under the path prefix"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or parsed.netloc != netloc:
+        return False
+    return not prefix or parsed.path == prefix or parsed.path.startswith(prefix + '/')
+
+
+def page_relpath(url: str) -> str:
+    """Map a normalized page URL to its markdown file inside pages/"""
+    parsed = urlparse(url)
+    parts = [re.sub(r'[^\w.-]', '-', part) for part in parsed.path.split('/') if part]
+    if parts:
+        parts[-1] = re.sub(r'\.html?$', '', parts[-1])
+    if parsed.query:
+        suffix = re.sub(r'[^\w-]', '-', parsed.query).strip('-')
+        parts = (parts or ['index'])
+        parts[-1] = f"{parts[-1]}--{suffix}"
+    return '/'.join(parts or ['index']) + '.md'
+
+
+def parse_hash_url(url):
+    """Parse hash URL to extract section and subsection"""
+    # Example: https://repoprompt.com/docs#s=quick-start&ss=installation
+    parsed = urlparse(url)
+
+    if not parsed.fragment:
+        return None, None
+
+    # Parse query params from hash
+    # Handle both #s=section&ss=subsection and #section-subsection formats
+    if '=' in parsed.fragment:
+        params = {}
+        for part in parsed.fragment.split('&'):
+            if '=' in part:
+                key, value = part.split('=', 1)
+                params[key] = value
+
+        section = params.get('s', 'unknown')
+        subsection = params.get('ss', 'index')
+        return section, subsection
+    else:
+        # Simple hash like #overview
+        return parsed.fragment, 'index'
+
+
+def path_section(url: str, prefix: str):
+    """
+    Map a path-routed page URL to a (section, subsection) of the playwright tree
+
+    The first path segment under the scope prefix is the section, the rest
+    (joined with '-') the subsection; missing parts and index pages are 'index'.
+    e.g. /docs/guides/auth/oauth.html under /docs -> ("guides", "auth-oauth")
+    """
+    parsed = urlparse(url)
+    path = parsed.path
+    if prefix and (path == prefix or path.startswith(prefix + '/')):
+        path = path[len(prefix):]
+    parts = [part for part in path.split('/') if part]
+    if parts:
+        parts[-1] = re.sub(r'\.html?$', '', parts[-1])
+        if parts[-1] == 'index':
+            parts.pop()
+
+    section = parts[0] if parts else 'index'
+    subsection = '-'.join(parts[1:]) or 'index'
+    if parsed.query:
+        subsection += '--' + re.sub(r'[^\w-]', '-', parsed.query).strip('-')
+    return section, subsection
+
+
+def sanitize_filename(name):
+    """Convert section name to safe filename"""
+    # Replace special chars with hyphens
+    name = re.sub(r'[^\w\s-]', '', name)
+    name = re.sub(r'[-\s]+', '-', name)
+    return name.lower().strip('-')
@@ -0,0 +1,61 @@
+"""
+Content-addressed cache of rendered main-content HTML for the full-docs-website-sync scrapers
+Every scraped page's main content area is stored once, gzip-compressed, under {domain}/dom-cache/,
+keyed by its SHA-256 (content_hash); page records reference it by dom_hash so rebuild_tree.py can re-run the
+markdown conversion without a browser
+"""
+
+import gzip
+import os
+from pathlib import Path
+
+from incremental import content_hash
+
+CACHE_DIR = "dom-cache"
+
+
+class DomCache:
+    """
+    Compressed HTML snapshots in {domain}/dom-cache/ab/cdef...html.gz
+
+    Objects are immutable: a snapshot already in the cache is not written
+    again, and new ones are written to a temp file and renamed into place,
+    so concurrent scrapers of the same domain can share the cache.
+    """
+
+    def __init__(self, domain_dir):
+        self.root = Path(domain_dir) / CACHE_DIR
+
+    def path(self, digest: str) -> Path:
+        hex_digest = digest.split(":", 1)[-1]
+        return self.root / hex_digest[:2] / f"{hex_digest[2:]}.html.gz"
+
+    def put(self, html: str) -> str:
+        """Store a snapshot (if new) and return its dom_hash"""
+        digest = content_hash(html)
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(gzip.compress(html.encode('utf-8'), mtime=0))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Load a snapshot (raises FileNotFoundError if it is not cached)"""
+        return gzip.decompress(self.path(digest).read_bytes()).decode('utf-8')
+
+    def __contains__(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def prune(self, keep) -> int:
+        """Delete every snapshot whose dom_hash is not in keep; returns the number removed"""
+        if not self.root.is_dir():
+            return 0
+        keep_paths = {self.path(digest) for digest in keep}
+        removed = 0
+        for path in self.root.glob("*/*.html.gz"):
+            if path not in keep_paths:
+                path.unlink()
+                removed += 1
+        return removed
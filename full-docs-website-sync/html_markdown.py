@@ -0,0 +1,281 @@
+"""
+Browserless HTML to markdown conversion for the full-docs-website-sync scrapers
+A stdlib port of the playwright scraper's in-page helpers (mainContent, elementToMarkdown,
+headings), so pages converted from raw HTML match the ones rendered in the browser
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+})
+RAW_TEXT_TAGS = frozenset({"script", "style"})  # content is not HTML-escaped
+
+# Start tags that close an open element of these tags (HTML's optional end tags),
+# looking no further up than the nearest enclosing list/table/select
+IMPLIED_END = {
+    "li": {"li"},
+    "dt": {"dt", "dd"},
+    "dd": {"dt", "dd"},
+    "tr": {"tr", "td", "th"},
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+    "option": {"option"},
+}
+IMPLIED_END_SCOPE = frozenset({"ul", "ol", "dl", "table", "tbody", "thead", "tfoot", "select"})
+
+# Block start tags that close an open <p>
+CLOSES_P = frozenset({
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "nav", "ol", "p", "pre", "section", "table", "ul",
+})
+
+_HEADING_RE = re.compile(r'^h[1-6]$')
+_LANGUAGE_RE = re.compile(r'language-(\w+)', re.ASCII)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+class Element:
+    """A parsed element: children are Elements and text strings, in document order"""
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    def get(self, name: str, default=None):
+        return self.attrs.get(name, default)
+
+    def text_content(self) -> str:
+        """Concatenated text of all descendants (DOM textContent)"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return "".join(parts)
+
+    def iter(self):
+        """Descendant elements in document order"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Element):
+                yield node
+                stack.extend(reversed(node.children))
+
+    def find(self, predicate):
+        """First descendant element matching predicate (querySelector), or None"""
+        return next((element for element in self.iter() if predicate(element)), None)
+
+
+class _TreeBuilder(HTMLParser):
+    """Builds an Element tree, closing elements the way a browser would for common markup"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.stack = [self.root]
+
+    def _close_through(self, index: int):
+        del self.stack[index:]
+
+    def _open_index(self, tags, scope=frozenset()):
+        for i in range(len(self.stack) - 1, 0, -1):
+            tag = self.stack[i].tag
+            if tag in tags:
+                return i
+            if tag in scope:
+                return None
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in CLOSES_P:
+            index = self._open_index({"p"})
+            if index is not None:
+                self._close_through(index)
+        if tag in IMPLIED_END:
+            index = self._open_index(IMPLIED_END[tag], IMPLIED_END_SCOPE)
+            if index is not None:
+                self._close_through(index)
+
+        parent = self.stack[-1]
+        element = Element(tag, {name: value or "" for name, value in attrs}, parent)
+        parent.children.append(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> is a start tag in HTML; only void elements are really self-closing
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        index = self._open_index({tag})
+        if index is not None:
+            self._close_through(index)
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(page_html: str) -> Element:
+    """Parse an HTML document into an Element tree (the returned root is the document)"""
+    builder = _TreeBuilder()
+    builder.feed(page_html)
+    builder.close()
+    return builder.root
+
+
+def outer_html(element: Element) -> str:
+    """Serialize an element and its descendants back to HTML (DOM outerHTML)"""
+    parts = []
+
+    def write(node, raw_text=False):
+        if isinstance(node, str):
+            parts.append(node if raw_text else escape(node, quote=False))
+            return
+        attrs = "".join(f' {name}="{escape(value)}"' for name, value in node.attrs.items())
+        parts.append(f"<{node.tag}{attrs}>")
+        if node.tag in VOID_TAGS:
+            return
+        for child in node.children:
+            write(child, node.tag in RAW_TEXT_TAGS)
+        parts.append(f"</{node.tag}>")
+
+    write(element)
+    return "".join(parts)
+
+
+def _has_class(element: Element, name: str) -> bool:
+    return name in element.get("class", "").split()
+
+
+def main_content(root: Element):
+    """The main content area, with the same selector order as the in-page mainContent()"""
+    return (root.find(lambda e: e.tag == "main") or
+            root.find(lambda e: e.get("role") == "main") or
+            root.find(lambda e: _has_class(e, "content")) or
+            root.find(lambda e: e.tag == "article"))
+
+
+def element_to_markdown(element: Element, level: int = 0) -> str:
+    """Port of the in-page elementToMarkdown(): same element rules and whitespace"""
+    result = ''
+
+    for node in element.children:
+        if isinstance(node, str):
+            text = node.strip()
+            if text:
+                result += text + ' '
+            continue
+
+        tag = node.tag
+        if _HEADING_RE.match(tag):
+            result += '\n\n' + '#' * int(tag[1]) + ' ' + node.text_content().strip() + '\n\n'
+        elif tag == 'p':
+            result += '\n\n' + node.text_content().strip() + '\n\n'
+        elif tag == 'li':
+            result += '\n  * ' + node.text_content().strip()
+        elif tag in ('ul', 'ol'):
+            result += '\n' + element_to_markdown(node, level + 1)
+        elif tag == 'code':
+            result += '`' + node.text_content().strip() + '`'
+        elif tag in ('strong', 'b'):
+            result += '**' + node.text_content().strip() + '**'
+        elif tag in ('em', 'i'):
+            result += '*' + node.text_content().strip() + '*'
+        elif tag == 'a':
+            text = node.text_content().strip()
+            href = node.get('href')
+            if href and not href.startswith('#'):
+                result += '[' + text + '](' + href + ')'
+            else:
+                result += text
+        elif tag == 'pre':
+            code = node.find(lambda e: e.tag == 'code')
+            match = _LANGUAGE_RE.search(code.get('class', '')) if code else None
+            lang = match.group(1) if match else ''
+            result += '\n\n```' + lang + '\n' + node.text_content().strip() + '\n```\n\n'
+        elif tag == 'blockquote':
+            lines = node.text_content().strip().split('\n')
+            result += '\n\n' + '\n'.join('> ' + line for line in lines) + '\n\n'
+        elif tag == 'img':
+            result += '![' + node.get('alt', '') + '](' + node.get('src', '') + ')'
+        else:
+            # For other elements, recurse
+            result += element_to_markdown(node, level)
+
+    return result
+
+
+def markdown(main: Element) -> str:
+    """Markdown of a main content element, as the in-page markdown() returns it"""
+    return _BLANK_LINES_RE.sub('\n\n', element_to_markdown(main)).strip()
+
+
+def headings(main: Element) -> list:
+    """Headings of the main content area: [{level, text}] like the in-page headings()"""
+    return [
+        {"level": int(element.tag[1]), "text": element.text_content().strip()[:200]}
+        for element in main.iter() if _HEADING_RE.match(element.tag)
+    ]
+
+
+def page_content(page_html: str, url: str, keep_html: bool = False) -> dict:
+    """
+    Convert a raw HTML page the way the playwright scraper converts a rendered one
+
+    Top-level so it can run in a process pool.
+
+    Args:
+        page_html: Document HTML
+        url: URL the document was served from (resolves relative links)
+        keep_html: Also return the main content area's HTML (for the DOM cache)
+
+    Returns:
+        Dict with markdown (None if the page has no main content area),
+        headings, links (absolute hrefs of every <a href> on the page)
+        and, with keep_html, main_html
+    """
+    root = parse_html(page_html)
+    base = root.find(lambda e: e.tag == "base" and e.get("href"))
+    base_url = urljoin(url, base.get("href")) if base else url
+    links = [urljoin(base_url, a.get("href")) for a in root.iter() if a.tag == "a" and a.get("href")]
+
+    main = main_content(root)
+    content = {
+        "markdown": markdown(main) if main else None,
+        "headings": headings(main) if main else [],
+        "links": list(dict.fromkeys(links)),
+    }
+    if keep_html:
+        content["main_html"] = outer_html(main) if main else None
+    return content
+
+
+def main_html(page_html: str):
+    """HTML of a rendered page's main content area, or None if it has none"""
+    main = main_content(parse_html(page_html))
+    return outer_html(main) if main else None
+
+
+def convert_main_html(main_html_snapshot: str) -> dict:
+    """
+    Convert a cached main-content snapshot (the main element's outer HTML)
+
+    Returns:
+        Dict with markdown and headings, as the scraper extracted them
+    """
+    main = parse_html(main_html_snapshot).find(lambda e: True)
+    if main is None:
+        return {"markdown": "", "headings": []}
+    return {"markdown": markdown(main), "headings": headings(main)}
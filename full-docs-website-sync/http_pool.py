@@ -0,0 +1,259 @@
+"""
+Pooled keep-alive HTTP/1.1 client on asyncio streams (stdlib only)
+Used by the static fast path: idle connections are kept per origin and reused, and a
+semaphore bounds the requests in flight. Handles chunked and gzip/deflate bodies and redirects
+"""
+
+import asyncio
+import ssl
+import zlib
+from urllib.parse import quote, urljoin, urlsplit
+
+USER_AGENT = "Mozilla/5.0 (compatible; knowledge-builder static fetcher)"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT_S = 30.0
+MAX_REDIRECTS = 5
+MAX_BODY_BYTES = 32 * 1024 * 1024
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+# Characters left as-is when a request target is percent-encoded (already-encoded %XX included)
+_TARGET_SAFE = "/?&=;:@!$'()*+,~%-._[]"
+
+
+class HttpResponse:
+    """Status, lowercased headers and the decoded body of a GET (url is the final URL after redirects)"""
+
+    __slots__ = ("url", "status", "headers", "body")
+
+    def __init__(self, url: str, status: int, headers: dict, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    def text(self) -> str:
+        """Body decoded with the Content-Type charset (UTF-8 if none or unknown)"""
+        charset = "utf-8"
+        for param in self.headers.get("content-type", "").split(";")[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "charset" and value.strip():
+                charset = value.strip().strip('"\'')
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class HttpPool:
+    """
+    Keep-alive connection pool for GET requests
+
+    At most `concurrency` requests are in flight; each one takes an idle
+    connection to its origin or opens a new one, and hands it back when
+    the response was fully read and the server allows reuse. A reused
+    connection the server has closed in the meantime is retried once on a
+    fresh one. Use as an async context manager to close idle connections.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT_S,
+                 user_agent: str = USER_AGENT):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.ssl_context = ssl.create_default_context()
+        self.idle = {}  # (scheme, host, port) -> [(reader, writer)]
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.bytes_received = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get(self, url: str, headers: dict = None) -> HttpResponse:
+        """
+        GET a URL, following redirects
+
+        Raises:
+            OSError / asyncio.TimeoutError on connection failures, timeouts,
+            malformed responses or too many redirects
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            async with self.semaphore:
+                response = await asyncio.wait_for(self._request(url, headers or {}), self.timeout)
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+        raise OSError(f"More than {MAX_REDIRECTS} redirects: {url}")
+
+    async def _request(self, url: str, headers: dict) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise OSError(f"Not an HTTP URL: {url}")
+        origin = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = quote(parts.path or "/", safe=_TARGET_SAFE) + (f"?{quote(parts.query, safe=_TARGET_SAFE)}" if parts.query else "")
+        lines = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {parts.netloc.rpartition('@')[2]}",
+            f"User-Agent: {self.user_agent}",
+            "Accept: text/html,application/xhtml+xml;q=0.9,*/*;q=0.5",
+            "Accept-Encoding: gzip, deflate",
+            "Connection: keep-alive",
+        ] + [f"{name}: {value}" for name, value in headers.items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        self.requests += 1
+        while True:
+            (reader, writer), reused = await self._connection(origin)
+            try:
+                status, response_headers, body, keep_alive = await self._exchange(reader, writer, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self.idle.setdefault(origin, []).append((reader, writer))
+            else:
+                writer.close()
+            return HttpResponse(url, status, response_headers, _decode_body(body, response_headers))
+
+    async def _connection(self, origin):
+        """An idle connection to origin if one is still open, else a new one: ((reader, writer), reused)"""
+        idle = self.idle.get(origin)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.connections_reused += 1
+                return (reader, writer), True
+            writer.close()
+
+        scheme, host, port = origin
+        connection = await asyncio.open_connection(host, port, ssl=self.ssl_context if scheme == "https" else None)
+        self.connections_opened += 1
+        return connection, False
+
+    async def _exchange(self, reader, writer, request: bytes):
+        """Send one request and read the full response: (status, headers, raw body, keep_alive)"""
+        writer.write(request)
+        await writer.drain()
+
+        # Skip informational responses (e.g., 103 Early Hints)
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed before the response")
+            fields = status_line.decode("latin-1").split(None, 2)
+            if len(fields) < 2 or not fields[0].startswith("HTTP/") or not fields[1].isdigit():
+                raise OSError(f"Malformed status line: {status_line[:80]!r}")
+            version, status = fields[0], int(fields[1])
+            headers = await _read_headers(reader)
+            if not 100 <= status < 200:
+                break
+
+        keep_alive = version == "HTTP/1.1" and "close" not in headers.get("connection", "").lower()
+        if status in (204, 304):
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await _read_chunked(reader)
+        elif "content-length" in headers:
+            length = int(headers["content-length"].split(",")[0])
+            if length > MAX_BODY_BYTES:
+                raise OSError(f"Response too large ({length:,} bytes)")
+            body = await reader.readexactly(length)
+        else:
+            # No framing: the body ends when the server closes the connection
+            body = await _read_to_eof(reader)
+            keep_alive = False
+
+        self.bytes_received += len(body)
+        return status, headers, body, keep_alive
+
+    async def close(self):
+        """Close every idle connection"""
+        writers = [writer for connections in self.idle.values() for _, writer in connections]
+        self.idle.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "bytes_received": self.bytes_received,
+        }
+
+
+async def _read_headers(reader) -> dict:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+
+async def _read_chunked(reader) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"".join(chunks), None)
+        length = int(line.split(b";")[0].strip() or b"0", 16)
+        if length == 0:
+            await _read_headers(reader)  # trailers
+            return b"".join(chunks)
+        size += length
+        if size > MAX_BODY_BYTES:
+            raise OSError(f"Response too large (over {MAX_BODY_BYTES:,} bytes)")
+        chunks.append(await reader.readexactly(length))
+        await reader.readexactly(2)  # CRLF after each chunk
+
+
+async def _read_to_eof(reader) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        chunk = await reader.read(65536)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise OSError(f"Response too large (over {MAX_BODY_BYTES:,} bytes)")
+        chunks.append(chunk)
+
+
+def _decode_body(body: bytes, headers: dict) -> bytes:
+    encoding = headers.get("content-encoding", "").strip().lower()
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)  # raw deflate, as some servers send it
+    except zlib.error as e:
+        raise OSError(f"Could not decode {encoding} body: {e}")
+    return body
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Convert a domain's httrack mirror into the playwright markdown tree and sitemap.json
+Pages are parsed and converted with html_markdown (same main content selectors as the
+playwright scraper) across a process pool, so a fully mirrored site needs no browser crawl
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from urllib.parse import urlparse
+
+from crawl_scope import in_scope, normalize_url, path_section, sanitize_filename, scope_prefix_for
+from dom_cache import DomCache
+from html_markdown import page_content
+from incremental import load_previous_records
+from output_tree import remove_stale_files, tree_owner
+from rebuild_tree import CHUNK_SIZE, write_page
+from scan_index import scan_tree
+from section_log import write_listing_atomic
+from stage_timing import StageTimer
+
+HTML_SUFFIXES = (".html", ".htm")
+SCRAPER = "httrack-mirror"
+# httrack stamps every saved page with the URL it came from (without the scheme)
+_MIRRORED_FROM_RE = re.compile(rb'<!-- Mirrored from (\S+) by HTTrack')
+
+
+def mirror_host_dir(httrack_path: Path, netloc: str):
+    """The mirror's directory for a host (httrack writes host:port as host_port), or None"""
+    for name in (netloc, netloc.replace(':', '_')):
+        if (httrack_path / name).is_dir():
+            return httrack_path / name
+    return None
+
+
+def mirror_url(scheme: str, netloc: str, rel_path: str) -> str:
+    """URL a mirrored file was most likely saved from (guides/index.html -> /guides)"""
+    path = '/' + rel_path.replace(os.sep, '/')
+    if path.endswith('/index.html'):
+        path = path[:-len('index.html')]
+    return normalize_url(f"{scheme}://{netloc}{path}")
+
+
+def convert_mirror_page(domain_dir: str, output_dir: str, dom_cache: bool, job: dict) -> dict:
+    """
+    Convert one mirrored HTML file and write it into the tree
+
+    Top-level so it can run in a process pool.
+
+    Args:
+        domain_dir: Domain directory (holds httrack/ and dom-cache/)
+        output_dir: Tree root the job's file is relative to
+        dom_cache: Also save the page's main content area to dom-cache/
+        job: Page record (url, section, subsection, file, scraped_at, scraper,
+             source: path under httrack/, content_hash of the file on disk)
+
+    Returns:
+        write_page()'s dict plus url (from httrack's "Mirrored from" stamp when
+        present) and dom_hash, or just status empty and url if the page has
+        no main content area
+    """
+    raw = (Path(domain_dir) / "httrack" / job["source"]).read_bytes()
+    stamp = _MIRRORED_FROM_RE.search(raw, 0, 4096)
+    url = job["url"]
+    if stamp:
+        url = normalize_url(f"{urlparse(url).scheme}://{stamp.group(1).decode('utf-8', 'replace')}")
+
+    page = page_content(raw.decode('utf-8', 'replace'), url, keep_html=dom_cache)
+    if not page["markdown"]:
+        return {"status": "empty", "url": url}
+    result = write_page(output_dir, dict(job, url=url), page)
+    result["url"] = url
+    result["dom_hash"] = DomCache(domain_dir).put(page["main_html"]) if dom_cache else None
+    return result
+
+
+def httrack_to_tree(base_url: str, output_dir: str, scope_prefix: str = None, workers: int = None,
+                    incremental: bool = False, dom_cache: bool = True, replace: bool = False) -> bool:
+    """
+    Convert {output_dir}/httrack/ into {output_dir}/playwright/ and sitemap.json
+
+    Args:
+        base_url: URL httrack mirrored (picks the host directory and the scope)
+        output_dir: Domain output directory
+        scope_prefix: Only convert pages under this path (default: base_url's path)
+        workers: Conversion processes (default: CPU count)
+        incremental: Leave files whose content hash matches the last sitemap.json untouched
+        dom_cache: Save each page's main content area to {output_dir}/dom-cache/ (see rebuild_tree.py)
+        replace: Overwrite a playwright/ tree another scraper wrote (refused otherwise)
+
+    Markdown files under playwright/ that are not in the new sitemap.json
+    (earlier conversions, or the replaced scraper's) are deleted.
+
+    Returns:
+        True if pages were converted, False otherwise
+    """
+    domain_path = Path(output_dir)
+    httrack_path = domain_path / "httrack"
+    output_path = domain_path / "playwright"
+    sitemap_file = domain_path / "sitemap.json"
+
+    root = normalize_url(base_url)
+    parsed = urlparse(root)
+    prefix = scope_prefix.rstrip('/') if scope_prefix is not None else scope_prefix_for(root)
+    timer = StageTimer()
+
+    owner = tree_owner(domain_path)
+    if owner not in (None, SCRAPER) and not replace:
+        print(f"ERROR: {output_path} holds {owner} output; pass --replace to overwrite it", file=sys.stderr)
+        return False
+
+    host_path = mirror_host_dir(httrack_path, parsed.netloc)
+    if host_path is None:
+        print(f"ERROR: No mirror of {parsed.netloc} in {httrack_path}", file=sys.stderr)
+        return False
+
+    # httrack's own files (hts-cache/, hts-log.txt, ...) are not walked; its index.html
+    # sits at the mirror root, outside the host directory
+    with timer.span("scan"):
+        html_files = scan_tree(httrack_path, HTML_SUFFIXES, skip_prefixes=("hts-",))
+    host_rel = host_path.name + os.sep
+    previous_sections = load_previous_records(sitemap_file, "sections", "file") if incremental else {}
+
+    jobs = []
+    claimed = set()
+    skipped = {"other_host": 0, "out_of_scope": 0, "same_file": 0}
+    for rel, _, mtime_ns in html_files:
+        if not rel.startswith(host_rel):
+            skipped["other_host"] += 1
+            continue
+        url = mirror_url(parsed.scheme, parsed.netloc, rel[len(host_rel):])
+        if not in_scope(url, parsed.netloc, prefix):
+            skipped["out_of_scope"] += 1
+            continue
+        section, subsection = path_section(url, prefix)
+        rel_file = f"{sanitize_filename(section)}/{sanitize_filename(subsection) or 'index'}.md"
+        if rel_file in claimed:
+            skipped["same_file"] += 1
+            continue
+        claimed.add(rel_file)
+        jobs.append({
+            "url": url,
+            "section": section,
+            "subsection": subsection,
+            "file": rel_file,
+            "source": rel.replace(os.sep, '/'),
+            # When httrack fetched the page
+            "scraped_at": datetime.utcfromtimestamp(mtime_ns / 1e9).isoformat() + "Z",
+            "scraper": SCRAPER,
+            "content_hash": previous_sections.get(rel_file, {}).get("content_hash"),
+        })
+
+    if not jobs:
+        print(f"ERROR: No HTML pages under {prefix or '/'} in {host_path}", file=sys.stderr)
+        return False
+
+    print(f"    Converting {len(jobs)} mirrored pages from {host_path} ({len(html_files)} HTML files)...", file=sys.stderr)
+    output_path.mkdir(parents=True, exist_ok=True)
+    convert = partial(convert_mirror_page, str(domain_path), str(output_path), dom_cache)
+    with timer.span("convert", pages=len(jobs)):
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(convert, jobs, chunksize=CHUNK_SIZE))
+
+    records = []
+    failed = []
+    unchanged = 0
+    for job, result in zip(jobs, results):
+        if result["status"] == "empty":
+            failed.append({"url": result["url"], "source": job["source"], "error": "no main content area"})
+            continue
+        status = result.pop("status")
+        if status == "unchanged":
+            unchanged += 1
+        else:
+            status = "updated" if job["content_hash"] else "new"
+        job.pop("scraper")
+        job.update(result, status=status)
+        records.append(job)
+
+    # The tree is this listing only: no leftovers from earlier runs or another scraper
+    removed = remove_stale_files(output_path, {record["file"] for record in records})
+
+    pages = len(records) + len(failed)
+    with timer.span("sitemap_write"):
+        write_listing_atomic(sitemap_file, {
+            "url": base_url,
+            "scraped_at": datetime.utcnow().isoformat() + "Z",
+            "scraper": SCRAPER,
+        }, "sections", iter(records), lambda: {
+            "total_sections": pages,
+            "scraped_sections": len(records),
+            "coverage": len(records) / pages if pages else 0,
+            "directories": sorted({record["file"].split("/")[0] for record in records}),
+            "failed_sections": failed,
+            "duplicate_sections": [],
+            "discovery": {
+                "mirror_files": len(html_files),
+                "skipped_other_host": skipped["other_host"],
+                "skipped_out_of_scope": skipped["out_of_scope"],
+                "skipped_same_file": skipped["same_file"],
+            },
+            "output_structure": "directory-tree",
+            "incremental": {
+                "enabled": incremental,
+                "unchanged_sections": unchanged,
+                "written_sections": len(records) - unchanged,
+            },
+            "httrack": {
+                "mirror": f"httrack/{host_path.name}",
+                "scope": {"netloc": parsed.netloc, "path_prefix": prefix},
+                "replaced": owner if owner not in (None, SCRAPER) else None,
+                "removed_files": removed,
+            },
+            "timings": timer.as_dict(),
+        })
+
+    convert_s = timer.as_dict()["stages"]["convert"]["total_ms"] / 1000
+    print(f"    Converted {len(records)}/{pages} pages in {convert_s:.2f}s "
+          f"({unchanged} unchanged, {len(failed)} without main content, {removed} stale files removed)",
+          file=sys.stderr)
+    print(f"    Saved to: {output_path}", file=sys.stderr)
+    print(f"    📊 Sitemap: {sitemap_file}", file=sys.stderr)
+    return bool(records)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="httrack_to_tree.py",
+        description="Convert an httrack mirror into the playwright markdown tree and sitemap.json"
+    )
+    parser.add_argument("url", help="URL httrack mirrored (e.g., https://nextjs.org/docs)")
+    parser.add_argument("output_dir", help="Domain output directory (holds httrack/)")
+    parser.add_argument("--scope-prefix", default=None, metavar="PATH",
+                        help="Only convert pages under this path (default: the URL's path)")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="Conversion processes (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Leave pages whose content is unchanged since the last sitemap.json untouched")
+    parser.add_argument("--no-dom-cache", dest="dom_cache", action="store_false",
+                        help="Don't save each page's main-content HTML to dom-cache/")
+    parser.add_argument("--replace", action="store_true",
+                        help="Overwrite a playwright/ tree and sitemap.json written by another scraper")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    success = httrack_to_tree(args.url, args.output_dir, scope_prefix=args.scope_prefix, workers=args.workers,
+                              incremental=args.incremental, dom_cache=args.dom_cache, replace=args.replace)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
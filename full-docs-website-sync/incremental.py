@@ -0,0 +1,97 @@
+"""
+Incremental re-scrape helpers shared by the full-docs-website-sync scrapers
+Content fingerprints and HTTP validators decide which output files need rewriting
+"""
+
+import hashlib
+import json
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+def content_hash(text: str) -> str:
+    """Stable fingerprint of extracted page content (frontmatter excluded)"""
+    return "sha256:" + hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def http_validators(headers) -> dict:
+    """
+    Pick the cache validators out of a response header mapping
+
+    Args:
+        headers: Header dict from Playwright or crawl4ai (keys in any case)
+
+    Returns:
+        Dict with etag and/or last_modified (empty if the server sent neither)
+    """
+    lowered = {k.lower(): v for k, v in (headers or {}).items()}
+    validators = {}
+    if lowered.get("etag"):
+        validators["etag"] = lowered["etag"]
+    if lowered.get("last-modified"):
+        validators["last_modified"] = lowered["last-modified"]
+    return validators
+
+
+def load_previous_records(json_file, list_key: str, record_key: str) -> dict:
+    """
+    Index the page records of a previous run by output file or URL
+
+    Args:
+        json_file: Previous sitemap.json / metadata.json (may not exist)
+        list_key: Key holding the list of page records (e.g., "sections")
+        record_key: Record field to index by (e.g., "file")
+
+    Returns:
+        Dict mapping record_key value -> record (empty on first run)
+    """
+    json_file = Path(json_file)
+    if not json_file.exists():
+        return {}
+
+    try:
+        with open(json_file) as f:
+            previous = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"    ⚠️  Ignoring unreadable {json_file.name}: {e}", file=sys.stderr)
+        return {}
+
+    return {
+        record[record_key]: record
+        for record in previous.get(list_key, [])
+        if isinstance(record, dict) and record.get(record_key)
+    }
+
+
+def is_unchanged(file_path, new_hash: str, previous: dict) -> bool:
+    """True if the previous run wrote this file with identical content"""
+    return bool(previous) and previous.get("content_hash") == new_hash and Path(file_path).exists()
+
+
+def check_not_modified(url: str, validators: dict, timeout: float = 15.0) -> bool:
+    """
+    Ask the server whether the document changed since the stored validators
+
+    Sends a conditional GET (If-None-Match / If-Modified-Since).
+
+    Returns:
+        True only if the server answered 304 Not Modified
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    if not headers:
+        return False
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return False
+    except urllib.error.HTTPError as e:
+        return e.code == 304
+    except (urllib.error.URLError, OSError):
+        return False
@@ -0,0 +1,42 @@
+"""
+Ownership of a domain's playwright/ tree, shared by the scrapers that write it
+sitemap.json names the scraper whose output the tree is; a scraper refuses to write
+over another one's tree unless told to replace it, and then deletes what it did not write
+"""
+
+import json
+import os
+from pathlib import Path
+
+from scan_index import scan_tree
+
+
+def tree_owner(output_dir: Path):
+    """
+    Scraper that wrote the domain's playwright/ tree, per sitemap.json
+
+    Returns:
+        Its sitemap scraper tag, "unknown" if playwright/ holds markdown but
+        there is no readable sitemap.json, or None if there is no tree yet
+    """
+    sitemap_file = output_dir / "sitemap.json"
+    if sitemap_file.exists():
+        try:
+            with open(sitemap_file, encoding='utf-8') as f:
+                return json.load(f).get("scraper", "unknown")
+        except (OSError, json.JSONDecodeError):
+            return "unknown"
+    return "unknown" if scan_tree(output_dir / "playwright", (".md",)) else None
+
+
+def remove_stale_files(output_path: Path, keep) -> int:
+    """Delete markdown files under output_path that are not in keep (and directories left empty)"""
+    removed = 0
+    for rel, _, _ in scan_tree(output_path, (".md",)):
+        if rel.replace(os.sep, '/') not in keep:
+            (output_path / rel).unlink()
+            removed += 1
+    for directory in sorted((p for p in output_path.rglob("*") if p.is_dir()), reverse=True):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
@@ -4,14 +4,23 @@ Playwright SPA scraper with directory tree output
 Uses browser automation to scrape hash-routed SPAs into navigable directory structure
 """
 
+import argparse
 import asyncio
-import json
 import sys
-import re
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 
+from browser_profile import LEAN_LAUNCH_ARGS, NetworkStats, allowed_domains_for, lean_context_options
+from content_similarity import DuplicateIndex, simhash
+from crawl_scope import parse_hash_url, sanitize_filename
+from dom_cache import DomCache
+from incremental import content_hash, http_validators, load_previous_records, is_unchanged
+from scraper_daemon import DEFAULT_SOCKET, run_job_via_daemon
+from section_log import CrawlCheckpoint, RecordLog, iter_records, logged_keys, sorted_records, write_listing_atomic
+from stage_timing import NO_TIMING, StageTimer
+
 try:
     from playwright.async_api import async_playwright
 except ImportError:
@@ -21,314 +30,961 @@ except ImportError:
     sys.exit(1)
 
 
-async def extract_navigation_links(page):
-    """Extract all unique navigation hash links from the page"""
-    result = await page.evaluate("""() => {
-        const navLinks = Array.from(document.querySelectorAll('nav a[href^="#"], a[href*="#s="]'));
-        const urls = [...new Set(navLinks.map(a => a.href))];
-        return urls;
-    }""")
-    return result
-
-
-async def get_main_content_text(page):
-    """Get the current main content text (for change detection)"""
-    return await page.evaluate("""() => {
-        const main = document.querySelector('main') ||
-                     document.querySelector('[role="main"]') ||
-                     document.querySelector('.content') ||
-                     document.querySelector('article');
+# In-page helpers, installed once per page with add_init_script() so each
+# section costs a single evaluate() round-trip (window.__kb.scrapeSection).
+#
+# fingerprint(): the main heading, falling back to the start of the main
+#   content area for pages without an h1 (used for change detection)
+# waitForRender(): resolves once the fingerprint differs from oldFingerprint
+#   and the DOM has been quiet for settleMs. Gives up early ('idle') when
+#   nothing mutates within idleMs, and unconditionally ('timeout') at timeoutMs.
+PAGE_HELPERS_JS = """(() => {
+    if (window.__kb) return;
+
+    function mainContent() {
+        return document.querySelector('main') ||
+               document.querySelector('[role="main"]') ||
+               document.querySelector('.content') ||
+               document.querySelector('article');
+    }
+
+    function fingerprint() {
+        const h1 = document.querySelector('main h1, article h1, .content h1');
+        if (h1) return h1.textContent.substring(0, 200);
+        const main = mainContent();
         return main ? main.textContent.substring(0, 500) : null;
-    }""")
-
-
-async def extract_main_content_markdown(page):
-    """Extract main content area and convert to clean markdown"""
-    content = await page.evaluate("""() => {
-        // Find the main content area (try multiple selectors)
-        const mainContent = document.querySelector('main') ||
-                          document.querySelector('[role="main"]') ||
-                          document.querySelector('.content') ||
-                          document.querySelector('article');
-
-        if (!mainContent) return null;
-
-        // Helper to convert DOM to markdown
-        function elementToMarkdown(element, level = 0) {
-            let result = '';
-
-            for (const node of element.childNodes) {
-                if (node.nodeType === Node.TEXT_NODE) {
+    }
+
+    // Helper to convert DOM to markdown
+    function elementToMarkdown(element, level = 0) {
+        let result = '';
+
+        for (const node of element.childNodes) {
+            if (node.nodeType === Node.TEXT_NODE) {
+                const text = node.textContent.trim();
+                if (text) result += text + ' ';
+            } else if (node.nodeType === Node.ELEMENT_NODE) {
+                const tag = node.tagName.toLowerCase();
+
+                // Handle different elements
+                if (tag.match(/^h[1-6]$/)) {
+                    const level = parseInt(tag[1]);
+                    const text = node.textContent.trim();
+                    result += '\\n\\n' + '#'.repeat(level) + ' ' + text + '\\n\\n';
+                } else if (tag === 'p') {
+                    result += '\\n\\n' + node.textContent.trim() + '\\n\\n';
+                } else if (tag === 'li') {
+                    result += '\\n  * ' + node.textContent.trim();
+                } else if (tag === 'ul' || tag === 'ol') {
+                    result += '\\n' + elementToMarkdown(node, level + 1);
+                } else if (tag === 'code') {
+                    result += '`' + node.textContent.trim() + '`';
+                } else if (tag === 'strong' || tag === 'b') {
+                    result += '**' + node.textContent.trim() + '**';
+                } else if (tag === 'em' || tag === 'i') {
+                    result += '*' + node.textContent.trim() + '*';
+                } else if (tag === 'a') {
                     const text = node.textContent.trim();
-                    if (text) result += text + ' ';
-                } else if (node.nodeType === Node.ELEMENT_NODE) {
-                    const tag = node.tagName.toLowerCase();
-
-                    // Handle different elements
-                    if (tag.match(/^h[1-6]$/)) {
-                        const level = parseInt(tag[1]);
-                        const text = node.textContent.trim();
-                        result += '\\n\\n' + '#'.repeat(level) + ' ' + text + '\\n\\n';
-                    } else if (tag === 'p') {
-                        result += '\\n\\n' + node.textContent.trim() + '\\n\\n';
-                    } else if (tag === 'li') {
-                        result += '\\n  * ' + node.textContent.trim();
-                    } else if (tag === 'ul' || tag === 'ol') {
-                        result += '\\n' + elementToMarkdown(node, level + 1);
-                    } else if (tag === 'code') {
-                        result += '`' + node.textContent.trim() + '`';
-                    } else if (tag === 'strong' || tag === 'b') {
-                        result += '**' + node.textContent.trim() + '**';
-                    } else if (tag === 'em' || tag === 'i') {
-                        result += '*' + node.textContent.trim() + '*';
-                    } else if (tag === 'a') {
-                        const text = node.textContent.trim();
-                        const href = node.getAttribute('href');
-                        if (href && !href.startsWith('#')) {
-                            result += '[' + text + '](' + href + ')';
-                        } else {
-                            result += text;
-                        }
-                    } else if (tag === 'pre') {
-                        const code = node.querySelector('code');
-                        const lang = code ? (code.className.match(/language-(\\w+)/) || ['', ''])[1] : '';
-                        result += '\\n\\n```' + lang + '\\n' + node.textContent.trim() + '\\n```\\n\\n';
-                    } else if (tag === 'blockquote') {
-                        const lines = node.textContent.trim().split('\\n');
-                        result += '\\n\\n' + lines.map(l => '> ' + l).join('\\n') + '\\n\\n';
-                    } else if (tag === 'img') {
-                        const alt = node.getAttribute('alt') || '';
-                        const src = node.getAttribute('src') || '';
-                        result += '![' + alt + '](' + src + ')';
+                    const href = node.getAttribute('href');
+                    if (href && !href.startsWith('#')) {
+                        result += '[' + text + '](' + href + ')';
                     } else {
-                        // For other elements, recurse
-                        result += elementToMarkdown(node, level);
+                        result += text;
                     }
+                } else if (tag === 'pre') {
+                    const code = node.querySelector('code');
+                    const lang = code ? (code.className.match(/language-(\\w+)/) || ['', ''])[1] : '';
+                    result += '\\n\\n```' + lang + '\\n' + node.textContent.trim() + '\\n```\\n\\n';
+                } else if (tag === 'blockquote') {
+                    const lines = node.textContent.trim().split('\\n');
+                    result += '\\n\\n' + lines.map(l => '> ' + l).join('\\n') + '\\n\\n';
+                } else if (tag === 'img') {
+                    const alt = node.getAttribute('alt') || '';
+                    const src = node.getAttribute('src') || '';
+                    result += '![' + alt + '](' + src + ')';
+                } else {
+                    // For other elements, recurse
+                    result += elementToMarkdown(node, level);
                 }
             }
+        }
 
-            return result;
+        return result;
+    }
+
+    function markdown() {
+        const main = mainContent();
+        if (!main) return null;
+        return elementToMarkdown(main).replace(/\\n{3,}/g, '\\n\\n').trim();
+    }
+
+    function navLinks() {
+        const anchors = Array.from(document.querySelectorAll(
+            'nav a[href^="#"], [role="navigation"] a[href^="#"], a[href*="#s="]'));
+        return [...new Set(anchors.map(a => a.href))];
+    }
+
+    function headings() {
+        const main = mainContent();
+        if (!main) return [];
+        return Array.from(main.querySelectorAll('h1, h2, h3, h4, h5, h6')).map(h => ({
+            level: parseInt(h.tagName[1]),
+            text: h.textContent.trim().substring(0, 200)
+        }));
+    }
+
+    // Click the nav link for this hash (proper SPA routing); fall back to setting the hash
+    function navigate(hash) {
+        const anchors = Array.from(document.querySelectorAll('a[href*="#"]'));
+        const exact = anchors.filter(a => a.getAttribute('href') === '#' + hash);
+        const target = exact.find(a => a.closest('nav')) || exact[0] ||
+                       anchors.find(a => a.href.includes('#' + hash));
+        if (target) {
+            target.click();
+            return true;
         }
+        window.location.hash = hash;
+        return false;
+    }
+
+    function waitForRender({oldFingerprint, settleMs, idleMs, timeoutMs}) {
+        return new Promise(resolve => {
+            const start = performance.now();
+            let changedAt = null;
+            let settleTimer = null;
+            let idleTimer = null;
+            let ceilingTimer = null;
+            let observer = null;
+
+            const finish = (reason) => {
+                if (observer) observer.disconnect();
+                clearTimeout(settleTimer);
+                clearTimeout(idleTimer);
+                clearTimeout(ceilingTimer);
+                resolve({
+                    reason,
+                    changed: changedAt !== null,
+                    change_ms: changedAt === null ? null : Math.round(changedAt - start),
+                    total_ms: Math.round(performance.now() - start)
+                });
+            };
+
+            const check = () => {
+                if (changedAt === null) {
+                    const current = fingerprint();
+                    if (current && current !== oldFingerprint) changedAt = performance.now();
+                }
+                if (changedAt !== null) {
+                    clearTimeout(settleTimer);
+                    settleTimer = setTimeout(() => finish('settled'), settleMs);
+                }
+            };
+
+            observer = new MutationObserver(() => {
+                clearTimeout(idleTimer);
+                check();
+            });
+            observer.observe(document.body || document.documentElement, {
+                childList: true, subtree: true, characterData: true
+            });
+            idleTimer = setTimeout(() => finish('idle'), idleMs);
+            ceilingTimer = setTimeout(() => finish('timeout'), timeoutMs);
+            check();
+        });
+    }
+
+    // The current view: what gets saved for a section (html: the main content's outerHTML, for the DOM cache)
+    function snapshot({html = false} = {}) {
+        const main = html ? mainContent() : null;
+        return {
+            fingerprint: fingerprint(),
+            markdown: markdown(),
+            links: navLinks(),
+            headings: headings(),
+            html: main ? main.outerHTML : null
+        };
+    }
+
+    // Everything one section needs, in a single round-trip (timing: ms spent in each phase)
+    async function scrapeSection({hash, settleMs, idleMs, timeoutMs, html}) {
+        const t0 = performance.now();
+        const oldFingerprint = fingerprint();
+        const clicked = navigate(hash);
+        const t1 = performance.now();
+        const wait = await waitForRender({oldFingerprint, settleMs, idleMs, timeoutMs});
+        const t2 = performance.now();
+        const view = snapshot({html});
+        const timing = {click_ms: t1 - t0, wait_ms: t2 - t1, extract_ms: performance.now() - t2};
+        return {clicked, old_fingerprint: oldFingerprint, wait, timing, ...view};
+    }
+
+    window.__kb = {fingerprint, markdown, navLinks, headings, navigate, waitForRender, snapshot, scrapeSection};
+})();"""
+
+# Defaults for the render wait engine (milliseconds)
+DEFAULT_WAIT_TIMEOUT_MS = 10000
+DEFAULT_SETTLE_MS = 300
+NO_MUTATION_IDLE_MS = 2000
+DEFAULT_RETRIES = 2          # extra attempts per failed section in one run
+DEFAULT_RETRY_BACKOFF_S = 2.0  # doubled after every failed attempt
+MAX_RETRY_BACKOFF_S = 60.0
+
+
+async def install_page_helpers(page):
+    """Install window.__kb on every document this page loads (call before goto)"""
+    await page.add_init_script(PAGE_HELPERS_JS)
 
-        return elementToMarkdown(mainContent).replace(/\\n{3,}/g, '\\n\\n').trim();
-    }""")
 
-    return content
+async def extract_navigation_links(page):
+    """Extract all unique navigation hash links from the page"""
+    return await page.evaluate("() => window.__kb.navLinks()")
 
 
-def parse_hash_url(url):
-    """Parse hash URL to extract section and subsection"""
-    # Example: https://repoprompt.com/docs#s=quick-start&ss=installation
-    parsed = urlparse(url)
+async def get_content_fingerprint(page):
+    """Get the current view fingerprint (for change detection)"""
+    return await page.evaluate("() => window.__kb.fingerprint()")
 
-    if not parsed.fragment:
-        return None, None
 
-    # Parse query params from hash
-    # Handle both #s=section&ss=subsection and #section-subsection formats
-    if '=' in parsed.fragment:
-        params = {}
-        for part in parsed.fragment.split('&'):
-            if '=' in part:
-                key, value = part.split('=', 1)
-                params[key] = value
+async def wait_for_render(page, old_fingerprint, timeout_ms, settle_ms, idle_ms=NO_MUTATION_IDLE_MS):
+    """
+    Wait until the view differs from old_fingerprint and the DOM settles
 
-        section = params.get('s', 'unknown')
-        subsection = params.get('ss', 'index')
-        return section, subsection
-    else:
-        # Simple hash like #overview
-        return parsed.fragment, 'index'
+    Uses a MutationObserver inside the page instead of fixed sleeps, so it
+    returns as soon as rendering finishes.
 
+    Args:
+        page: Playwright page
+        old_fingerprint: Fingerprint before navigation (None for initial load)
+        timeout_ms: Hard ceiling for the whole wait
+        settle_ms: How long the DOM must be quiet after the change
+        idle_ms: Give up early if the DOM does not mutate at all in this window
 
-def sanitize_filename(name):
-    """Convert section name to safe filename"""
-    # Replace special chars with hyphens
-    name = re.sub(r'[^\w\s-]', '', name)
-    name = re.sub(r'[-\s]+', '-', name)
-    return name.lower().strip('-')
+    Returns:
+        Dict with reason ('settled', 'idle' or 'timeout'), changed, change_ms, total_ms
+    """
+    return await page.evaluate("(opts) => window.__kb.waitForRender(opts)", {
+        "oldFingerprint": old_fingerprint,
+        "settleMs": settle_ms,
+        "idleMs": max(idle_ms, settle_ms),
+        "timeoutMs": timeout_ms,
+    })
 
 
-async def scrape_spa_to_tree(base_url: str, output_dir: str) -> bool:
+async def extract_main_content_markdown(page):
+    """Extract main content area and convert to clean markdown"""
+    return await page.evaluate("() => window.__kb.markdown()")
+
+
+async def navigate_and_extract(page, target_hash, timeout_ms, settle_ms, idle_ms=NO_MUTATION_IDLE_MS, html=False):
     """
-    Scrape SPA with hash routing into directory tree structure
+    Navigate to a hash route, wait for it to render and extract it in one round-trip
 
-    Args:
-        base_url: Website URL (e.g., https://repoprompt.com/docs)
-        output_dir: Output directory (e.g., /Users/MN/GITHUB/.knowledge/full-docs-website/repoprompt.com)
+    Returns:
+        Dict with clicked, old_fingerprint, fingerprint, wait, markdown,
+        links (hash links now on the page), headings, html (the main content
+        area's outerHTML if html is set, else None) and timing (in-page
+        milliseconds for click, wait and extract)
+    """
+    return await page.evaluate("(opts) => window.__kb.scrapeSection(opts)", {
+        "hash": target_hash,
+        "settleMs": settle_ms,
+        "idleMs": max(idle_ms, settle_ms),
+        "timeoutMs": timeout_ms,
+        "html": html,
+    })
+
+
+async def reload_and_extract(page, link, timeout_ms, settle_ms, html=False):
+    """
+    Load a section by full-page navigation to its URL instead of clicking through the SPA
+
+    Used when a click left the previous section's view in place. Going
+    through about:blank forces a real document load even though only the
+    hash differs.
 
     Returns:
-        True if successful, False otherwise
+        Same shape as navigate_and_extract (clicked is False)
     """
-    output_path = Path(output_dir) / "playwright"
-    output_path.mkdir(parents=True, exist_ok=True)
+    await page.goto("about:blank")
+    await page.goto(link, wait_until='domcontentloaded')
+    wait = await wait_for_render(page, None, timeout_ms, settle_ms, idle_ms=timeout_ms)
+    extracted = await page.evaluate("(opts) => window.__kb.snapshot(opts)", {"html": html})
+    return {"clicked": False, "old_fingerprint": None, "wait": wait, **extracted}
 
-    print(f"    Launching browser for Playwright scraping...", file=sys.stderr)
 
+@asynccontextmanager
+async def launch_or_reuse(browser=None, timer=NO_TIMING):
+    """Yield the given warm browser, or launch (and later close) a lean one"""
+    if browser is not None:
+        yield browser
+        return
+
+    print(f"    Launching browser for Playwright scraping...", file=sys.stderr)
+    started = timer.now()
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+        launched = await p.chromium.launch(headless=True, args=LEAN_LAUNCH_ARGS)
+        timer.add("browser_launch", started, timer.now() - started)
+        try:
+            yield launched
+        finally:
+            await launched.close()
 
-        # Navigate to base URL
-        print(f"    Navigating to {base_url}...", file=sys.stderr)
-        await page.goto(base_url, wait_until='domcontentloaded')
-        await page.wait_for_timeout(3000)  # Wait for React to render
 
-        # Extract all navigation links
-        print(f"    Extracting navigation links...", file=sys.stderr)
-        links = await extract_navigation_links(page)
-        unique_links = list(set(links))
+async def open_spa_page(context, base_url, timeout_ms, settle_ms, timer=NO_TIMING, track=0):
+    """
+    Open a new page in the given browser context and load the SPA
 
-        print(f"    Found {len(unique_links)} unique sections to scrape", file=sys.stderr)
+    Returns:
+        (page, wait, validators) where wait is the initial render wait result
+        and validators holds the document's ETag/Last-Modified headers
+    """
+    page = await context.new_page()
+    await install_page_helpers(page)
+    with timer.span("goto", track, url=base_url):
+        response = await page.goto(base_url, wait_until='domcontentloaded')
+    # Wait for React to render: any main content counts as a change from nothing
+    with timer.span("initial_render", track):
+        wait = await wait_for_render(page, None, timeout_ms, settle_ms, idle_ms=timeout_ms)
+    return page, wait, http_validators(response.headers if response else {})
+
+
+async def scrape_section(page, link, output_path, log, timeout_ms, settle_ms, previous_sections, on_links=None,
+                         duplicates=None, timer=NO_TIMING, track=0, dom_cache=None):
+    """
+    Navigate the SPA to one hash link and save its content as markdown
 
-        # Track scraped sections for sitemap
-        scraped_sections = []
-        section_dirs = set()
+    Args:
+        page: Playwright page already showing the SPA
+        link: Hash link to scrape (e.g., https://repoprompt.com/docs#s=quick-start)
+        output_path: Root of the playwright/ output tree
+        log: Callable that records a progress line for this section
+        timeout_ms: Ceiling for the render wait after navigating
+        settle_ms: How long the DOM must be quiet before extracting
+        previous_sections: Previous sitemap records by file (empty unless incremental)
+        on_links: Called with the hash links on the rendered section (for discovery)
+        duplicates: DuplicateIndex of the sections saved so far; content matching
+                    another section is reloaded once by direct navigation. A section
+                    that is still a copy is saved anyway: which of the two is the
+                    duplicate is decided in link order when the sitemap is built
+        timer: StageTimer for the click, render_wait, extract, reload and file_write spans
+        track: Trace row (worker number) the spans belong to
+        dom_cache: DomCache the section's main-content HTML is saved to (its key
+                   goes into the record as dom_hash); None to skip
 
-        # Visit each link and extract content
-        for i, link in enumerate(unique_links, 1):
-            print(f"    [{i}/{len(unique_links)}] Scraping: {link}", file=sys.stderr)
+    Returns:
+        Sitemap record dict, or None if nothing was extracted
+    """
+    # Extract the hash to find the corresponding nav link
+    parsed_url = urlparse(link)
+    target_hash = parsed_url.fragment
+
+    # APPROACH: Click the actual navigation link instead of using page.goto()
+    # This triggers the proper SPA routing that the app expects. The click, the
+    # render wait and the extraction all happen in one evaluate() call.
+    started = timer.now()
+    extracted = await navigate_and_extract(page, target_hash, timeout_ms, settle_ms, html=dom_cache is not None)
+    # The phases ran inside the page: lay them out from the start of the round-trip
+    phase_start = started
+    for stage, key in (("click", "click_ms"), ("render_wait", "wait_ms"), ("extract", "extract_ms")):
+        duration = extracted["timing"][key] / 1000
+        timer.add(stage, phase_start, duration, track, hash=target_hash)
+        phase_start += duration
+    wait = extracted["wait"]
+    old_content = extracted["old_fingerprint"]
+    if on_links:
+        on_links(extracted["links"])
+
+    if extracted["clicked"]:
+        log(f"      ✓ Clicked nav link for #{target_hash}")
+    else:
+        log(f"      ⚠️  Nav link not found, used direct navigation")
 
-            try:
-                # Extract the hash to find the corresponding nav link
-                parsed_url = urlparse(link)
-                target_hash = parsed_url.fragment
-
-                # Capture baseline content
-                old_content = await page.evaluate("""() => {
-                    const h1 = document.querySelector('main h1, article h1, .content h1');
-                    return h1 ? h1.textContent.substring(0, 200) : null;
-                }""")
-
-                # APPROACH: Find and click the actual navigation link instead of using page.goto()
-                # This triggers the proper SPA routing that the app expects
-                click_succeeded = await page.evaluate(f"""() => {{
-                    // Find the nav link with this exact hash
-                    const targetLink = document.querySelector('nav a[href="#{target_hash}"], a[href*="#{target_hash}"]');
-                    if (targetLink) {{
-                        targetLink.click();
-                        return true;
-                    }}
-                    return false;
-                }}""")
-
-                if click_succeeded:
-                    print(f"      ✓ Clicked nav link for #{target_hash}", file=sys.stderr)
-                else:
-                    print(f"      ⚠️  Nav link not found, trying direct navigation", file=sys.stderr)
-                    # Fallback to direct hash assignment
-                    await page.evaluate(f"() => {{ window.location.hash = '{target_hash}'; }}")
+    if wait["changed"]:
+        log(f"      ✓ Content updated after {wait['change_ms']}ms, settled after {wait['total_ms']}ms")
+    else:
+        reason = "no DOM activity" if wait["reason"] == "idle" else "timed out"
+        log(f"      ⚠️  WARNING: Content did not change after {wait['total_ms']}ms, {reason} (fingerprint: '{old_content[:50] if old_content else 'None'}...')")
+
+    content = extracted["markdown"]
+
+    if not content:
+        log(f"      ⚠️  No content found")
+        return None
+
+    # Parse URL to determine file path
+    section, subsection = parse_hash_url(link)
+
+    if not section:
+        log(f"      ⚠️  Could not parse section from {link}")
+        return None
+
+    section_dir = output_path / sanitize_filename(section)
+    filename = f"{sanitize_filename(subsection)}.md"
+    file_path = section_dir / filename
+    rel_file = f"{section_dir.name}/{filename}"
+    digest = content_hash(content)
+    fingerprint = simhash(content)
+
+    # A click that left the previous view in place would save a copy of another section
+    reloaded = False
+    if duplicates is not None:
+        duplicate_of, distance = duplicates.find(digest, fingerprint, exclude=rel_file)
+        if duplicate_of:
+            log(f"      ⚠️  Same content as {duplicate_of}, reloading by direct navigation")
+            with timer.span("reload", track, hash=target_hash):
+                extracted = await reload_and_extract(page, link, timeout_ms, settle_ms, html=dom_cache is not None)
+            reloaded = True
+            wait = extracted["wait"]
+            content = extracted["markdown"]
+            if not content:
+                log(f"      ⚠️  No content found after reload")
+                return None
+            digest = content_hash(content)
+            fingerprint = simhash(content)
+            duplicate_of, distance = duplicates.find(digest, fingerprint, exclude=rel_file)
+
+        if duplicate_of:
+            kind = "identical to" if distance == 0 else f"near-duplicate ({distance} bits) of"
+            log(f"      ⚠️  Still {kind} {duplicate_of}: the later one in link order is flagged in the sitemap")
+        elif reloaded:
+            log(f"      ✓ Reload produced distinct content")
+        duplicates.add(rel_file, digest, fingerprint)
+
+    # Create directory structure
+    section_dir.mkdir(exist_ok=True)
+    previous = previous_sections.get(rel_file, {})
+    snapshot = dom_cache.put(extracted["html"]) if dom_cache is not None and extracted["html"] else None
+
+    # Incremental: leave unchanged files untouched (bytes and mtime)
+    if is_unchanged(file_path, digest, previous):
+        status = "unchanged"
+        scraped_at = previous.get("scraped_at")
+        log(f"      = Unchanged, kept {rel_file}")
+    else:
+        status = "updated" if previous else "new"
+        scraped_at = datetime.utcnow().isoformat() + "Z"
 
-                # Wait for content to change
-                max_attempts = 20
-                content_changed = False
+        # Create frontmatter
+        frontmatter = f"""---
+source_url: {link}
+section: {section}
+subsection: {subsection}
+scraped_at: {scraped_at}
+scraper: playwright-spa
+---
 
-                for attempt in range(max_attempts):
-                    await page.wait_for_timeout(500)
+"""
 
-                    new_content = await page.evaluate("""() => {
-                        const h1 = document.querySelector('main h1, article h1, .content h1');
-                        return h1 ? h1.textContent.substring(0, 200) : null;
-                    }""")
+        # Write file
+        with timer.span("file_write", track, file=rel_file):
+            file_path.write_text(frontmatter + content, encoding='utf-8')
 
-                    if new_content and new_content != old_content:
-                        print(f"      ✓ Content updated after {(attempt + 1) * 500}ms (h1: '{new_content[:50]}...')", file=sys.stderr)
-                        content_changed = True
-                        break
+        log(f"      ✓ Saved to {rel_file}")
 
-                if not content_changed:
-                    print(f"      ⚠️  WARNING: Content did not change (h1: '{old_content[:50] if old_content else 'None'}...')", file=sys.stderr)
+    return {
+        "url": link,
+        "section": section,
+        "subsection": subsection,
+        "file": rel_file,
+        "size": len(content),
+        "content_hash": digest,
+        "simhash": None if fingerprint is None else f"{fingerprint:016x}",
+        "scraped_at": scraped_at,
+        "status": status,
+        "headings": extracted["headings"],
+        "dom_hash": snapshot,
+        "content_changed": wait["changed"],
+        "reloaded": reloaded,
+        "wait": wait
+    }
 
-                # Additional wait
-                await page.wait_for_timeout(500)
 
-                # Extract content
-                content = await extract_main_content_markdown(page)
+def retry_delay(attempts: int, backoff_s: float) -> float:
+    """Seconds to wait before the next attempt after `attempts` failures"""
+    return min(backoff_s * 2 ** (attempts - 1), MAX_RETRY_BACKOFF_S) if attempts else 0.0
 
-                if not content:
-                    print(f"      ⚠️  No content found", file=sys.stderr)
-                    continue
 
-                # Parse URL to determine file path
-                section, subsection = parse_hash_url(link)
+def section_key(link):
+    """Normalized (section, subsection) a hash link maps to; the link itself if it has no section"""
+    section, subsection = parse_hash_url(link)
+    if not section:
+        return link
+    return sanitize_filename(section), sanitize_filename(subsection)
 
-                if not section:
-                    print(f"      ⚠️  Could not parse section from {link}", file=sys.stderr)
-                    continue
 
-                # Create directory structure
-                section_dir = output_path / sanitize_filename(section)
-                section_dir.mkdir(exist_ok=True)
-                section_dirs.add(section_dir.name)
+def same_document(link, base_url):
+    """True if link is a hash route of the SPA document at base_url"""
+    a, b = urlparse(link), urlparse(base_url)
+    return (a.scheme, a.netloc, a.path.rstrip('/')) == (b.scheme, b.netloc, b.path.rstrip('/'))
 
-                # Create file
-                filename = f"{sanitize_filename(subsection)}.md"
-                file_path = section_dir / filename
 
-                # Create frontmatter
-                frontmatter = f"""---
-source_url: {link}
-section: {section}
-subsection: {subsection}
-scraped_at: {datetime.utcnow().isoformat()}Z
-scraper: playwright-spa
----
+class SectionFrontier:
+    """
+    Work queue of hash links, deduped on the (section, subsection) they map to
 
-"""
+    Seeded with the landing page's nav links; workers add the links found on
+    every rendered section, so nested sections are discovered during the
+    same pass that scrapes them. Done when the queue drains.
 
-                # Write file
-                file_path.write_text(frontmatter + content, encoding='utf-8')
+    Links are queued as workers find them, but each one also remembers where
+    it was found (seed position, or parent section and position among the
+    parent's links), and ordered() sorts on that: the order a serial run
+    discovers them in, whichever worker finished first.
+    """
 
-                # Track for sitemap
-                scraped_sections.append({
-                    "url": link,
-                    "section": section,
-                    "subsection": subsection,
-                    "file": f"{section_dir.name}/{filename}",
-                    "size": len(content)
-                })
+    def __init__(self, base_url, checkpoint):
+        self.base_url = base_url
+        self.checkpoint = checkpoint
+        self.links = []
+        self.keys = set()
+        # section key -> (parent section key or None for a seed, position)
+        self.origins = {}
+        self.seeds = 0
+        self.discovered = 0
+        self.queue = asyncio.Queue()
+
+    def sort_key(self, key):
+        """(depth, parent's sort key, position): breadth-first, siblings in their parent's link order"""
+        parent, position = self.origins[key]
+        if parent is None:
+            return (0, position)
+        parent_key = self.sort_key(parent)
+        return (parent_key[0] + 1, parent_key, position)
+
+    def add(self, links, parent=None):
+        """
+        Register links (seeds if parent is None, else found on the parent link's section)
+
+        A known section found again from a parent that sorts earlier is
+        re-parented there, as a serial run would have found it there first.
+
+        Returns:
+            [(index, link)] for the links not seen before
+        """
+        parent_key = section_key(parent) if parent is not None else None
+        added = []
+        for position, link in enumerate(links):
+            if parent is not None and not same_document(link, self.base_url):
+                continue
+            key = section_key(link)
+            if parent is None:
+                origin = (None, self.seeds)
+                self.seeds += 1
+            else:
+                origin = (parent_key, position)
+            if key in self.keys:
+                if parent is not None:
+                    found_from = self.sort_key(parent_key)
+                    if (found_from[0] + 1, found_from, position) < self.sort_key(key):
+                        self.origins[key] = origin
+                continue
+            self.keys.add(key)
+            self.origins[key] = origin
+            self.links.append(link)
+            added.append((len(self.links) - 1, link))
+        if added:
+            self.checkpoint.add_links([link for _, link in added])
+            if parent is not None:
+                self.discovered += len(added)
+        return added
+
+    def discover(self, links, parent):
+        """Queue links found on the parent link's section that no earlier page had"""
+        for i, link in self.add(links, parent):
+            self.queue.put_nowait((i, link, 0, 0, 0.0))
+
+    def ordered(self):
+        """Every link, in the order a serial run would discover them"""
+        return sorted(self.links, key=lambda link: self.sort_key(section_key(link)))
+
+    @property
+    def total(self):
+        return len(self.links)
+
+
+async def scrape_worker(context, base_url, frontier, section_log, checkpoint, output_path, timeout_ms,
+                        settle_ms, previous_sections, retries, backoff_s, duplicates=None, timer=NO_TIMING, track=1,
+                        dom_cache=None):
+    """
+    Pull links off the shared frontier and scrape them on a dedicated page
 
-                print(f"      ✓ Saved to {section_dir.name}/{filename}", file=sys.stderr)
+    Each worker owns its own page (and browser context), so SPA routing
+    state never leaks between workers. Records go straight to the section
+    log with their link index, so the sitemap keeps discovery order.
+    Links found on each rendered section are fed back into the frontier.
 
-            except Exception as e:
-                print(f"      ❌ Error: {e}", file=sys.stderr)
+    Every outcome is recorded in the checkpoint. A failed section goes back
+    to the end of the queue with exponential backoff until it has had
+    1 + retries attempts in this run. Runs until cancelled.
 
-        await browser.close()
+    Each section is one "section" span on the worker's trace row (track).
+    """
+    page, _, _ = await open_spa_page(context, base_url, timeout_ms, settle_ms, timer, track)
+    loop = asyncio.get_running_loop()
+    queue = frontier.queue
 
-        # Generate sitemap
-        sitemap = {
-            "url": base_url,
-            "scraped_at": datetime.utcnow().isoformat() + "Z",
-            "scraper": "playwright-spa",
-            "sections": scraped_sections,
-            "total_sections": len(unique_links),
-            "scraped_sections": len(scraped_sections),
-            "coverage": len(scraped_sections) / len(unique_links) if unique_links else 0,
-            "directories": sorted(list(section_dirs)),
-            "output_structure": "directory-tree"
-        }
+    try:
+        while True:
+            i, link, attempts, run_attempts, not_before = await queue.get()
+            try:
+                if not_before > loop.time():
+                    await asyncio.sleep(not_before - loop.time())
+
+                lines = [f"    [{i + 1}/{frontier.total}] Scraping: {link}" + (f" (attempt {attempts + 1})" if attempts else "")]
+                error = None
+                try:
+                    with timer.span("section", track, url=link, attempt=attempts + 1):
+                        record = await scrape_section(page, link, output_path, lines.append, timeout_ms, settle_ms,
+                                                      previous_sections,
+                                                      on_links=lambda links: frontier.discover(links, link),
+                                                      duplicates=duplicates, timer=timer, track=track,
+                                                      dom_cache=dom_cache)
+                    if record:
+                        section_log.append({"index": i, **record})
+                    else:
+                        error = "no content extracted"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    lines.append(f"      ❌ Error: {e}")
+                finally:
+                    # Print each section's log as one block so concurrent workers don't interleave
+                    print("\n".join(lines), file=sys.stderr)
+
+                attempts += 1
+                if error is None:
+                    checkpoint.mark(link, "done", attempts)
+                    continue
 
-        sitemap_file = Path(output_dir) / "sitemap.json"
-        with open(sitemap_file, 'w') as f:
-            json.dump(sitemap, f, indent=2)
+                checkpoint.mark(link, "failed", attempts, error)
+                if run_attempts < retries:
+                    delay = retry_delay(attempts, backoff_s)
+                    print(f"    [{i + 1}/{frontier.total}] Retrying {link} in {delay:.1f}s", file=sys.stderr)
+                    queue.put_nowait((i, link, attempts, run_attempts + 1, loop.time() + delay))
+
+                # A navigation error can leave the SPA in a bad state: start the next section on a fresh page
+                if error != "no content extracted":
+                    try:
+                        await page.close()
+                        page, _, _ = await open_spa_page(context, base_url, timeout_ms, settle_ms, timer, track)
+                    except Exception as e:
+                        print(f"    ❌ Worker could not reopen {base_url} ({e}); remaining sections stay pending", file=sys.stderr)
+                        return
+            finally:
+                queue.task_done()
+    finally:
+        await page.close()
+
+
+async def scrape_spa_to_tree(base_url: str, output_dir: str, concurrency: int = 1,
+                             wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+                             settle_ms: int = DEFAULT_SETTLE_MS,
+                             incremental: bool = False,
+                             block_resources: bool = True,
+                             allow_domains: list = None,
+                             browser=None,
+                             resume: bool = False,
+                             retries: int = DEFAULT_RETRIES,
+                             retry_backoff_s: float = DEFAULT_RETRY_BACKOFF_S,
+                             dedupe: bool = True,
+                             trace_file: str = None,
+                             dom_cache: bool = True) -> bool:
+    """
+    Scrape SPA with hash routing into directory tree structure
+
+    Args:
+        base_url: Website URL (e.g., https://repoprompt.com/docs)
+        output_dir: Output directory (e.g., /Users/MN/GITHUB/.knowledge/full-docs-website/repoprompt.com)
+        concurrency: Number of pages scraping sections in parallel (1 = serial)
+        wait_timeout_ms: Ceiling for each render wait (initial load and per section)
+        settle_ms: How long the DOM must be quiet before content is extracted
+        incremental: Only rewrite section files whose content hash changed since the last sitemap.json
+        block_resources: Abort image/media/font, tracker and third-party requests
+        allow_domains: Extra domains whose requests are not treated as third-party
+        browser: Already-running Playwright browser to reuse (e.g., from scraper_daemon.py);
+                 launched and closed here if None
+        resume: Continue from checkpoint.jsonl/sections.jsonl: skip done sections, retry failed ones
+        retries: Extra attempts per failed section in this run
+        retry_backoff_s: Delay before the first retry of a section, doubled per failed attempt
+        dedupe: Don't save sections whose content duplicates (exactly or nearly) an
+                already saved one; they are listed under duplicate_sections instead
+        trace_file: Also write every timing span as Chrome trace-event JSON here
+                    (per-stage aggregates always go to the sitemap's timings block)
+        dom_cache: Save each section's rendered main-content HTML to {output_dir}/dom-cache/
+                   (rebuild_tree.py re-converts the tree from it without a browser)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    output_path = Path(output_dir) / "playwright"
+    output_path.mkdir(parents=True, exist_ok=True)
+    sitemap_file = Path(output_dir) / "sitemap.json"
+    # Every scraped section is appended here as it finishes; sitemap.json is built from it
+    log_file = Path(output_dir) / "sections.jsonl"
+    # Discovered link set and per-link status (done/failed/pending) for --resume
+    checkpoint_file = Path(output_dir) / "checkpoint.jsonl"
+
+    previous_sections = {}
+    if incremental:
+        previous_sections = load_previous_records(sitemap_file, "sections", "file")
+        print(f"    Incremental mode: {len(previous_sections)} sections in previous sitemap", file=sys.stderr)
+
+    network = NetworkStats(allowed_domains_for(base_url, allow_domains), block=block_resources)
+    timer = StageTimer(trace=bool(trace_file))
+    snapshots = DomCache(output_dir) if dom_cache else None
+
+    async def new_lean_context():
+        with timer.span("context_open"):
+            context = await browser.new_context(**lean_context_options())
+            await network.install(context)
+        return context
+
+    checkpoint = CrawlCheckpoint(checkpoint_file, base_url, resume=resume)
+
+    # Content of every saved section, checked after each render to catch stale views
+    # (a resumed run includes earlier sections)
+    duplicates = DuplicateIndex() if dedupe else None
+    if duplicates is not None and resume:
+        for _, record in iter_records(log_file):
+            if record.get("status") != "duplicate" and record.get("content_hash"):
+                fingerprint = record.get("simhash")
+                duplicates.add(record["file"], record["content_hash"], int(fingerprint, 16) if fingerprint else None)
+
+    async with launch_or_reuse(browser, timer) as browser:
+        # Navigate to base URL
+        print(f"    Navigating to {base_url}...", file=sys.stderr)
+        landing_context = await new_lean_context()
+        page, initial_wait, validators = await open_spa_page(landing_context, base_url, wait_timeout_ms, settle_ms, timer)
+        print(f"    Initial render settled after {initial_wait['total_ms']}ms ({initial_wait['reason']})", file=sys.stderr)
 
-        print(f"    ✅ Playwright scraping complete!", file=sys.stderr)
-        print(f"    📁 Created {len(section_dirs)} directories, {len(scraped_sections)} files", file=sys.stderr)
-        print(f"    📊 Sitemap: {sitemap_file}", file=sys.stderr)
+        # Extract all navigation links
+        print(f"    Extracting navigation links...", file=sys.stderr)
+        with timer.span("nav_links"):
+            links = await extract_navigation_links(page)
+        # Dedupe while keeping document order so serial and concurrent runs agree;
+        # a resumed run keeps the checkpoint's order (including links discovered
+        # on sections) and appends anything new
+        frontier = SectionFrontier(base_url, checkpoint)
+        frontier.add(checkpoint.links)
+        frontier.add(links)
+        seed_links = frontier.total
+        await network.drain()
+        await landing_context.close()
+
+        # Resume: sections already done (checkpoint or section log) are not scraped again;
+        # failed ones go to the back of the queue after their backoff
+        done_links = logged_keys(log_file, "url") if resume else set()
+        loop = asyncio.get_running_loop()
+        fresh, retried = [], []
+        for i, link in enumerate(frontier.links):
+            if link in done_links or checkpoint.status(link) == "done":
+                continue
+            attempts = checkpoint.attempts(link)
+            item = (i, link, attempts, 0, loop.time() + retry_delay(attempts, retry_backoff_s))
+            (retried if checkpoint.status(link) == "failed" else fresh).append(item)
+        pending = fresh + retried
+
+        # Sections can reveal more sections, so use every worker even if the seed list is short
+        workers = concurrency if pending else 0
+        print(f"    Found {frontier.total} unique sections to scrape ({workers} worker(s))", file=sys.stderr)
+        if resume:
+            print(f"    Resuming: {frontier.total - len(pending)} sections done, "
+                  f"{len(retried)} failed to retry, {len(fresh)} pending", file=sys.stderr)
+
+        # Fan the links out to the workers; each gets its own context for isolated SPA state
+        for item in pending:
+            frontier.queue.put_nowait(item)
+
+        with checkpoint, RecordLog(log_file, resume=resume) as section_log:
+            contexts = [await new_lean_context() for _ in range(workers)]
+            for track in range(1, workers + 1):
+                timer.name_track(track, f"worker {track}")
+            tasks = [
+                asyncio.ensure_future(scrape_worker(
+                    context, base_url, frontier, section_log, checkpoint, output_path,
+                    wait_timeout_ms, settle_ms, previous_sections, retries, retry_backoff_s, duplicates,
+                    timer, track, snapshots))
+                for track, context in enumerate(contexts, start=1)
+            ]
+            if tasks:
+                # Done when the frontier is empty and nothing is in flight (or every worker died)
+                drained = asyncio.ensure_future(frontier.queue.join())
+                await asyncio.wait([drained, asyncio.gather(*tasks, return_exceptions=True)],
+                                   return_when=asyncio.FIRST_COMPLETED)
+                drained.cancel()
+                for task in tasks:
+                    task.cancel()
+                for result in await asyncio.gather(*tasks, return_exceptions=True):
+                    if isinstance(result, Exception):
+                        print(f"    ❌ Worker failed: {result}", file=sys.stderr)
+
+            await network.drain()
+            for context in contexts:
+                await context.close()
+
+        if frontier.discovered:
+            print(f"    🔎 Discovered {frontier.discovered} sections beyond the {seed_links} seed links", file=sys.stderr)
+
+    # Build the sitemap from the section log (in link order, regardless of finish order)
+    failed_sections = checkpoint.failures()
+    link_order = {link: i for i, link in enumerate(frontier.ordered())}
+    totals = {"sections": 0, "unchanged": 0, "wait_ms": 0, "no_change": 0, "reloaded": 0}
+    section_dirs = set()
+    duplicate_sections = []
+    # Duplicates are decided here, in link order, so the same section is kept whichever worker finished first
+    kept = DuplicateIndex() if dedupe else None
+
+    def sitemap_sections():
+        for record in sorted_records(log_file, "url", lambda r: link_order.get(r["url"], r["index"])):
+            record.pop("index", None)
+            # Records static_scraper.py logged here before it had its own log have no render wait
+            totals["wait_ms"] += record.get("wait", {}).get("total_ms", 0)
+            totals["reloaded"] += record.get("reloaded", False)
+            if kept is not None and record["status"] != "duplicate":
+                fingerprint = int(record["simhash"], 16) if record.get("simhash") else None
+                duplicate_of, distance = kept.find(record["content_hash"], fingerprint, exclude=record["file"])
+                if duplicate_of:
+                    # Also removes the file an earlier run saved before this section became a duplicate
+                    (output_path / record["file"]).unlink(missing_ok=True)
+                    record.update(status="duplicate", duplicate_of=duplicate_of, simhash_distance=distance)
+                else:
+                    kept.add(record["file"], record["content_hash"], fingerprint)
+            if record["status"] == "duplicate":
+                duplicate_sections.append({key: record[key] for key in
+                                           ("url", "file", "duplicate_of", "simhash_distance", "reloaded")})
+                continue
+            totals["sections"] += 1
+            totals["unchanged"] += record["status"] == "unchanged"
+            totals["no_change"] += not record.get("content_changed", True)
+            section_dirs.add(record["file"].split("/")[0])
+            yield record
+
+    def sitemap_tail():
+        return {
+            "total_sections": frontier.total,
+            "scraped_sections": totals["sections"],
+            "coverage": totals["sections"] / frontier.total if frontier.total else 0,
+            "directories": sorted(section_dirs),
+            "failed_sections": failed_sections,
+            "duplicate_sections": duplicate_sections,
+            "dedupe": {
+                "enabled": dedupe,
+                "reloaded_sections": totals["reloaded"],
+                "duplicate_sections": len(duplicate_sections)
+            },
+            "discovery": {
+                "seed_links": seed_links,
+                "discovered_links": frontier.discovered
+            },
+            "output_structure": "directory-tree",
+            "http_validators": validators,
+            "incremental": {
+                "enabled": incremental,
+                "unchanged_sections": totals["unchanged"],
+                "written_sections": totals["sections"] - totals["unchanged"]
+            },
+            "network": network.as_dict(),
+            "timings": timer.as_dict(),
+            "waits": {
+                "timeout_ms": wait_timeout_ms,
+                "settle_ms": settle_ms,
+                "initial_render_ms": initial_wait["total_ms"],
+                "section_total_ms": totals["wait_ms"],
+                "unchanged_sections": totals["no_change"]
+            }
+        }
 
-        return True
+    with timer.span("sitemap_write"):
+        write_listing_atomic(sitemap_file, {
+            "url": base_url,
+            "scraped_at": datetime.utcnow().isoformat() + "Z",
+            "scraper": "playwright-spa",
+        }, "sections", sitemap_sections(), sitemap_tail)
+    if trace_file:
+        timer.write_trace(trace_file, f"playwright {base_url}")
+
+    print(f"    ✅ Playwright scraping complete!", file=sys.stderr)
+    print(f"    📁 Created {len(section_dirs)} directories, {totals['sections']} files", file=sys.stderr)
+    if failed_sections:
+        print(f"    ⚠️  {len(failed_sections)} sections failed (see failed_sections; rerun with --resume to retry)", file=sys.stderr)
+    if duplicate_sections:
+        print(f"    ⚠️  {len(duplicate_sections)} sections duplicated an earlier section and were not kept "
+              f"(see duplicate_sections)", file=sys.stderr)
+    if incremental:
+        print(f"    ♻️  {totals['unchanged']} unchanged, {totals['sections'] - totals['unchanged']} rewritten", file=sys.stderr)
+    print(f"    🌐 {network.bytes_transferred:,} bytes transferred, {network.blocked} requests blocked", file=sys.stderr)
+    print(f"    📊 Sitemap: {sitemap_file} (section log: {log_file.name})", file=sys.stderr)
+    if trace_file:
+        print(f"    ⏱️  Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
+
+    return True
 
 
 def main():
     """CLI entry point"""
-    if len(sys.argv) != 3:
-        print("Usage: playwright_scraper.py <url> <output_dir>", file=sys.stderr)
-        sys.exit(1)
-
-    url = sys.argv[1]
-    output_dir = sys.argv[2]
-
-    success = asyncio.run(scrape_spa_to_tree(url, output_dir))
+    parser = argparse.ArgumentParser(
+        prog="playwright_scraper.py",
+        description="Scrape a hash-routed SPA into a markdown directory tree"
+    )
+    parser.add_argument("url", help="Website URL (e.g., https://repoprompt.com/docs)")
+    parser.add_argument("output_dir", help="Domain output directory")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of browser pages scraping sections in parallel (default: 1)")
+    parser.add_argument("--wait-timeout", type=int, default=DEFAULT_WAIT_TIMEOUT_MS, metavar="MS",
+                        help=f"Ceiling for each render wait in ms (default: {DEFAULT_WAIT_TIMEOUT_MS})")
+    parser.add_argument("--settle-ms", type=int, default=DEFAULT_SETTLE_MS, metavar="MS",
+                        help=f"DOM quiet period that counts as rendered, in ms (default: {DEFAULT_SETTLE_MS})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rewrite sections whose content changed since the last sitemap.json")
+    parser.add_argument("--no-block-resources", dest="block_resources", action="store_false",
+                        help="Load images, fonts, media and third-party requests")
+    parser.add_argument("--allow-domain", action="append", default=[], metavar="DOMAIN",
+                        help="Domain to treat as first-party when blocking (repeatable)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from checkpoint.jsonl: skip done sections, retry failed ones")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, metavar="N",
+                        help=f"Extra attempts per failed section (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--retry-backoff", type=float, default=DEFAULT_RETRY_BACKOFF_S, metavar="SECONDS",
+                        help=f"Delay before the first retry, doubled per attempt (default: {DEFAULT_RETRY_BACKOFF_S})")
+    parser.add_argument("--keep-duplicates", dest="dedupe", action="store_false",
+                        help="Save sections even if their content duplicates another section")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write per-stage timing spans as Chrome trace-event JSON (chrome://tracing)")
+    parser.add_argument("--no-dom-cache", dest="dom_cache", action="store_false",
+                        help="Don't save each section's main-content HTML to dom-cache/")
+    parser.add_argument("--daemon", nargs="?", const=str(DEFAULT_SOCKET), default=None, metavar="SOCKET",
+                        help="Run the job on a warm scraper_daemon.py (falls back to in-process if none is running)")
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    if args.wait_timeout < 1 or args.settle_ms < 0:
+        parser.error("--wait-timeout must be positive and --settle-ms non-negative")
+
+    if args.retries < 0 or args.retry_backoff < 0:
+        parser.error("--retries and --retry-backoff must be non-negative")
+
+    options = {
+        "concurrency": args.concurrency,
+        "wait_timeout_ms": args.wait_timeout,
+        "settle_ms": args.settle_ms,
+        "incremental": args.incremental,
+        "block_resources": args.block_resources,
+        "allow_domains": args.allow_domain,
+        "resume": args.resume,
+        "retries": args.retries,
+        "retry_backoff_s": args.retry_backoff,
+        "dedupe": args.dedupe,
+        "trace_file": str(Path(args.trace).resolve()) if args.trace else None,
+        "dom_cache": args.dom_cache,
+    }
+
+    if args.daemon:
+        success = run_job_via_daemon(args.daemon, "playwright", args.url, args.output_dir, options)
+        if success is not None:
+            sys.exit(0 if success else 1)
+
+    success = asyncio.run(scrape_spa_to_tree(args.url, args.output_dir, **options))
     sys.exit(0 if success else 1)
 
 
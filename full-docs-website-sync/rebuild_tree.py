@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Rebuild a domain's markdown tree from its DOM cache, without recrawling
+Every page a scraper saved a main-content snapshot for (dom_hash in its listing) is
+re-converted with html_markdown across a process pool, so converter fixes reach
+existing output without launching a browser
+
+Sources:
+  playwright  sitemap.json sections (playwright and static scrapers); rewrites playwright/ in place
+  crawl4ai    crawl4ai/metadata.json pages (--crawl mode); writes a playwright-style tree to
+              crawl4ai/tree/ and its listing to crawl4ai/tree.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from content_similarity import simhash
+from crawl_scope import path_section, sanitize_filename
+from dom_cache import DomCache
+from html_markdown import convert_main_html
+from incremental import content_hash, is_unchanged, load_previous_records
+from section_log import write_json_atomic, write_listing_atomic
+
+CHUNK_SIZE = 64
+
+
+def write_page(output_dir, job: dict, converted: dict) -> dict:
+    """
+    Write a converted page into a playwright-style tree, unless the file already holds it
+
+    Args:
+        output_dir: Tree root the job's file is relative to
+        job: Page record with url, section, subsection, file, scraped_at and scraper
+             (the frontmatter), and content_hash of the file on disk if known
+        converted: Dict with the page's markdown and headings
+
+    Returns:
+        Dict with status (written or unchanged), size, content_hash, simhash and headings
+    """
+    content = converted["markdown"]
+    file_path = Path(output_dir) / job["file"]
+    digest = content_hash(content)
+    fingerprint = simhash(content)
+    if is_unchanged(file_path, digest, job):
+        status = "unchanged"
+    else:
+        status = "written"
+        frontmatter = f"""---
+source_url: {job['url']}
+section: {job['section']}
+subsection: {job['subsection']}
+scraped_at: {job['scraped_at']}
+scraper: {job['scraper']}
+---
+
+"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(frontmatter + content, encoding='utf-8')
+
+    return {
+        "status": status,
+        "size": len(content),
+        "content_hash": digest,
+        "simhash": None if fingerprint is None else f"{fingerprint:016x}",
+        "headings": converted["headings"],
+    }
+
+
+def rebuild_page(domain_dir: str, output_dir: str, job: dict) -> dict:
+    """
+    Convert one cached snapshot and rewrite its markdown file if the content changed
+
+    Top-level so it can run in a process pool.
+
+    Args:
+        domain_dir: Domain directory holding dom-cache/
+        output_dir: Tree root the job's file is relative to
+        job: Page record (url, section, subsection, file, scraped_at, dom_hash,
+             content_hash of the file on disk) plus the scraper name for the frontmatter
+
+    Returns:
+        write_page()'s dict, or just a status of missing (snapshot not in
+        the cache) or empty (no markdown)
+    """
+    try:
+        snapshot = DomCache(domain_dir).get(job["dom_hash"])
+    except FileNotFoundError:
+        return {"status": "missing"}
+    converted = convert_main_html(snapshot)
+    if not converted["markdown"]:
+        return {"status": "empty"}
+    return write_page(output_dir, job, converted)
+
+
+def playwright_jobs(listing: dict) -> list:
+    """Jobs for every sitemap.json section with a snapshot (static pages keep their static-{renderer} tag)"""
+    jobs = []
+    for record in listing.get("sections", []):
+        if record.get("dom_hash"):
+            scraper = f"static-{record['renderer']}" if record.get("renderer") else listing.get("scraper", "playwright-spa")
+            jobs.append(dict(record, scraper=scraper))
+    return jobs
+
+
+def crawl4ai_jobs(listing: dict, previous_sections: dict):
+    """
+    Map crawl4ai pages onto the playwright layout ({section}/{subsection}.md from the URL path)
+
+    Returns:
+        (jobs, skipped) where skipped counts pages whose file an earlier page already took
+    """
+    prefix = (listing.get("scope") or {}).get("path_prefix", "")
+    jobs = []
+    claimed = set()
+    skipped = 0
+    for page in listing.get("pages", []):
+        if not page.get("dom_hash"):
+            continue
+        section, subsection = path_section(page["url"], prefix)
+        rel_file = f"{sanitize_filename(section)}/{sanitize_filename(subsection) or 'index'}.md"
+        if rel_file in claimed:
+            skipped += 1
+            continue
+        claimed.add(rel_file)
+        previous = previous_sections.get(rel_file, {})
+        jobs.append({
+            "url": page["url"],
+            "section": section,
+            "subsection": subsection,
+            "file": rel_file,
+            "scraped_at": page.get("scraped_at"),
+            "dom_hash": page["dom_hash"],
+            "content_hash": previous.get("content_hash"),
+            "scraper": listing.get("scraper", "crawl4ai-crawl"),
+        })
+    return jobs, skipped
+
+
+def referenced_snapshots(domain_dir) -> set:
+    """Every dom_hash the domain's sitemap.json and crawl4ai/metadata.json still reference"""
+    keep = set()
+    for listing_file, list_key in ((Path(domain_dir) / "sitemap.json", "sections"),
+                                   (Path(domain_dir) / "crawl4ai" / "metadata.json", "pages")):
+        if not listing_file.exists():
+            continue
+        with open(listing_file, encoding='utf-8') as f:
+            listing = json.load(f)
+        keep.update(record["dom_hash"] for record in listing.get(list_key, []) if record.get("dom_hash"))
+        if listing.get("dom_hash"):
+            keep.add(listing["dom_hash"])
+    return keep
+
+
+def rebuild_tree(domain_dir: str, source: str = "playwright", workers: int = None, prune: bool = False) -> bool:
+    """
+    Re-convert every cached snapshot of a domain into its markdown tree
+
+    Args:
+        domain_dir: Domain output directory (holds dom-cache/ and the scraper output)
+        source: "playwright" (sitemap.json, rewrites playwright/) or "crawl4ai"
+                (crawl4ai/metadata.json, writes crawl4ai/tree/ and crawl4ai/tree.json)
+        workers: Conversion processes (default: CPU count)
+        prune: Afterwards, delete snapshots no listing references any more
+
+    Returns:
+        True if the tree was rebuilt, False otherwise
+    """
+    domain_path = Path(domain_dir)
+    if source == "playwright":
+        listing_file = domain_path / "sitemap.json"
+        output_path = domain_path / "playwright"
+    else:
+        listing_file = domain_path / "crawl4ai" / "metadata.json"
+        output_path = domain_path / "crawl4ai" / "tree"
+        tree_file = domain_path / "crawl4ai" / "tree.json"
+
+    if not listing_file.exists():
+        print(f"ERROR: {listing_file} not found", file=sys.stderr)
+        return False
+    with open(listing_file, encoding='utf-8') as f:
+        listing = json.load(f)
+
+    skipped = 0
+    if source == "playwright":
+        jobs = playwright_jobs(listing)
+    elif "pages" not in listing:
+        print(f"ERROR: {listing_file} is not a --crawl listing (no pages)", file=sys.stderr)
+        return False
+    else:
+        jobs, skipped = crawl4ai_jobs(listing, load_previous_records(tree_file, "sections", "file"))
+    if not jobs:
+        print(f"ERROR: No page in {listing_file.name} has a DOM snapshot (scraped with --no-dom-cache?)", file=sys.stderr)
+        return False
+
+    print(f"    Rebuilding {len(jobs)} pages from {domain_path / 'dom-cache'}...", file=sys.stderr)
+    start = time.monotonic()
+    convert = partial(rebuild_page, str(domain_path), str(output_path))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(convert, jobs, chunksize=CHUNK_SIZE))
+    elapsed = time.monotonic() - start
+
+    totals = {"written": 0, "unchanged": 0, "missing": 0, "empty": 0}
+    rebuilt_at = datetime.utcnow().isoformat() + "Z"
+    records = []
+    for job, result in zip(jobs, results):
+        status = result.pop("status")
+        totals[status] += 1
+        if status in ("missing", "empty"):
+            print(f"      ⚠️  {'Snapshot not cached' if status == 'missing' else 'No content'}: {job['url']}", file=sys.stderr)
+            continue
+        job.update(result)
+        records.append(job)
+
+    summary = {"rebuilt_at": rebuilt_at, "source": listing_file.name, **totals, "seconds": round(elapsed, 3)}
+    if source == "playwright":
+        # Update the converted fields in place; crawl status, timings etc. describe the crawl and stay
+        updated = {record["file"]: record for record in records}
+        for record in listing["sections"]:
+            if record["file"] in updated:
+                for key in ("size", "content_hash", "simhash", "headings"):
+                    record[key] = updated[record["file"]][key]
+        listing["rebuild"] = summary
+        write_json_atomic(listing_file, listing)
+    else:
+        for record in records:
+            record.pop("scraper")
+        write_listing_atomic(tree_file, {
+            "url": listing.get("url"),
+            "scraped_at": listing.get("scraped_at"),
+            "scraper": listing.get("scraper", "crawl4ai-crawl"),
+        }, "sections", iter(records), lambda: {
+            "total_sections": len(records),
+            "scraped_sections": len(records),
+            "directories": sorted({record["file"].split("/")[0] for record in records}),
+            "skipped_same_file": skipped,
+            "output_structure": "directory-tree",
+            "rebuild": summary,
+        })
+
+    print(f"    Rebuilt {len(jobs)} pages in {elapsed:.2f}s: {totals['written']} rewritten, "
+          f"{totals['unchanged']} unchanged, {totals['missing']} not cached, {totals['empty']} empty", file=sys.stderr)
+    print(f"    Saved to: {output_path}", file=sys.stderr)
+
+    if prune:
+        removed = DomCache(domain_path).prune(referenced_snapshots(domain_path))
+        print(f"    Pruned {removed} unreferenced snapshots", file=sys.stderr)
+
+    return bool(records)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="rebuild_tree.py",
+        description="Rebuild a domain's markdown tree from its DOM cache (no browser, no network)"
+    )
+    parser.add_argument("domain_dir", help="Domain output directory (e.g., ~/.knowledge/full-docs-website/nextjs.org)")
+    parser.add_argument("--source", choices=("playwright", "crawl4ai"), default="playwright",
+                        help="Listing to rebuild: sitemap.json (default) or crawl4ai/metadata.json")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="Conversion processes (default: CPU count)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete snapshots no listing references any more")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    success = rebuild_tree(args.domain_dir, source=args.source, workers=args.workers, prune=args.prune)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Parallel file scan with a cached per-file index for validate_scrapers.py
+Stats are gathered with os.scandir workers; per-file derived data is only recomputed
+when a file's (size, mtime) changed since the last scan
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from section_log import write_json_atomic
+
+INDEX_FILE = ".scan-index.json"
+# Bumped when a cached kind is computed differently (2: MinHash densification offsets)
+INDEX_VERSION = 2
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Below this many changed files a process pool costs more than it saves
+MIN_PARALLEL_COMPUTE = 64
+
+
+def _scan_dir(path: str, suffixes: tuple, skip_prefixes: tuple):
+    """One directory level: ([(path, size, mtime_ns)], [subdirectory paths])"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith(skip_prefixes):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(suffixes) and entry.is_file():
+                    st = entry.stat()
+                    files.append((entry.path, st.st_size, st.st_mtime_ns))
+    except OSError as e:
+        print(f"    ⚠️  Cannot scan {path}: {e}", file=sys.stderr)
+    return files, subdirs
+
+
+def scan_tree(root, suffixes, skip_prefixes=(), workers: int = DEFAULT_SCAN_WORKERS) -> list:
+    """
+    Find files under root by suffix, stat'ing directories in parallel
+
+    Args:
+        root: Directory to scan (missing = no files)
+        suffixes: File name endings to keep (e.g., (".html",))
+        skip_prefixes: File/directory names starting with these are skipped (e.g., ("hts-",))
+        workers: Threads running os.scandir
+
+    Returns:
+        Sorted list of (path relative to root, size, mtime_ns)
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return []
+
+    suffixes, skip_prefixes = tuple(suffixes), tuple(skip_prefixes)
+    found = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir, str(root), suffixes, skip_prefixes)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                found.extend(files)
+                pending.update(pool.submit(_scan_dir, d, suffixes, skip_prefixes) for d in subdirs)
+
+    prefix_len = len(str(root)) + 1
+    return sorted((path[prefix_len:], size, mtime) for path, size, mtime in found)
+
+
+class ScanIndex:
+    """
+    Per-file derived data cached by (size, mtime_ns), stored in <domain>/.scan-index.json
+
+    Entries are namespaced by kind (e.g., "markdown_stats") so one file can carry
+    several independently computed values. Pass a shared process pool when
+    several indexes are used from threads at once (validate_scrapers.py --all):
+    each get_many() would otherwise start its own.
+    """
+
+    def __init__(self, domain_dir, pool=None):
+        self.path = Path(domain_dir) / INDEX_FILE
+        self.pool = pool
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    self.entries = data.get("files", {})
+            except (OSError, json.JSONDecodeError):
+                pass  # rebuilt from scratch
+
+    def get(self, rel_path: str, size: int, mtime_ns: int, kind: str, compute):
+        """
+        Cached value of compute() for this file, recomputed if the file changed
+
+        Args:
+            rel_path: Path relative to the domain directory (the index key)
+            size, mtime_ns: Current stat of the file
+            kind: Name of the derived value
+            compute: Zero-argument callable producing a JSON-serializable value
+        """
+        entry = self.entries.get(rel_path)
+        if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            entry = {"size": size, "mtime_ns": mtime_ns}
+            self.entries[rel_path] = entry
+        if kind in entry:
+            self.hits += 1
+            return entry[kind]
+
+        self.misses += 1
+        entry[kind] = compute()
+        self._dirty = True
+        return entry[kind]
+
+    def get_many(self, items, kind: str, compute, *args) -> dict:
+        """
+        Cached values for many files; changed files are recomputed in a process pool
+        (the shared one if the index has one)
+
+        Args:
+            items: Iterable of (rel_path, abs_path, size, mtime_ns)
+            kind: Name of the derived value
+            compute: Module-level function called as compute(abs_path, *args)
+
+        Returns:
+            Dict rel_path -> value
+        """
+        values, todo = {}, []
+        for rel_path, abs_path, size, mtime_ns in items:
+            entry = self.entries.get(rel_path)
+            if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+                entry = {"size": size, "mtime_ns": mtime_ns}
+                self.entries[rel_path] = entry
+            if kind in entry:
+                values[rel_path] = entry[kind]
+            else:
+                todo.append((rel_path, abs_path))
+
+        self.hits += len(values)
+        self.misses += len(todo)
+        if not todo:
+            return values
+
+        paths = [abs_path for _, abs_path in todo]
+        arg_lists = [[a] * len(paths) for a in args]
+        if len(todo) >= MIN_PARALLEL_COMPUTE and (os.cpu_count() or 1) > 1:
+            if self.pool is not None:
+                results = list(self.pool.map(compute, paths, *arg_lists, chunksize=32))
+            else:
+                with ProcessPoolExecutor() as pool:
+                    results = list(pool.map(compute, paths, *arg_lists, chunksize=32))
+        else:
+            results = [compute(path, *args) for path in paths]
+
+        for (rel_path, _), value in zip(todo, results):
+            self.entries[rel_path][kind] = value
+            values[rel_path] = value
+        self._dirty = True
+        return values
+
+    def prune(self, live_paths):
+        """Drop entries for files that no longer exist"""
+        live = set(live_paths)
+        stale = [path for path in self.entries if path not in live]
+        for path in stale:
+            del self.entries[path]
+        self._dirty = self._dirty or bool(stale)
+
+    def save(self):
+        if self._dirty:
+            write_json_atomic(self.path, {"version": INDEX_VERSION, "files": self.entries})
+            self._dirty = False
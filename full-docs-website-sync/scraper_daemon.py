@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Long-lived scraper service that keeps a warm browser between scrape jobs
+playwright_scraper.py and crawl4ai_scraper.py become thin clients with --daemon
+
+Protocol: one JSON request line per Unix socket connection, one JSON reply line.
+  {"scraper": "playwright", "url": ..., "output_dir": ..., "options": {...}}
+  {"scraper": "crawl4ai", "url": ..., "output_dir": ..., "options": {"crawl": true, ...}}
+  {"command": "status"} / {"command": "shutdown"}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_SOCKET = Path(os.environ.get(
+    "SCRAPER_DAEMON_SOCKET",
+    Path.home() / ".cache" / "knowledge-builder" / "scraper.sock"
+))
+DEFAULT_MAX_JOBS = 2
+
+
+def submit_job(socket_path, request: dict, timeout: float = None):
+    """
+    Send one request to the daemon and wait for its reply
+
+    Args:
+        socket_path: Daemon Unix socket
+        request: Job or command dict (see module docstring)
+        timeout: Seconds to wait for the reply (None = wait for the job to finish)
+
+    Returns:
+        Reply dict, or None if no daemon is listening on socket_path
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError, OSError):
+        sock.close()
+        return None
+
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+
+    try:
+        return json.loads(reply.decode('utf-8')) if reply else {"ok": False, "error": "daemon closed the connection"}
+    except json.JSONDecodeError:
+        return {"ok": False, "error": "unreadable reply from daemon"}
+
+
+def run_job_via_daemon(socket_path, scraper: str, url: str, output_dir: str, options: dict):
+    """
+    Thin-client entry point used by the scraper CLIs
+
+    Returns:
+        True/False for the job result, or None if the daemon is not running
+        (callers then fall back to scraping in-process)
+    """
+    reply = submit_job(socket_path, {
+        "scraper": scraper,
+        "url": url,
+        # The daemon has its own working directory
+        "output_dir": str(Path(output_dir).resolve()),
+        "options": options,
+    })
+    if reply is None:
+        print(f"    ⚠️  No scraper daemon at {socket_path}, scraping in-process", file=sys.stderr)
+        return None
+
+    if reply.get("ok"):
+        print(f"    ✅ Daemon finished {scraper} job in {reply.get('elapsed_s', 0):.1f}s", file=sys.stderr)
+    else:
+        print(f"ERROR: Daemon {scraper} job failed: {reply.get('error', 'unknown error')}", file=sys.stderr)
+    return bool(reply.get("ok"))
+
+
+class ScraperDaemon:
+    """Owns the warm Playwright browser and crawl4ai crawler and runs jobs on them"""
+
+    def __init__(self, socket_path: Path, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.socket_path = Path(socket_path)
+        self.jobs = asyncio.Semaphore(max_jobs)
+        self.max_jobs = max_jobs
+        # crawl4ai's page hook is per crawler, so its jobs run one at a time
+        self.crawl4ai_lock = asyncio.Lock()
+        self.started_at = time.time()
+        self.jobs_started = 0
+        self.jobs_served = 0
+        self.jobs_active = 0
+        self.playwright = None
+        self.browser = None
+        # Warm crawlers keyed by block_resources (it is baked into the crawler's browser config)
+        self.crawlers = {}
+        self.stopped = asyncio.Event()
+
+    async def get_browser(self):
+        """Warm Playwright browser, relaunched if it crashed"""
+        from playwright.async_api import async_playwright
+        from browser_profile import LEAN_LAUNCH_ARGS
+
+        if self.browser is not None and self.browser.is_connected():
+            return self.browser
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        print("    Launching warm browser...", file=sys.stderr)
+        self.browser = await self.playwright.chromium.launch(headless=True, args=LEAN_LAUNCH_ARGS)
+        return self.browser
+
+    async def get_crawler(self, block_resources: bool = True):
+        """Warm crawl4ai crawler for this resource-blocking profile, started on first use"""
+        if block_resources not in self.crawlers:
+            try:
+                import crawl4ai_scraper
+            except SystemExit:
+                raise RuntimeError("crawl4ai is not installed in the daemon's Python")
+            print(f"    Starting warm crawl4ai crawler (block_resources={block_resources})...", file=sys.stderr)
+            crawler = crawl4ai_scraper.lean_crawler(block_resources)
+            await crawler.start()
+            self.crawlers[block_resources] = crawler
+        return self.crawlers[block_resources]
+
+    async def run_job(self, request: dict) -> dict:
+        """Run one scrape job on the warm browser/crawler"""
+        scraper = request.get("scraper")
+        url = request.get("url")
+        output_dir = request.get("output_dir")
+        options = dict(request.get("options") or {})
+
+        if not url or not output_dir:
+            return {"ok": False, "error": "job needs url and output_dir"}
+
+        if scraper == "playwright":
+            import playwright_scraper
+            browser = await self.get_browser()
+            ok = await playwright_scraper.scrape_spa_to_tree(url, output_dir, browser=browser, **options)
+        elif scraper == "crawl4ai":
+            import crawl4ai_scraper
+            async with self.crawl4ai_lock:
+                crawler = await self.get_crawler(options.get("block_resources", True))
+                if options.pop("crawl", False):
+                    ok = await crawl4ai_scraper.crawl_website(url, output_dir, crawler=crawler, **options)
+                else:
+                    ok = await crawl4ai_scraper.scrape_website(url, output_dir, crawler=crawler, **options)
+        else:
+            return {"ok": False, "error": f"unknown scraper: {scraper}"}
+
+        return {"ok": bool(ok)}
+
+    async def handle(self, request: dict) -> dict:
+        """Dispatch one request (job or command)"""
+        command = request.get("command")
+        if command == "status":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "jobs_served": self.jobs_served,
+                "jobs_active": self.jobs_active,
+                "max_jobs": self.max_jobs,
+                "browser_warm": self.browser is not None and self.browser.is_connected(),
+                "crawler_warm": bool(self.crawlers),
+            }
+        if command == "shutdown":
+            self.stopped.set()
+            return {"ok": True}
+        if command:
+            return {"ok": False, "error": f"unknown command: {command}"}
+
+        async with self.jobs:
+            self.jobs_active += 1
+            self.jobs_started += 1
+            job_id = self.jobs_started
+            start = time.monotonic()
+            print(f"==> [job {job_id}] {request.get('scraper')} {request.get('url')}", file=sys.stderr)
+            try:
+                reply = await self.run_job(request)
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            finally:
+                self.jobs_active -= 1
+                self.jobs_served += 1
+            reply["elapsed_s"] = round(time.monotonic() - start, 2)
+            print(f"    [job {job_id}] {'ok' if reply['ok'] else 'failed'} in {reply['elapsed_s']}s", file=sys.stderr)
+            return reply
+
+    async def on_connection(self, reader, writer):
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                reply = {"ok": False, "error": "request must be one JSON line"}
+            else:
+                reply = await self.handle(request)
+            writer.write(json.dumps(reply).encode('utf-8') + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Listen on the Unix socket until a shutdown command arrives"""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            if submit_job(self.socket_path, {"command": "status"}, timeout=5) is not None:
+                print(f"ERROR: A scraper daemon is already listening on {self.socket_path}", file=sys.stderr)
+                return False
+            self.socket_path.unlink()  # stale socket from a crashed daemon
+
+        server = await asyncio.start_unix_server(self.on_connection, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        await self.get_browser()
+        print(f"==> Scraper daemon listening on {self.socket_path} (pid {os.getpid()}, max {self.max_jobs} jobs)", file=sys.stderr)
+
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            for crawler in self.crawlers.values():
+                await crawler.close()
+            if self.browser is not None:
+                await self.browser.close()
+            if self.playwright is not None:
+                await self.playwright.stop()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            print("==> Scraper daemon stopped", file=sys.stderr)
+        return True
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="scraper_daemon.py",
+        description="Keep a warm browser for playwright_scraper.py/crawl4ai_scraper.py --daemon"
+    )
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET),
+                        help=f"Unix socket path (default: $SCRAPER_DAEMON_SOCKET or {DEFAULT_SOCKET})")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help=f"Scrape jobs run at the same time (default: {DEFAULT_MAX_JOBS})")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if args.max_jobs < 1:
+            parser.error("--max-jobs must be at least 1")
+        try:
+            success = asyncio.run(ScraperDaemon(args.socket, args.max_jobs).serve())
+        except KeyboardInterrupt:
+            success = True
+        sys.exit(0 if success else 1)
+
+    reply = submit_job(args.socket, {"command": "status" if args.command == "status" else "shutdown"}, timeout=30)
+    if reply is None:
+        print(f"No scraper daemon listening on {args.socket}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    main()
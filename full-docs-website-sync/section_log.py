@@ -0,0 +1,210 @@
+"""
+Append-only JSONL record log and atomic JSON writers shared by the scrapers
+Records are flushed per page and sitemap.json / metadata.json are built from the log at the end,
+so memory stays flat on large sites and an interrupted run loses at most the page in flight
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+
+class RecordLog:
+    """
+    One JSON record per line, flushed as soon as it is appended
+
+    Opened with resume=True the existing log is kept and appended to;
+    otherwise it is truncated.
+    """
+
+    def __init__(self, path, resume: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self.appended = 0
+
+    def append(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.appended += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    """
+    Yield (offset, record) for every readable line of a record log
+
+    A torn last line (crash mid-write) is skipped with a warning.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, 'rb') as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                yield offset, json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                print(f"    ⚠️  Skipping unreadable record at byte {offset} of {path.name}", file=sys.stderr)
+
+
+def logged_keys(path, key: str) -> set:
+    """Values of one field across a log (e.g., URLs already scraped), for resuming"""
+    return {record[key] for _, record in iter_records(path) if record.get(key) is not None}
+
+
+def sorted_records(path, identity: str, order_by):
+    """
+    Yield the log's records ordered by order_by(record), last write per identity wins
+
+    Only (sort key, byte offset) pairs are held in memory; records are
+    re-read from disk one at a time.
+    """
+    latest = {}
+    for offset, record in iter_records(path):
+        latest[record.get(identity)] = (order_by(record), offset)
+
+    with open(path, 'rb') as f:
+        for _, offset in sorted(latest.values()):
+            f.seek(offset)
+            yield json.loads(f.readline())
+
+
+def _indented(value, level: int) -> str:
+    """json.dumps(value, indent=2) as it would appear nested `level` deep"""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + "  " * level)
+
+
+def write_json_atomic(path, data: dict):
+    """json.dump(data, indent=2) to a temp file, then rename over path"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_listing_atomic(path, head: dict, list_key: str, records, tail):
+    """
+    Stream a JSON document with one large list to path, atomically
+
+    Produces the same layout as json.dump({**head, list_key: [...], **tail},
+    indent=2) without ever holding the list in memory. tail may be a
+    callable, called after the records are written, so totals can be
+    accumulated while they stream past.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("{")
+        first = True
+        for key, value in head.items():
+            f.write(("\n" if first else ",\n") + f"  {json.dumps(key)}: {_indented(value, 1)}")
+            first = False
+
+        f.write(("\n" if first else ",\n") + f"  {json.dumps(list_key)}: [")
+        empty = True
+        for record in records:
+            f.write(("\n" if empty else ",\n") + "    " + _indented(record, 2))
+            empty = False
+        f.write("]" if empty else "\n  ]")
+
+        for key, value in (tail() if callable(tail) else tail).items():
+            f.write(f",\n  {json.dumps(key)}: {_indented(value, 1)}")
+        f.write("\n}")
+    os.replace(tmp_path, path)
+
+
+class CrawlCheckpoint:
+    """
+    Discovered link set plus per-link status (done/failed/pending), as a JSONL journal
+
+    The first lines hold the link set ({"url", "links"}); every status
+    change after that is one appended event ({"link", "status", "attempts",
+    "error"}), so recording progress never rewrites the file. Links with no
+    event are pending.
+    """
+
+    def __init__(self, path, url: str, resume: bool = False):
+        self.path = Path(path)
+        self.url = url
+        self.links = []
+        self.states = {}
+
+        loaded = resume and self._load()
+        self._log = RecordLog(self.path, resume=loaded)
+        if not loaded:
+            self._log.append({"url": url, "links": []})
+
+    def _load(self) -> bool:
+        """Replay an existing journal for the same URL; False if there is none to resume"""
+        known = set()
+        for _, event in iter_records(self.path):
+            if "links" in event:
+                if event.get("url", self.url) != self.url:
+                    print(f"    ⚠️  {self.path.name} is for {event['url']}, starting a new checkpoint", file=sys.stderr)
+                    self.links, self.states = [], {}
+                    return False
+                for link in event["links"]:
+                    if link not in known:
+                        known.add(link)
+                        self.links.append(link)
+            elif event.get("link"):
+                self.states[event["link"]] = event
+        return bool(self.links)
+
+    def add_links(self, links) -> list:
+        """Record newly discovered links (order kept); returns the ones that were new"""
+        known = set(self.links)
+        new = [link for link in dict.fromkeys(links) if link not in known]
+        if new:
+            self.links.extend(new)
+            self._log.append({"links": new})
+        return new
+
+    def status(self, link: str) -> str:
+        return self.states.get(link, {}).get("status", "pending")
+
+    def attempts(self, link: str) -> int:
+        return self.states.get(link, {}).get("attempts", 0)
+
+    def mark(self, link: str, status: str, attempts: int, error: str = None):
+        event = {"link": link, "status": status, "attempts": attempts}
+        if error:
+            event["error"] = error
+        self.states[link] = event
+        self._log.append(event)
+
+    def counts(self) -> dict:
+        counts = {"done": 0, "failed": 0, "pending": 0}
+        for link in self.links:
+            counts[self.status(link)] += 1
+        return counts
+
+    def failures(self) -> list:
+        """Links whose last attempt failed, with attempt count and error"""
+        return [
+            {"url": link, "attempts": self.attempts(link), "error": self.states[link].get("error")}
+            for link in self.links if self.status(link) == "failed"
+        ]
+
+    def close(self):
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
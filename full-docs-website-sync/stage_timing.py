@@ -0,0 +1,111 @@
+"""
+Per-stage timing spans for the scrapers
+Aggregated into the `timings` block of sitemap.json / metadata.json, and optionally exported as a
+Chrome trace-event file (open in chrome://tracing or ui.perfetto.dev) to find the slow sections
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from section_log import write_json_atomic
+
+
+def _percentile(sorted_values, p):
+    """Nearest-rank percentile of a sorted, non-empty list"""
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+class StageTimer:
+    """
+    Collects timing spans: a stage name, a track, a start and a duration
+
+    Tracks become rows in the trace viewer: 0 is the main flow, 1..N the
+    workers. Durations are always kept per stage for the aggregates; the
+    spans themselves (with their args) only when a trace was requested.
+    A disabled timer records nothing.
+    """
+
+    def __init__(self, trace: bool = False, enabled: bool = True):
+        self.enabled = enabled
+        self.trace = trace and enabled
+        self.origin = time.perf_counter()
+        self.durations = {}  # stage -> [seconds], in first-seen order
+        self.spans = []      # (stage, track, start_s, duration_s, args), only if tracing
+        self.track_names = {0: "main"}
+
+    def now(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self.origin
+
+    def add(self, stage: str, start: float, duration: float, track: int = 0, **args):
+        """Record a span measured elsewhere (start from now(), duration in seconds)"""
+        if not self.enabled:
+            return
+        self.durations.setdefault(stage, []).append(duration)
+        if self.trace:
+            self.spans.append((stage, track, start, duration, args))
+
+    @contextmanager
+    def span(self, stage: str, track: int = 0, **args):
+        """Time the body of a with-block as one span (recorded even if it raises)"""
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add(stage, start, self.now() - start, track, **args)
+
+    def name_track(self, track: int, name: str):
+        self.track_names[track] = name
+
+    def as_dict(self) -> dict:
+        """
+        Aggregates for sitemap.json / metadata.json
+
+        Returns:
+            {"wall_ms", "stages": {stage: {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}}}
+            Stages nest (a section contains its click and render wait), so
+            totals of different stages overlap.
+        """
+        stages = {}
+        for stage, durations in self.durations.items():
+            ordered = sorted(durations)
+            total = sum(ordered)
+            stages[stage] = {
+                "count": len(ordered),
+                "total_ms": round(total * 1000, 1),
+                "mean_ms": round(total * 1000 / len(ordered), 1),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {"wall_ms": round(self.now() * 1000, 1), "stages": stages}
+
+    def write_trace(self, path, process_name: str):
+        """Write the spans as Chrome trace-event JSON (complete 'X' events, microseconds)"""
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": process_name}}]
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": track, "args": {"name": name}}
+            for track, name in sorted(self.track_names.items())
+        ]
+        events += [
+            {
+                "name": stage,
+                "cat": "scrape",
+                "ph": "X",
+                "pid": 1,
+                "tid": track,
+                "ts": round(start * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "args": args,
+            }
+            for stage, track, start, duration, args in self.spans
+        ]
+        write_json_atomic(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+# Default for helpers called without a timer
+NO_TIMING = StageTimer(enabled=False)
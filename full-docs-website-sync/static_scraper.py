@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+Browserless fast path for static documentation sites
+Probes a sample of pages; if the server already sends the main content in its HTML, crawls the
+site over pooled keep-alive HTTP and converts it without a browser into the playwright tree.
+Pages whose HTML has no content are rendered in a headless browser (started only if needed)
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from browser_profile import LEAN_LAUNCH_ARGS, NetworkStats, allowed_domains_for, lean_context_options
+from content_similarity import simhash
+from crawl_scope import in_scope, normalize_url, path_section, sanitize_filename, scope_prefix_for
+from dom_cache import DomCache
+from html_markdown import page_content
+from http_pool import DEFAULT_CONCURRENCY, HttpPool
+from incremental import content_hash, http_validators, load_previous_records, is_unchanged
+from output_tree import remove_stale_files, tree_owner
+from section_log import RecordLog, iter_records, sorted_records, write_listing_atomic
+from stage_timing import NO_TIMING, StageTimer
+
+DEFAULT_MAX_PAGES = 5000
+DEFAULT_PROBE_PAGES = 5
+DEFAULT_MIN_CHARS = 200         # shorter main content counts as "needs JavaScript"
+DEFAULT_BROWSER_PAGES = 2       # pages rendered in parallel by the browser fallback
+FALLBACK_WAIT_TIMEOUT_MS = 10000  # browser fallback render wait (playwright_scraper.py's defaults)
+FALLBACK_SETTLE_MS = 300
+STATIC_PROBE_SHARE = 0.8        # share of probed pages that must have content in their HTML
+MIN_HASH_ROUTES = 3             # this many #s=/#/ route links on the root mean a hash-routed SPA
+EXIT_NEEDS_BROWSER = 2
+SCRAPER = "static-http"
+# playwright_scraper.py's --resume state for the tree; stale once this scraper rewrites it
+PLAYWRIGHT_RUN_FILES = ("checkpoint.jsonl", "sections.jsonl")
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+# Links to these are assets, not pages
+_ASSET_RE = re.compile(
+    r'\.(png|jpe?g|gif|svg|webp|ico|css|js|mjs|map|json|xml|txt|pdf|zip|tar|gz|tgz|woff2?|ttf|eot|mp4|webm|mp3)$',
+    re.I)
+# Fragments that route a SPA (#s=intro, #/guide, #!/guide) rather than point at a heading
+_HASH_ROUTE_RE = re.compile(r'[=/!]')
+
+# snapshot() from the playwright scraper's page helpers, plus every link (not only hash links)
+BROWSER_SNAPSHOT_JS = "() => ({...window.__kb.snapshot({html: true}), links: Array.from(document.querySelectorAll('a[href]'), a => a.href)})"
+
+
+def hash_routes(links, page_url: str) -> int:
+    """Number of links that route a SPA on the same document (e.g., #s=intro) instead of naming an anchor"""
+    page = urlparse(page_url)
+    count = 0
+    for link in links:
+        parsed = urlparse(link)
+        if (parsed.netloc, parsed.path.rstrip('/')) == (page.netloc, page.path.rstrip('/')) and \
+                _HASH_ROUTE_RE.search(parsed.fragment):
+            count += 1
+    return count
+
+
+def has_static_content(page: dict, min_chars: int) -> bool:
+    """True if a converted page's main content is already in its raw HTML"""
+    return len(page["markdown"] or "") >= min_chars
+
+
+def page_links(links, netloc: str, prefix: str):
+    """Normalized in-scope page links (assets skipped), in document order"""
+    result = []
+    for href in links:
+        link = normalize_url(href)
+        if in_scope(link, netloc, prefix) and not _ASSET_RE.search(urlparse(link).path):
+            result.append(link)
+    return list(dict.fromkeys(result))
+
+
+async def fetch_and_convert(pool, executor, url: str, timer=NO_TIMING, track=0, keep_html=False):
+    """
+    GET a page and convert it to markdown in the process pool
+
+    Returns:
+        (response, page) where page is html_markdown.page_content()'s dict
+        (with main_html if keep_html is set), or None if the response is not
+        an HTML document
+    """
+    with timer.span("fetch", track, url=url):
+        response = await pool.get(url)
+    if response.status != 200 or response.content_type not in HTML_TYPES:
+        return response, None
+    with timer.span("convert", track, url=url):
+        page = await asyncio.get_running_loop().run_in_executor(executor, page_content, response.text(), response.url,
+                                                                  keep_html)
+    return response, page
+
+
+async def probe_site(pool, executor, root: str, netloc: str, prefix: str, sample_size: int, min_chars: int) -> dict:
+    """
+    Decide whether the site sends its content in the HTML, before crawling it
+
+    Fetches the root and an even spread of the in-scope pages it links to,
+    and checks each for a main content area of at least min_chars.
+
+    Returns:
+        Dict with static (bool), reason and the sampled pages
+    """
+    response, page = await fetch_and_convert(pool, executor, root)
+    if page is None:
+        return {"static": False, "reason": f"root is not an HTML page (HTTP {response.status}, {response.content_type or 'no type'})",
+                "sampled": []}
+
+    routes = hash_routes(page["links"], response.url)
+    if routes >= MIN_HASH_ROUTES:
+        return {"static": False, "reason": f"hash-routed SPA ({routes} route links on the root page)", "sampled": []}
+
+    candidates = [link for link in page_links(page["links"], netloc, prefix) if link != root]
+    picks = min(sample_size - 1, len(candidates))
+    sample = [candidates[i * len(candidates) // picks] for i in range(picks)] if picks else []
+
+    sampled = [{"url": root, "chars": len(page["markdown"] or ""), "static": has_static_content(page, min_chars)}]
+    for url in sample:
+        try:
+            _, sample_page = await fetch_and_convert(pool, executor, url)
+        except (OSError, asyncio.TimeoutError) as e:
+            sampled.append({"url": url, "chars": 0, "static": False, "error": str(e)})
+            continue
+        chars = len(sample_page["markdown"] or "") if sample_page else 0
+        sampled.append({"url": url, "chars": chars, "static": bool(sample_page) and has_static_content(sample_page, min_chars)})
+
+    with_content = sum(entry["static"] for entry in sampled)
+    needed = math.ceil(STATIC_PROBE_SHARE * len(sampled))
+    static = with_content >= needed
+    reason = (f"{with_content}/{len(sampled)} probed pages have their main content in the HTML"
+              + ("" if static else f" (need {needed})"))
+    return {"static": static, "reason": reason, "sampled": sampled}
+
+
+class BrowserFallback:
+    """
+    Renders pages whose HTML has no content, in a headless browser
+
+    The browser is only launched for the first such page, so a fully
+    static site never starts one. Pages are loaded with the playwright
+    scraper's lean profile and in-page helpers, so the markdown matches
+    its output.
+    """
+
+    def __init__(self, base_url: str, concurrency: int, timeout_ms: int, settle_ms: int,
+                 block_resources: bool = True, allow_domains=None, timer=NO_TIMING):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.timeout_ms = timeout_ms
+        self.settle_ms = settle_ms
+        self.timer = timer
+        self.network = NetworkStats(allowed_domains_for(base_url, allow_domains), block=block_resources)
+        self.playwright = self.browser = self.context = None
+        self.launch_error = None
+        self.pages = 0
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("playwright") is not None
+
+    async def _start(self):
+        """Launch the browser once; if that fails, every later render fails with the same error"""
+        from playwright.async_api import async_playwright
+
+        if self.launch_error:
+            raise OSError(self.launch_error)
+        print(f"    Launching browser for pages that need JavaScript...", file=sys.stderr)
+        with self.timer.span("browser_launch"):
+            self.playwright = await async_playwright().start()
+            try:
+                self.browser = await self.playwright.chromium.launch(headless=True, args=LEAN_LAUNCH_ARGS)
+            except Exception as e:
+                await self.playwright.stop()
+                self.launch_error = f"Browser launch failed: {str(e).splitlines()[0]}"
+                raise OSError(self.launch_error)
+            self.context = await self.browser.new_context(**lean_context_options())
+            await self.network.install(self.context)
+
+    async def render(self, url: str) -> dict:
+        """Load url in the browser and extract it like playwright_scraper.py (same keys as page_content())"""
+        from playwright_scraper import install_page_helpers, wait_for_render
+
+        async with self.semaphore:
+            async with self.lock:
+                if self.context is None:
+                    await self._start()
+            page = await self.context.new_page()
+            try:
+                await install_page_helpers(page)
+                await page.goto(url, wait_until='domcontentloaded')
+                wait = await wait_for_render(page, None, self.timeout_ms, self.settle_ms, idle_ms=self.timeout_ms)
+                view = await page.evaluate(BROWSER_SNAPSHOT_JS)
+            finally:
+                await page.close()
+        self.pages += 1
+        return {"markdown": view["markdown"], "headings": view["headings"], "links": view["links"],
+                "main_html": view["html"], "wait": wait}
+
+    async def close(self):
+        if self.context is not None:
+            await self.network.drain()
+            await self.context.close()
+            await self.browser.close()
+            await self.playwright.stop()
+
+
+async def scrape_static_to_tree(base_url: str, output_dir: str, concurrency: int = DEFAULT_CONCURRENCY,
+                                max_pages: int = DEFAULT_MAX_PAGES, scope_prefix: str = None,
+                                incremental: bool = False, probe: bool = True,
+                                probe_pages: int = DEFAULT_PROBE_PAGES, min_chars: int = DEFAULT_MIN_CHARS,
+                                browser_fallback: bool = True, browser_pages: int = DEFAULT_BROWSER_PAGES,
+                                block_resources: bool = True, allow_domains: list = None,
+                                parse_workers: int = None, trace_file: str = None, dom_cache: bool = True,
+                                replace: bool = False):
+    """
+    Crawl a static site over HTTP into the playwright directory tree and sitemap.json
+
+    Args:
+        base_url: Root URL; pages under its path are crawled (e.g., https://nextjs.org/docs)
+        output_dir: Domain output directory (writes playwright/, sitemap.json, static-sections.jsonl)
+        concurrency: HTTP requests in flight (keep-alive connections are pooled)
+        max_pages: Stop discovering pages after this many
+        scope_prefix: Only follow links under this path (default: base_url's path)
+        incremental: Only rewrite pages whose content hash changed since the last sitemap.json
+        probe: Check a sample of pages first and do nothing if the site needs a browser
+        probe_pages: Pages to sample (the root and an even spread of its links)
+        min_chars: Main content shorter than this (in markdown) means the page needs JavaScript
+        browser_fallback: Render pages that need JavaScript with Playwright (if installed);
+                          otherwise they are listed as failed
+        browser_pages: Pages the browser fallback renders in parallel
+        block_resources: Browser fallback: abort image/media/font, tracker and third-party requests
+        allow_domains: Browser fallback: extra domains whose requests are not treated as third-party
+        parse_workers: Processes converting HTML to markdown (default: CPU count)
+        trace_file: Also write every timing span as Chrome trace-event JSON here
+        dom_cache: Save each page's main-content HTML to {output_dir}/dom-cache/ (see rebuild_tree.py)
+        replace: Overwrite a playwright/ tree another scraper wrote (refused otherwise)
+
+    Markdown files under playwright/ that are not in the new sitemap.json
+    (pages gone from the site, or the replaced scraper's) are deleted, and
+    so is playwright_scraper.py's resume state for the tree.
+
+    Returns:
+        True if pages were saved, False on failure, None if the probe found
+        that the site renders its content with JavaScript (nothing written)
+    """
+    output_path = Path(output_dir) / "playwright"
+    sitemap_file = Path(output_dir) / "sitemap.json"
+    log_file = Path(output_dir) / "static-sections.jsonl"
+
+    root = normalize_url(base_url)
+    netloc = urlparse(root).netloc
+    prefix = scope_prefix.rstrip('/') if scope_prefix is not None else scope_prefix_for(root)
+    timer = StageTimer(trace=bool(trace_file))
+    snapshots = DomCache(output_dir) if dom_cache else None
+
+    owner = tree_owner(Path(output_dir))
+    if owner not in (None, SCRAPER) and not replace:
+        print(f"ERROR: {output_path} holds {owner} output; pass --replace to overwrite it", file=sys.stderr)
+        return False
+
+    with ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()) as executor:
+        async with HttpPool(concurrency) as pool:
+            probe_result = None
+            if probe:
+                print(f"    Probing {root} for server-rendered content ({probe_pages} pages)...", file=sys.stderr)
+                try:
+                    with timer.span("probe"):
+                        probe_result = await probe_site(pool, executor, root, netloc, prefix, probe_pages, min_chars)
+                except (OSError, asyncio.TimeoutError) as e:
+                    print(f"ERROR: Could not fetch {root}: {e}", file=sys.stderr)
+                    return False
+                print(f"    Probe: {probe_result['reason']}", file=sys.stderr)
+                if not probe_result["static"]:
+                    print(f"    Site needs a browser; nothing written", file=sys.stderr)
+                    return None
+
+            # Another scraper's files are rewritten whatever their content hash (their frontmatter differs)
+            previous_sections = load_previous_records(sitemap_file, "sections", "file") \
+                if incremental and owner == SCRAPER else {}
+            output_path.mkdir(parents=True, exist_ok=True)
+            for name in PLAYWRIGHT_RUN_FILES:
+                (Path(output_dir) / name).unlink(missing_ok=True)
+
+            fallback = None
+            if browser_fallback and BrowserFallback.available():
+                fallback = BrowserFallback(root, browser_pages, FALLBACK_WAIT_TIMEOUT_MS, FALLBACK_SETTLE_MS,
+                                           block_resources, allow_domains, timer)
+            elif browser_fallback:
+                print(f"    ⚠️  playwright not installed: pages that need JavaScript will be listed as failed", file=sys.stderr)
+
+            print(f"    Crawling {root} (scope: {netloc}{prefix or '/'}, {concurrency} connections, max {max_pages} pages)...",
+                  file=sys.stderr)
+
+            links = [root]
+            seen = {root}
+            queue = asyncio.Queue()
+            queue.put_nowait((0, root))
+            claimed = set()     # output files already taken (two URLs can map to the same file)
+            failed = []
+            skipped = {"not_html": 0, "same_file": 0}
+            validators = {}
+
+            def discover(hrefs):
+                for link in page_links(hrefs, netloc, prefix):
+                    if link not in seen and len(links) < max_pages:
+                        seen.add(link)
+                        links.append(link)
+                        queue.put_nowait((len(links) - 1, link))
+
+            async def scrape_page(i, link, track, log):
+                """Fetch, convert and save one page; returns its sitemap record or None"""
+                response, page = await fetch_and_convert(pool, executor, link, timer, track, keep_html=dom_cache)
+                if response.status != 200:
+                    raise OSError(f"HTTP {response.status}")
+                if page is None:
+                    skipped["not_html"] += 1
+                    log(f"      - Not an HTML page ({response.content_type or 'no type'}), skipped")
+                    return None
+                if i == 0:
+                    validators.update(http_validators(response.headers))
+
+                final_url = normalize_url(response.url)
+                seen.add(final_url)
+                discover(page["links"])
+
+                renderer = "http"
+                if not has_static_content(page, min_chars):
+                    if fallback is None:
+                        raise OSError("main content is rendered by JavaScript (no browser fallback)")
+                    log(f"      ⚠️  No content in the HTML, rendering in the browser")
+                    with timer.span("browser_render", track, url=link):
+                        page = await fallback.render(response.url)
+                    discover(page["links"])
+                    renderer = "browser"
+
+                content = page["markdown"]
+                if not content:
+                    raise OSError("no content extracted")
+
+                section, subsection = path_section(final_url, prefix)
+                section_dir = output_path / sanitize_filename(section)
+                filename = f"{sanitize_filename(subsection) or 'index'}.md"
+                rel_file = f"{section_dir.name}/{filename}"
+                if rel_file in claimed:
+                    skipped["same_file"] += 1
+                    log(f"      - Same file as an earlier page ({rel_file}), skipped")
+                    return None
+                claimed.add(rel_file)
+
+                file_path = section_dir / filename
+                digest = content_hash(content)
+                fingerprint = simhash(content)
+                previous = previous_sections.get(rel_file, {})
+                snapshot = snapshots.put(page["main_html"]) if snapshots is not None and page.get("main_html") else None
+                section_dir.mkdir(exist_ok=True)
+
+                # Incremental: leave unchanged files untouched (bytes and mtime)
+                if is_unchanged(file_path, digest, previous):
+                    status = "unchanged"
+                    scraped_at = previous.get("scraped_at")
+                    log(f"      = Unchanged, kept {rel_file}")
+                else:
+                    status = "updated" if previous else "new"
+                    scraped_at = datetime.utcnow().isoformat() + "Z"
+                    frontmatter = f"""---
+source_url: {final_url}
+section: {section}
+subsection: {subsection}
+scraped_at: {scraped_at}
+scraper: static-{renderer}
+---
+
+"""
+                    with timer.span("file_write", track, file=rel_file):
+                        file_path.write_text(frontmatter + content, encoding='utf-8')
+                    log(f"      ✓ Saved to {rel_file}" + (" (browser)" if renderer == "browser" else ""))
+
+                return {
+                    "url": final_url,
+                    "section": section,
+                    "subsection": subsection,
+                    "file": rel_file,
+                    "size": len(content),
+                    "content_hash": digest,
+                    "simhash": None if fingerprint is None else f"{fingerprint:016x}",
+                    "scraped_at": scraped_at,
+                    "status": status,
+                    "headings": page["headings"],
+                    "dom_hash": snapshot,
+                    "renderer": renderer,
+                    "http_validators": http_validators(response.headers),
+                }
+
+            async def worker(track):
+                while True:
+                    i, link = await queue.get()
+                    lines = [f"    [{i + 1}/{len(links)}] {link}"]
+                    try:
+                        with timer.span("page", track, url=link):
+                            record = await scrape_page(i, link, track, lines.append)
+                        if record:
+                            section_log.append({"index": i, **record})
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                        failed.append({"url": link, "attempts": 1, "error": error})
+                        lines.append(f"      ❌ {error}")
+                    finally:
+                        print("\n".join(lines), file=sys.stderr)
+                        queue.task_done()
+
+            with RecordLog(log_file) as section_log:
+                for track in range(1, concurrency + 1):
+                    timer.name_track(track, f"fetcher {track}")
+                tasks = [asyncio.ensure_future(worker(track)) for track in range(1, concurrency + 1)]
+                try:
+                    await queue.join()
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    if fallback is not None:
+                        await fallback.close()
+
+    # The tree is this crawl's pages only: no leftovers from earlier crawls or another scraper
+    removed = remove_stale_files(output_path, {record["file"] for _, record in iter_records(log_file)})
+
+    # Build the sitemap from the section log (in discovery order, regardless of finish order)
+    totals = {"sections": 0, "unchanged": 0, "browser": 0}
+    section_dirs = set()
+
+    def sitemap_sections():
+        for record in sorted_records(log_file, "url", lambda r: r["index"]):
+            record.pop("index", None)
+            totals["sections"] += 1
+            totals["unchanged"] += record["status"] == "unchanged"
+            totals["browser"] += record["renderer"] == "browser"
+            section_dirs.add(record["file"].split("/")[0])
+            yield record
+
+    def sitemap_tail():
+        pages = totals["sections"] + len(failed)
+        return {
+            "total_sections": pages,
+            "scraped_sections": totals["sections"],
+            "coverage": totals["sections"] / pages if pages else 0,
+            "directories": sorted(section_dirs),
+            "failed_sections": failed,
+            "duplicate_sections": [],
+            "discovery": {
+                "seed_links": 1,
+                "discovered_links": len(links) - 1,
+                "skipped_not_html": skipped["not_html"],
+                "skipped_same_file": skipped["same_file"],
+            },
+            "output_structure": "directory-tree",
+            "http_validators": validators,
+            "incremental": {
+                "enabled": incremental,
+                "unchanged_sections": totals["unchanged"],
+                "written_sections": totals["sections"] - totals["unchanged"]
+            },
+            "static": {
+                "probe": probe_result,
+                "scope": {"netloc": netloc, "path_prefix": prefix},
+                "http_pages": totals["sections"] - totals["browser"],
+                "browser_pages": totals["browser"],
+                "min_chars": min_chars,
+                "replaced": owner if owner not in (None, SCRAPER) else None,
+                "removed_files": removed,
+            },
+            "http": pool.as_dict(),
+            "network": fallback.network.as_dict() if fallback and fallback.context else None,
+            "timings": timer.as_dict(),
+        }
+
+    with timer.span("sitemap_write"):
+        write_listing_atomic(sitemap_file, {
+            "url": base_url,
+            "scraped_at": datetime.utcnow().isoformat() + "Z",
+            "scraper": SCRAPER,
+        }, "sections", sitemap_sections(), sitemap_tail)
+    if trace_file:
+        timer.write_trace(trace_file, f"static {base_url}")
+
+    print(f"    ✅ Static scraping complete!", file=sys.stderr)
+    print(f"    📁 Created {len(section_dirs)} directories, {totals['sections']} files "
+          f"({totals['browser']} rendered in the browser, {removed} stale files removed)", file=sys.stderr)
+    if failed:
+        print(f"    ⚠️  {len(failed)} pages failed (see failed_sections)", file=sys.stderr)
+    if incremental:
+        print(f"    ♻️  {totals['unchanged']} unchanged, {totals['sections'] - totals['unchanged']} rewritten", file=sys.stderr)
+    http = pool.as_dict()
+    print(f"    🌐 {http['requests']} requests over {http['connections_opened']} connections, "
+          f"{http['bytes_received']:,} bytes", file=sys.stderr)
+    print(f"    📊 Sitemap: {sitemap_file} (section log: {log_file.name})", file=sys.stderr)
+    if trace_file:
+        print(f"    ⏱️  Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
+
+    return totals["sections"] > 0
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="static_scraper.py",
+        description="Scrape a static documentation site over HTTP (no browser) into the playwright directory tree",
+        epilog=f"Exits with {EXIT_NEEDS_BROWSER} if the probe finds the site renders its content with JavaScript"
+    )
+    parser.add_argument("url", help="Root URL (e.g., https://nextjs.org/docs)")
+    parser.add_argument("output_dir", help="Domain output directory")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"HTTP requests in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Maximum pages to crawl (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument("--scope-prefix", default=None, metavar="PATH",
+                        help="Only follow links under this path (default: the URL's path)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rewrite pages whose content changed since the last sitemap.json")
+    parser.add_argument("--no-probe", dest="probe", action="store_false",
+                        help="Crawl without checking first that the site is static")
+    parser.add_argument("--probe-pages", type=int, default=DEFAULT_PROBE_PAGES, metavar="N",
+                        help=f"Pages to sample in the probe (default: {DEFAULT_PROBE_PAGES})")
+    parser.add_argument("--min-chars", type=int, default=DEFAULT_MIN_CHARS, metavar="N",
+                        help=f"Main content shorter than this needs JavaScript (default: {DEFAULT_MIN_CHARS})")
+    parser.add_argument("--no-browser-fallback", dest="browser_fallback", action="store_false",
+                        help="List pages that need JavaScript as failed instead of rendering them")
+    parser.add_argument("--browser-pages", type=int, default=DEFAULT_BROWSER_PAGES, metavar="N",
+                        help=f"Pages the browser fallback renders in parallel (default: {DEFAULT_BROWSER_PAGES})")
+    parser.add_argument("--no-block-resources", dest="block_resources", action="store_false",
+                        help="Browser fallback: load images, fonts, media and third-party requests")
+    parser.add_argument("--allow-domain", action="append", default=[], metavar="DOMAIN",
+                        help="Browser fallback: domain to treat as first-party when blocking (repeatable)")
+    parser.add_argument("--parse-workers", type=int, default=None, metavar="N",
+                        help="Processes converting HTML to markdown (default: CPU count)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write per-stage timing spans as Chrome trace-event JSON (chrome://tracing)")
+    parser.add_argument("--no-dom-cache", dest="dom_cache", action="store_false",
+                        help="Don't save each page's main-content HTML to dom-cache/")
+    parser.add_argument("--replace", action="store_true",
+                        help="Overwrite a playwright/ tree and sitemap.json written by another scraper")
+    args = parser.parse_args()
+
+    if min(args.concurrency, args.max_pages, args.probe_pages, args.browser_pages, args.parse_workers or 1) < 1:
+        parser.error("--concurrency, --max-pages, --probe-pages, --browser-pages and --parse-workers must be at least 1")
+
+    success = asyncio.run(scrape_static_to_tree(
+        args.url, args.output_dir,
+        concurrency=args.concurrency,
+        max_pages=args.max_pages,
+        scope_prefix=args.scope_prefix,
+        incremental=args.incremental,
+        probe=args.probe,
+        probe_pages=args.probe_pages,
+        min_chars=args.min_chars,
+        browser_fallback=args.browser_fallback,
+        browser_pages=args.browser_pages,
+        block_resources=args.block_resources,
+        allow_domains=args.allow_domain,
+        parse_workers=args.parse_workers,
+        trace_file=str(Path(args.trace).resolve()) if args.trace else None,
+        dom_cache=args.dom_cache,
+        replace=args.replace,
+    ))
+    sys.exit(EXIT_NEEDS_BROWSER if success is None else 0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
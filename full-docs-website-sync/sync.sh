@@ -2,18 +2,24 @@
 set -euo pipefail
 
 # Full Docs Website Sync - Scrape documentation websites
-# Usage: ./sync.sh <website-url> [--scraper=httrack|crawl4ai|both] [--force]
+# Usage: ./sync.sh <website-url> [--scraper=httrack|crawl4ai|playwright|static|both] [--force] [--concurrency=N] [--incremental] [--crawl] [--daemon] [--resume]
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 KNOWLEDGE_ROOT="$(cd "$SCRIPT_DIR/../../.knowledge" && pwd)"
 FULL_DOCS_DIR="$KNOWLEDGE_ROOT/full-docs-website"
 MANIFEST_FILE="$FULL_DOCS_DIR/MANIFEST.yaml"
+MANIFEST_STORE="$SCRIPT_DIR/../tools/manifest_store.py"
 STALENESS_DAYS=30
 
 # Parse arguments
 WEBSITE_URL=""
 SCRAPER="both"  # default
 FORCE=false
+CONCURRENCY=1  # playwright pages scraping sections in parallel
+INCREMENTAL=false
+CRAWL=false  # crawl4ai: follow internal links instead of capturing the root URL only
+DAEMON=false  # run browser scrapers on a warm scraper_daemon.py if one is listening
+RESUME=false  # continue an interrupted playwright run / crawl4ai crawl from its JSONL log
 
 for arg in "$@"; do
   case $arg in
@@ -25,6 +31,26 @@ for arg in "$@"; do
       FORCE=true
       shift
       ;;
+    --concurrency=*)
+      CONCURRENCY="${arg#*=}"
+      shift
+      ;;
+    --incremental)
+      INCREMENTAL=true
+      shift
+      ;;
+    --crawl)
+      CRAWL=true
+      shift
+      ;;
+    --daemon)
+      DAEMON=true
+      shift
+      ;;
+    --resume)
+      RESUME=true
+      shift
+      ;;
     *)
       if [ -z "$WEBSITE_URL" ]; then
         WEBSITE_URL="$arg"
@@ -34,19 +60,30 @@ for arg in "$@"; do
 done
 
 if [ -z "$WEBSITE_URL" ]; then
-  echo "Usage: $0 <website-url> [--scraper=httrack|crawl4ai|both] [--force]" >&2
+  echo "Usage: $0 <website-url> [--scraper=httrack|crawl4ai|playwright|static|both] [--force] [--concurrency=N] [--incremental] [--crawl] [--daemon] [--resume]" >&2
   echo "" >&2
   echo "Examples:" >&2
   echo "  $0 https://nextjs.org/docs" >&2
   echo "  $0 https://react.dev --scraper=httrack" >&2
   echo "  $0 https://nextjs.org/docs --scraper=both --force" >&2
+  echo "  $0 https://repoprompt.com/docs --scraper=playwright --concurrency=4" >&2
+  echo "  $0 https://repoprompt.com/docs --force --incremental" >&2
+  echo "  $0 https://nextjs.org/docs --scraper=crawl4ai --crawl" >&2
+  echo "  $0 https://repoprompt.com/docs --scraper=playwright --daemon" >&2
+  echo "  $0 https://repoprompt.com/docs --scraper=playwright --force --resume" >&2
+  echo "  $0 https://nextjs.org/docs --scraper=static" >&2
+  exit 1
+fi
+
+if [[ ! "$CONCURRENCY" =~ ^[1-9][0-9]*$ ]]; then
+  echo "ERROR: Invalid concurrency: $CONCURRENCY (must be a positive integer)" >&2
   exit 1
 fi
 
 # Validate scraper option
-if [[ ! "$SCRAPER" =~ ^(httrack|crawl4ai|playwright|both)$ ]]; then
+if [[ ! "$SCRAPER" =~ ^(httrack|crawl4ai|playwright|static|both)$ ]]; then
   echo "ERROR: Invalid scraper option: $SCRAPER" >&2
-  echo "       Must be one of: httrack, crawl4ai, playwright, both" >&2
+  echo "       Must be one of: httrack, crawl4ai, playwright, static, both" >&2
   exit 1
 fi
 
@@ -68,39 +105,15 @@ echo "    Scraper(s): $SCRAPER"
 # Create full-docs-website directory if needed
 mkdir -p "$FULL_DOCS_DIR"
 
-# Initialize MANIFEST.yaml if it doesn't exist
-if [ ! -f "$MANIFEST_FILE" ]; then
-  echo "websites: []" > "$MANIFEST_FILE"
-  echo "    Created MANIFEST.yaml"
-fi
-
-# Check staleness
+# Check staleness (indexed lookup in MANIFEST.sqlite, see tools/manifest_store.py)
 check_staleness() {
-  if ! command -v yq &> /dev/null; then
-    echo "    WARNING: yq not found, skipping staleness check (install with: brew install yq)" >&2
-    return 1  # Treat as stale
-  fi
-
   local last_synced
-  last_synced=$(yq eval ".websites[] | select(.name == \"$DOMAIN\") | .last_synced" "$MANIFEST_FILE" 2>/dev/null || echo "null")
-
-  if [ "$last_synced" = "null" ] || [ -z "$last_synced" ]; then
+  local age_days
+  if ! age_days=$(python3 "$MANIFEST_STORE" "$MANIFEST_FILE" age websites "$DOMAIN"); then
     echo "    Not in manifest (first scrape)"
     return 1  # Stale
   fi
-
-  # Calculate age in days
-  if command -v gdate &> /dev/null; then
-    DATE_CMD=gdate
-  else
-    DATE_CMD=date
-  fi
-
-  local last_epoch
-  local now_epoch
-  last_epoch=$($DATE_CMD -d "$last_synced" +%s 2>/dev/null || $DATE_CMD -j -f "%Y-%m-%dT%H:%M:%SZ" "$last_synced" +%s 2>/dev/null || echo "0")
-  now_epoch=$($DATE_CMD +%s)
-  local age_days=$(( (now_epoch - last_epoch) / 86400 ))
+  last_synced=$(python3 "$MANIFEST_STORE" "$MANIFEST_FILE" get websites "$DOMAIN" last_synced)
 
   echo "    Last scraped: $last_synced ($age_days days ago)"
 
@@ -134,6 +147,32 @@ fi
 # Create site directory
 mkdir -p "$SITE_DIR"
 
+# Extra flags for the Python scrapers
+INCREMENTAL_ARGS=()
+if [ "$INCREMENTAL" = true ]; then
+  echo "    Incremental mode: only changed pages will be rewritten"
+  INCREMENTAL_ARGS=(--incremental)
+fi
+
+CRAWL4AI_ARGS=()
+if [ "$CRAWL" = true ]; then
+  CRAWL4AI_ARGS=(--crawl)
+fi
+
+PLAYWRIGHT_ARGS=()
+if [ "$RESUME" = true ]; then
+  echo "    Resume mode: continuing from the previous run's section log"
+  PLAYWRIGHT_ARGS=(--resume)
+  if [ "$CRAWL" = true ]; then
+    CRAWL4AI_ARGS+=(--resume)
+  fi
+fi
+
+DAEMON_ARGS=()
+if [ "$DAEMON" = true ]; then
+  DAEMON_ARGS=(--daemon)
+fi
+
 # Function to scrape with httrack
 scrape_httrack() {
   echo "==> Scraping with httrack..."
@@ -192,7 +231,7 @@ scrape_crawl4ai() {
   # Run Python scraper with SPA support
   # This uses wait_for="networkidle" and delay_before_return_html=3.0
   # which are critical for single-page apps with hash routing
-  if "$venv_python" "$python_scraper" "$WEBSITE_URL" "$SITE_DIR"; then
+  if "$venv_python" "$python_scraper" "$WEBSITE_URL" "$SITE_DIR" ${CRAWL4AI_ARGS[@]+"${CRAWL4AI_ARGS[@]}"} ${INCREMENTAL_ARGS[@]+"${INCREMENTAL_ARGS[@]}"} ${DAEMON_ARGS[@]+"${DAEMON_ARGS[@]}"}; then
     echo "    crawl4ai complete: $SITE_DIR/crawl4ai"
     return 0
   else
@@ -223,7 +262,7 @@ scrape_playwright() {
   fi
 
   # Run Playwright scraper (outputs directory tree structure)
-  if "$venv_python" "$python_scraper" "$WEBSITE_URL" "$SITE_DIR"; then
+  if "$venv_python" "$python_scraper" "$WEBSITE_URL" "$SITE_DIR" --concurrency "$CONCURRENCY" ${PLAYWRIGHT_ARGS[@]+"${PLAYWRIGHT_ARGS[@]}"} ${INCREMENTAL_ARGS[@]+"${INCREMENTAL_ARGS[@]}"} ${DAEMON_ARGS[@]+"${DAEMON_ARGS[@]}"}; then
     echo "    playwright complete: $SITE_DIR/playwright"
     return 0
   else
@@ -232,6 +271,36 @@ scrape_playwright() {
   fi
 }
 
+# Function to scrape a static site over HTTP (no browser) into the playwright tree
+# Returns 2 if the probe finds the content is rendered by JavaScript (nothing written)
+scrape_static() {
+  echo "==> Scraping with static fast path (HTTP, no browser)..."
+
+  local python_scraper="$SCRIPT_DIR/static_scraper.py"
+
+  if [ ! -f "$python_scraper" ]; then
+    echo "ERROR: static_scraper.py not found at $python_scraper" >&2
+    return 1
+  fi
+
+  # Stdlib only; the venv's playwright (if present) renders the pages that need JavaScript
+  local python="python3"
+  local venv_python="$HOME/GITHUB/.web-context-builder/venv/bin/python3"
+  if [ -f "$venv_python" ]; then
+    python="$venv_python"
+  fi
+
+  # --scraper=static picks this scraper for the domain, so it takes over whatever wrote playwright/ before
+  local status=0
+  "$python" "$python_scraper" "$WEBSITE_URL" "$SITE_DIR" --replace ${INCREMENTAL_ARGS[@]+"${INCREMENTAL_ARGS[@]}"} || status=$?
+  if [ "$status" -eq 0 ]; then
+    echo "    static complete: $SITE_DIR/playwright"
+  elif [ "$status" -ne 2 ]; then
+    echo "ERROR: static scraper failed" >&2
+  fi
+  return "$status"
+}
+
 # Run selected scraper(s)
 SCRAPERS_USED=""
 
@@ -248,6 +317,20 @@ case "$SCRAPER" in
     scrape_playwright
     SCRAPERS_USED="playwright"
     ;;
+  static)
+    # Falls back to the full playwright scrape when the site needs a browser
+    static_status=0
+    scrape_static || static_status=$?
+    if [ "$static_status" -eq 0 ]; then
+      SCRAPERS_USED="static"
+    elif [ "$static_status" -eq 2 ]; then
+      echo "    Site needs a browser, falling back to playwright"
+      scrape_playwright
+      SCRAPERS_USED="playwright"
+    else
+      exit 1
+    fi
+    ;;
   both)
     # Run ALL THREE scrapers for cross-validation
     scrape_httrack
@@ -277,26 +360,12 @@ fi
 # Update MANIFEST.yaml
 TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
 
-if command -v yq &> /dev/null; then
-  # Remove existing entry (if any)
-  yq eval -i "del(.websites[] | select(.name == \"$DOMAIN\"))" "$MANIFEST_FILE"
-
-  # Add new entry
-  yq eval -i ".websites += [{
-    \"name\": \"$DOMAIN\",
-    \"url\": \"$WEBSITE_URL\",
-    \"last_synced\": \"$TIMESTAMP\",
-    \"scraper\": \"$SCRAPERS_USED\"
-  }]" "$MANIFEST_FILE"
-
-  echo "==> Updated MANIFEST.yaml"
-else
-  echo "WARNING: yq not found, cannot update MANIFEST.yaml (install with: brew install yq)" >&2
-  echo "         Manual entry needed:" >&2
-  echo "         - name: $DOMAIN" >&2
-  echo "           url: $WEBSITE_URL" >&2
-  echo "           last_synced: $TIMESTAMP" >&2
-  echo "           scraper: $SCRAPERS_USED" >&2
-fi
+python3 "$MANIFEST_STORE" "$MANIFEST_FILE" set websites "$DOMAIN" \
+  "url=$WEBSITE_URL" \
+  "last_synced=$TIMESTAMP" \
+  "scraper=$SCRAPERS_USED" \
+  --replace
+
+echo "==> Updated MANIFEST.yaml"
 
 echo "==> Scrape complete: $DOMAIN"
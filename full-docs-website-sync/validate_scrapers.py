@@ -4,24 +4,113 @@ Cross-validate scraper outputs to detect incomplete or failed scraping
 Compares httrack, crawl4ai, and playwright outputs against sitemap ground truth
 """
 
+import argparse
 import json
+import multiprocessing
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+from content_similarity import cross_validate, sketch_file
+from scan_index import ScanIndex, scan_tree
+
+DEFAULT_FULL_DOCS_DIR = Path(__file__).resolve().parent.parent.parent / ".knowledge" / "full-docs-website"
+SCRAPER_DIRS = ("httrack", "crawl4ai", "playwright")
+# Sitemaps converted from another scraper's output (sitemap scraper -> source scraper);
+# the source can't be checked against its own conversion
+CONVERTED_SITEMAPS = {"httrack-mirror": "httrack"}
+
+
+def markdown_stats(content_file: Path) -> dict:
+    """Line and '## ' section counts of crawl4ai's content.md (JSON envelope or plain markdown)"""
+    with open(content_file) as f:
+        content = f.read()
+
+    try:
+        raw_markdown = json.loads(content).get("markdown", {}).get("raw_markdown", "")
+        is_json = True
+    except json.JSONDecodeError:
+        raw_markdown = content
+        is_json = False
+
+    lines = raw_markdown.split('\n')
+    return {
+        "json": is_json,
+        "lines": len(lines),
+        "sections": sum(1 for line in lines if line.startswith('## ')),
+    }
+
 
-def validate_scrapers(domain_dir: str) -> dict:
+def content_check(report: dict, domain_path: Path, index: ScanIndex, files: dict):
+    """
+    Cross-validate page content, not just counts, and downgrade verdicts it contradicts
+
+    Every page is MinHash-sketched (cached in the scan index) and playwright's
+    sections are matched against the other scrapers' pages through an LSH
+    index. Adds report["content"]; a COMPLETE scraper becomes INCOMPLETE if
+    its pages are mostly empty/duplicated (playwright) or fail to contain
+    the playwright sections (httrack, crawl4ai).
+
+    Args:
+        files: Scraper name -> (subdirectory, [(rel_path, size, mtime_ns)], format)
+    """
+    started = time.monotonic()
+    sketches = {}
+    for name, (subdir, entries, fmt) in files.items():
+        values = index.get_many(
+            ((f"{subdir}/{rel}", domain_path / subdir / rel, size, mtime) for rel, size, mtime in entries),
+            f"minhash_{fmt}", sketch_file, fmt
+        )
+        if fmt == "content_md":
+            # One document split at headings: each chunk is a pseudo-page
+            sketches[name] = {f"{key}#{i}": chunk for key, chunks in values.items() for i, chunk in enumerate(chunks)}
+        else:
+            sketches[name] = {key[len(subdir) + 1:]: value for key, value in values.items()}
+
+    reference = sketches.pop("playwright")
+    content = cross_validate(reference, sketches)
+    content["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    report["content"] = content
+
+    expected = report["ground_truth"]["sections"]
+    ref = content["reference"]
+    duplicates = sum(len(group) - 1 for group in ref["near_duplicates"])
+    unique_pages = ref["pages"] - len(ref["empty_pages"]) - duplicates
+    playwright = report["scrapers"]["playwright"]
+    playwright["unique_pages"] = unique_pages
+    if ref["empty_pages"] or duplicates:
+        playwright["notes"] += f"; {len(ref['empty_pages'])} empty, {duplicates} near-duplicate pages"
+    if playwright["verdict"] == "COMPLETE" and unique_pages < expected * 0.9:
+        playwright["verdict"] = "INCOMPLETE"
+
+    for name, summary in content["scrapers"].items():
+        data = report["scrapers"][name]
+        data["content_agreement"] = summary["agreement"]
+        data["notes"] += (f"; content matches {summary['sections_matched']}/{summary['sections_checked']} "
+                          f"playwright sections")
+        if data["verdict"] == "COMPLETE" and summary["agreement"] < 0.8:
+            data["verdict"] = "INCOMPLETE"
+
+
+def validate_scrapers(domain_dir: str, check_content: bool = True, pool=None) -> dict:
     """
     Validate all scraper outputs for a domain
 
     Args:
         domain_dir: Path to domain directory (e.g., .../full-docs-website/repoprompt.com)
+        check_content: Also compare page content across scrapers (MinHash/LSH)
+        pool: Process pool shared across domains for re-parsing changed files
+              (default: one per call, when enough files changed)
 
     Returns:
         Validation report dict
     """
     domain_path = Path(domain_dir)
+    started = time.monotonic()
 
-    # Load sitemap (ground truth from playwright)
+    # Load sitemap (ground truth: playwright, static or httrack_to_tree.py output)
     sitemap_file = domain_path / "sitemap.json"
 
     if not sitemap_file.exists():
@@ -36,6 +125,7 @@ def validate_scrapers(domain_dir: str) -> dict:
 
     ground_truth_sections = sitemap.get("scraped_sections", 0)
     ground_truth_dirs = set(sitemap.get("directories", []))
+    converted_from = CONVERTED_SITEMAPS.get(sitemap.get("scraper"))
 
     report = {
         "domain": domain_path.name,
@@ -48,20 +138,28 @@ def validate_scrapers(domain_dir: str) -> dict:
         "scrapers": {}
     }
 
+    # Per-file results are cached by (size, mtime); only changed files are re-parsed
+    index = ScanIndex(domain_path, pool)
+    scanned = []
+    content_files = {}
+
     # Validate httrack
     httrack_path = domain_path / "httrack"
     if httrack_path.exists():
-        html_files = list(httrack_path.rglob("*.html"))
-        # Exclude HTTrack's own files (index.html, hts-cache, etc.)
-        doc_files = [f for f in html_files if 'hts-' not in str(f) and 'index.html' not in f.name]
+        # HTTrack's own files: hts-cache/, hts-log.txt, ... and the project index.html at the mirror root
+        html_files = scan_tree(httrack_path, (".html",), skip_prefixes=("hts-",))
+        scanned += [f"httrack/{rel}" for rel, _, _ in html_files]
+        doc_entries = [entry for entry in html_files if entry[0] != "index.html"]
+        doc_files = [rel for rel, _, _ in doc_entries]
+        if converted_from != "httrack":
+            content_files["httrack"] = ("httrack", doc_entries, "html")
 
         # Check if httrack has tree structure (multiple subdirectories with content)
         subdirs = set()
-        for f in doc_files:
-            # Get parent directory relative to httrack root
-            rel_path = f.relative_to(httrack_path)
-            if len(rel_path.parts) > 1:  # Has subdirectory
-                subdirs.add(rel_path.parts[0])
+        for rel in doc_files:
+            parts = rel.split(os.sep)
+            if len(parts) > 1:  # Has subdirectory
+                subdirs.add(parts[0])
 
         has_tree_structure = len(subdirs) >= 3  # At least 3 section directories
 
@@ -76,6 +174,10 @@ def validate_scrapers(domain_dir: str) -> dict:
                      f"Full HTML mirror with tree structure ({len(subdirs)} sections)" if has_tree_structure else
                      "HTML files but flat structure"
         }
+        if converted_from == "httrack":
+            report["scrapers"]["httrack"].update(
+                verdict="SOURCE",
+                notes="Source of sitemap.json and playwright/ (httrack_to_tree.py); not checked against them")
     else:
         report["scrapers"]["httrack"] = {
             "exists": False,
@@ -86,46 +188,54 @@ def validate_scrapers(domain_dir: str) -> dict:
     crawl4ai_path = domain_path / "crawl4ai"
     if crawl4ai_path.exists():
         content_file = crawl4ai_path / "content.md"
+        pages_path = crawl4ai_path / "pages"
+        metadata_file = crawl4ai_path / "metadata.json"
 
-        if content_file.exists():
-            with open(content_file) as f:
-                content = f.read()
-
-            # Try to parse as JSON
+        # metadata.json records which mode ran last; fall back to what is on disk
+        crawl_mode = pages_path.is_dir()
+        if metadata_file.exists():
             try:
-                data = json.loads(content)
-                raw_markdown = data.get("markdown", {}).get("raw_markdown", "")
-                lines = raw_markdown.split('\n')
-                sections = [l for l in lines if l.startswith('## ')]
-
-                report["scrapers"]["crawl4ai"] = {
-                    "exists": True,
-                    "lines": len(lines),
-                    "sections_detected": len(sections),
-                    "expected_sections": ground_truth_sections,
-                    "coverage": len(sections) / ground_truth_sections if ground_truth_sections > 0 else 0,
-                    "verdict": "COMPLETE" if len(sections) >= ground_truth_sections * 0.8 else "INCOMPLETE",
-                    "notes": "TOC-only capture" if len(lines) < 300 else "Full content"
-                }
-            except json.JSONDecodeError:
-                # Plain markdown
-                lines = content.split('\n')
-                sections = [l for l in lines if l.startswith('## ')]
-
-                report["scrapers"]["crawl4ai"] = {
-                    "exists": True,
-                    "lines": len(lines),
-                    "sections_detected": len(sections),
-                    "expected_sections": ground_truth_sections,
-                    "coverage": len(sections) / ground_truth_sections if ground_truth_sections > 0 else 0,
-                    "verdict": "COMPLETE" if len(sections) >= ground_truth_sections * 0.8 else "INCOMPLETE",
-                    "notes": "Plain markdown format"
-                }
+                with open(metadata_file) as f:
+                    crawl_mode = json.load(f).get("output") == "pages/"
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        if crawl_mode and pages_path.is_dir():
+            # Multi-page crawl (crawl4ai_scraper.py --crawl): one markdown file per page
+            page_files = scan_tree(pages_path, (".md",))
+            scanned += [f"crawl4ai/pages/{rel}" for rel, _, _ in page_files]
+            content_files["crawl4ai"] = ("crawl4ai/pages", page_files, "markdown")
+
+            report["scrapers"]["crawl4ai"] = {
+                "exists": True,
+                "pages": len(page_files),
+                "expected_sections": ground_truth_sections,
+                "coverage": len(page_files) / ground_truth_sections if ground_truth_sections > 0 else 0,
+                "verdict": "COMPLETE" if len(page_files) >= ground_truth_sections * 0.8 else "INCOMPLETE",
+                "notes": f"Per-page crawl ({len(page_files)} pages)"
+            }
+        elif content_file.exists():
+            st = content_file.stat()
+            scanned.append("crawl4ai/content.md")
+            stats = index.get("crawl4ai/content.md", st.st_size, st.st_mtime_ns, "markdown_stats",
+                              lambda: markdown_stats(content_file))
+            content_files["crawl4ai"] = ("crawl4ai", [("content.md", st.st_size, st.st_mtime_ns)], "content_md")
+            lines, sections = stats["lines"], stats["sections"]
+
+            report["scrapers"]["crawl4ai"] = {
+                "exists": True,
+                "lines": lines,
+                "sections_detected": sections,
+                "expected_sections": ground_truth_sections,
+                "coverage": sections / ground_truth_sections if ground_truth_sections > 0 else 0,
+                "verdict": "COMPLETE" if sections >= ground_truth_sections * 0.8 else "INCOMPLETE",
+                "notes": ("TOC-only capture" if lines < 300 else "Full content") if stats["json"] else "Plain markdown format"
+            }
         else:
             report["scrapers"]["crawl4ai"] = {
                 "exists": True,
                 "verdict": "ERROR",
-                "notes": "Directory exists but content.md missing"
+                "notes": "Directory exists but content.md and pages/ missing"
             }
     else:
         report["scrapers"]["crawl4ai"] = {
@@ -136,8 +246,11 @@ def validate_scrapers(domain_dir: str) -> dict:
     # Validate playwright
     playwright_path = domain_path / "playwright"
     if playwright_path.exists():
-        md_files = list(playwright_path.rglob("*.md"))
-        directories = [d.name for d in playwright_path.iterdir() if d.is_dir()]
+        md_files = scan_tree(playwright_path, (".md",))
+        scanned += [f"playwright/{rel}" for rel, _, _ in md_files]
+        content_files["playwright"] = ("playwright", md_files, "markdown")
+        with os.scandir(playwright_path) as entries:
+            directories = [entry.name for entry in entries if entry.is_dir()]
 
         report["scrapers"]["playwright"] = {
             "exists": True,
@@ -146,7 +259,8 @@ def validate_scrapers(domain_dir: str) -> dict:
             "expected_sections": ground_truth_sections,
             "coverage": len(md_files) / ground_truth_sections if ground_truth_sections > 0 else 0,
             "verdict": "COMPLETE" if len(md_files) >= ground_truth_sections * 0.9 else "INCOMPLETE",
-            "notes": "Directory tree structure (ground truth)"
+            "notes": f"Converted from {converted_from}/ (ground truth)" if converted_from else
+                     "Directory tree structure (ground truth)"
         }
     else:
         report["scrapers"]["playwright"] = {
@@ -154,6 +268,10 @@ def validate_scrapers(domain_dir: str) -> dict:
             "verdict": "MISSING"
         }
 
+    # Content cross-validation (needs playwright's sections as the reference)
+    if check_content and "playwright" in content_files:
+        content_check(report, domain_path, index, content_files)
+
     # Overall verdict
     complete_scrapers = [
         name for name, data in report["scrapers"].items()
@@ -184,6 +302,15 @@ def validate_scrapers(domain_dir: str) -> dict:
     else:
         report["overall"]["recommendation"] = "WARNING: No complete scraper output found. Manual review required."
 
+    index.prune(scanned)
+    index.save()
+    report["scan"] = {
+        "files_scanned": len(scanned),
+        "index_hits": index.hits,
+        "index_misses": index.misses,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+
     return report
 
 
@@ -193,7 +320,7 @@ def print_report(report: dict):
     print(f"SCRAPER VALIDATION REPORT: {report['domain']}")
     print("="*80)
 
-    print(f"\n📊 Ground Truth (from sitemap):")
+    print(f"\n📊 Ground Truth (from sitemap, {report['ground_truth']['scraper']}):")
     gt = report['ground_truth']
     print(f"   Sections: {gt['sections']}")
     print(f"   Directories: {gt['directories']}")
@@ -207,7 +334,8 @@ def print_report(report: dict):
             'COMPLETE': '✅',
             'INCOMPLETE': '⚠️',
             'MISSING': '❌',
-            'ERROR': '🔴'
+            'ERROR': '🔴',
+            'SOURCE': 'ℹ️'
         }.get(verdict, '❓')
 
         print(f"\n   {emoji} {scraper.upper()}: {verdict}")
@@ -216,6 +344,10 @@ def print_report(report: dict):
             if scraper == 'httrack':
                 print(f"      HTML files: {data.get('html_files', 0)}")
                 print(f"      Notes: {data.get('notes', '')}")
+            elif scraper == 'crawl4ai' and 'pages' in data:
+                print(f"      Pages: {data.get('pages', 0)}/{data.get('expected_sections', 0)}")
+                print(f"      Coverage: {data.get('coverage', 0):.1%}")
+                print(f"      Notes: {data.get('notes', '')}")
             elif scraper == 'crawl4ai':
                 print(f"      Lines: {data.get('lines', 0)}")
                 print(f"      Sections: {data.get('sections_detected', 0)}/{data.get('expected_sections', 0)}")
@@ -227,6 +359,16 @@ def print_report(report: dict):
                 print(f"      Coverage: {data.get('coverage', 0):.1%}")
                 print(f"      Notes: {data.get('notes', '')}")
 
+    if 'content' in report:
+        content = report['content']
+        print(f"\n🧬 Content check (MinHash/LSH, {content['elapsed_ms']:.0f}ms):")
+        ref = content['reference']
+        print(f"   playwright: {ref['pages']} pages, {len(ref['empty_pages'])} empty, "
+              f"{len(ref['near_duplicates'])} near-duplicate groups")
+        for scraper, summary in content['scrapers'].items():
+            print(f"   {scraper}: matches {summary['sections_matched']}/{summary['sections_checked']} "
+                  f"sections ({summary['agreement']:.1%}), {summary['empty_pages']} empty pages")
+
     print(f"\n💡 Recommendation:")
     print(f"   {report['overall']['recommendation']}")
 
@@ -238,20 +380,98 @@ def print_report(report: dict):
     print("\n" + "="*80 + "\n")
 
 
+def save_report(domain_dir, report: dict) -> Path:
+    """Write validation-report.json next to the scraper outputs"""
+    report_file = Path(domain_dir) / "validation-report.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report_file
+
+
+def find_domain_dirs(full_docs_dir: Path) -> list:
+    """Domain directories under full-docs-website that hold any scraper output"""
+    return sorted(
+        d for d in full_docs_dir.iterdir()
+        if d.is_dir() and ((d / "sitemap.json").exists() or any((d / name).is_dir() for name in SCRAPER_DIRS))
+    )
+
+
+def validate_all(full_docs_dir: Path, workers: int, check_content: bool = True) -> bool:
+    """
+    Validate every domain in one process with a thread pool
+
+    Returns:
+        True if every domain has at least one complete scraper
+    """
+    domain_dirs = find_domain_dirs(full_docs_dir)
+    if not domain_dirs:
+        print(f"No scraped domains found in {full_docs_dir}", file=sys.stderr)
+        return False
+
+    started = time.monotonic()
+    # One process pool for all domain threads; spawn, since forking a threaded process can deadlock
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as processes:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(lambda d: validate_scrapers(d, check_content, processes), domain_dirs))
+
+    print("\n" + "="*80)
+    print(f"SCRAPER VALIDATION: {len(domain_dirs)} domains in {full_docs_dir}")
+    print("="*80)
+
+    all_ok = True
+    for domain_dir, report in zip(domain_dirs, reports):
+        if "error" in report:
+            all_ok = False
+            print(f"🔴 {domain_dir.name:<40} ERROR: {report['error']}")
+            continue
+
+        save_report(domain_dir, report)
+        complete = report["overall"]["complete_scrapers"]
+        all_ok = all_ok and bool(complete)
+        verdicts = "  ".join(f"{name}={data.get('verdict', '?')}" for name, data in report["scrapers"].items())
+        print(f"{'✅' if complete else '⚠️ '} {domain_dir.name:<40} {verdicts}  "
+              f"({report['scan']['files_scanned']} files, {report['scan']['elapsed_ms']:.0f}ms)")
+
+    print("="*80)
+    print(f"Validated {len(domain_dirs)} domains in {time.monotonic() - started:.2f}s; "
+          f"reports saved to <domain>/validation-report.json\n")
+    return all_ok
+
+
 def main():
     """CLI entry point"""
-    if len(sys.argv) != 2:
-        print("Usage: validate_scrapers.py <domain_dir>", file=sys.stderr)
-        print("Example: validate_scrapers.py /Users/MN/GITHUB/.knowledge/full-docs-website/repoprompt.com", file=sys.stderr)
-        sys.exit(1)
-
-    domain_dir = sys.argv[1]
+    parser = argparse.ArgumentParser(
+        prog="validate_scrapers.py",
+        description="Cross-validate scraper outputs against the sitemap (playwright, static or httrack_to_tree.py)",
+        epilog="Example: validate_scrapers.py /Users/MN/GITHUB/.knowledge/full-docs-website/repoprompt.com"
+    )
+    parser.add_argument("domain_dir", nargs="?", help="Domain directory to validate")
+    parser.add_argument("--all", nargs="?", const=str(DEFAULT_FULL_DOCS_DIR), default=None,
+                        metavar="FULL_DOCS_DIR",
+                        help=f"Validate every domain under FULL_DOCS_DIR (default: {DEFAULT_FULL_DOCS_DIR})")
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1),
+                        help="--all: domains validated in parallel (default: min(8, cores))")
+    parser.add_argument("--no-content", action="store_true",
+                        help="Skip the MinHash/LSH content cross-check (counts only)")
+    args = parser.parse_args()
+
+    if bool(args.domain_dir) == bool(args.all):
+        parser.error("give either a domain directory or --all")
+
+    if args.all:
+        full_docs_dir = Path(args.all)
+        if not full_docs_dir.is_dir():
+            print(f"ERROR: Directory not found: {full_docs_dir}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0 if validate_all(full_docs_dir, max(1, args.workers), not args.no_content) else 1)
+
+    domain_dir = args.domain_dir
 
     if not Path(domain_dir).exists():
         print(f"ERROR: Directory not found: {domain_dir}", file=sys.stderr)
         sys.exit(1)
 
-    report = validate_scrapers(domain_dir)
+    report = validate_scrapers(domain_dir, not args.no_content)
 
     if "error" in report:
         print(f"ERROR: {report['error']}", file=sys.stderr)
@@ -262,9 +482,7 @@ def main():
     print_report(report)
 
     # Save JSON report
-    report_file = Path(domain_dir) / "validation-report.json"
-    with open(report_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    report_file = save_report(domain_dir, report)
 
     print(f"📝 Full report saved to: {report_file}")
 
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Batch sync of every repo in full-repo/MANIFEST.yaml
+Stale repos are cloned or fast-forwarded concurrently, at most --jobs at a time
+
+Object sharing (optional):
+  --shared-store  every repo is first fetched into one bare store; clones borrow its objects
+                  through git alternates, so forks and related repos keep one copy of each pack
+  --filter        partial clone filter for new clones (e.g. blob:none: history without old blobs)
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent / "tools"))
+from manifest_store import ManifestStore, parse_timestamp  # noqa: E402
+
+DEFAULT_KNOWLEDGE_ROOT = SCRIPT_DIR.parent.parent / ".knowledge"
+
+STALENESS_DAYS = 7
+DEFAULT_JOBS = 8
+STORE_DIR_NAME = ".shared-objects.git"
+LOG_DIR_NAME = ".batch-logs"
+_OWNER_REPO_RE = re.compile(r'.*[:/]([^/]+)/([^/]+)$')
+
+
+def repo_dir_name(url: str) -> str:
+    """<owner>-<repo>, lowercased, as sync.sh names the clone directory (None if unparseable)"""
+    trimmed = url[:-4] if url.endswith(".git") else url
+    m = _OWNER_REPO_RE.match(trimmed.rstrip('/'))
+    return f"{m.group(1)}-{m.group(2)}".lower() if m else None
+
+
+def repo_age_days(repo: dict, now: datetime):
+    """Days since the repo was last synced (None if never)"""
+    last_synced = parse_timestamp(repo.get("last_synced"))
+    if last_synced is None:
+        return None
+    return (now - last_synced).days
+
+
+def is_stale(repo: dict, clone_dir: Path, now: datetime, staleness_days: int = STALENESS_DAYS) -> bool:
+    """Same rule as sync.sh: no clone, never synced, or synced more than staleness_days ago"""
+    age = repo_age_days(repo, now)
+    return not clone_dir.is_dir() or age is None or age > staleness_days
+
+
+async def run_logged(argv: list, log, cwd: Path = None) -> int:
+    """Run a process with stdout+stderr appended to an open log; returns its exit code (127 if not found)"""
+    log.write(f"$ {' '.join(argv)}\n".encode('utf-8'))
+    log.flush()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv, cwd=cwd, stdin=asyncio.subprocess.DEVNULL, stdout=log, stderr=asyncio.subprocess.STDOUT
+        )
+    except FileNotFoundError as e:
+        log.write(f"ERROR: {e}\n".encode('utf-8'))
+        return 127
+    return await process.wait()
+
+
+async def git_output(clone_dir: Path, *args) -> str:
+    """stdout of a git command in clone_dir ('' if it fails)"""
+    process = await asyncio.create_subprocess_exec(
+        "git", "-C", str(clone_dir), *args,
+        stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode('utf-8', errors='replace').strip() if process.returncode == 0 else ""
+
+
+class SharedStore:
+    """
+    One bare repository holding the objects of every synced repo
+
+    Each repo is a remote of the store and is fetched into
+    refs/remotes/<name>/ before its clone is touched; fetches negotiate with
+    everything already in the store, so a fork only downloads what its
+    upstream lacks. Clones then list the store in objects/info/alternates
+    and keep only the objects it does not have.
+
+    The refs are what keep the store's objects alive, so repos are never
+    removed from it automatically, and auto-gc is off so concurrent fetches
+    never race a repack. Deleting the store breaks every clone that borrows
+    from it.
+    """
+
+    def __init__(self, path: Path, filter_spec: str = None):
+        self.path = path
+        self.filter_spec = filter_spec
+        self.config_lock = asyncio.Lock()  # git config writes take config.lock: one at a time
+        self.ready = False
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.path / "objects"
+
+    async def ensure(self, log) -> bool:
+        """Create the bare store on first use"""
+        async with self.config_lock:
+            if self.ready:
+                return True
+            if not (self.path / "HEAD").is_file():
+                if await run_logged(["git", "init", "--bare", "--quiet", str(self.path)], log) != 0:
+                    return False
+                await run_logged(["git", "-C", str(self.path), "config", "gc.auto", "0"], log)
+            self.ready = True
+            return True
+
+    async def fetch(self, name: str, url: str, branch: str, log) -> bool:
+        """Fetch one branch (or HEAD) of url into refs/remotes/<name>/"""
+        if not await self.ensure(log):
+            return False
+        git = ["git", "-C", str(self.path)]
+        async with self.config_lock:
+            if await git_output(self.path, "config", "--get", f"remote.{name}.url") != url:
+                await run_logged(git + ["config", f"remote.{name}.url", url], log)
+            if self.filter_spec:
+                # Fetching with --filter needs the remote marked as a promisor
+                await run_logged(git + ["config", f"remote.{name}.promisor", "true"], log)
+                await run_logged(git + ["config", f"remote.{name}.partialclonefilter", self.filter_spec], log)
+
+        source = f"refs/heads/{branch}" if branch else "HEAD"
+        refspec = f"+{source}:refs/remotes/{name}/{branch or 'HEAD'}"
+        return await run_logged(git + ["fetch", "--quiet", "--no-tags", "--no-write-fetch-head", name, refspec],
+                                log) == 0
+
+    async def link(self, clone_dir: Path, log) -> bool:
+        """
+        Make an existing clone borrow from the store, dropping the objects it now shares
+
+        `git repack -a -d -l` rewrites the clone's packs without any object
+        the store already has.
+        """
+        alternates = clone_dir / ".git" / "objects" / "info" / "alternates"
+        store_objects = str(self.objects_dir.resolve())
+        existing = alternates.read_text().split() if alternates.is_file() else []
+        if store_objects in existing:
+            return True
+        alternates.parent.mkdir(parents=True, exist_ok=True)
+        with open(alternates, 'a') as f:
+            f.write(store_objects + "\n")
+        return await run_logged(["git", "-C", str(clone_dir), "repack", "-a", "-d", "-l", "-q"], log) == 0
+
+
+async def sync_repo(repo: dict, full_repo_dir: Path, slots: asyncio.Semaphore, store: SharedStore,
+                    args) -> dict:
+    """
+    Clone or fast-forward one repo (same steps as sync.sh) once a slot is free
+
+    Returns:
+        Repo record: name, url, branch, status, commit, previous_commit, wall_s, queued_s, log
+    """
+    name = repo["name"]
+    url = repo["url"]
+    branch = repo.get("branch") or args.branch or None
+    clone_dir = full_repo_dir / name
+    log_file = full_repo_dir / LOG_DIR_NAME / f"{name}.log"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    queued_at = time.monotonic()
+    async with slots:
+        started_at = time.monotonic()
+        existed = clone_dir.is_dir()
+        print(f"==> [{name}] {'update' if existed else 'clone'} started", flush=True)
+        previous_commit = await git_output(clone_dir, "rev-parse", "HEAD") if existed else ""
+
+        with open(log_file, 'wb') as log:
+            if store is not None and not await store.fetch(name, url, branch, log):
+                log.write(b"WARNING: shared store fetch failed, syncing without it\n")
+
+            if not existed:
+                argv = ["git", "clone", "--quiet"]
+                if args.filter:
+                    argv.append(f"--filter={args.filter}")
+                if store is not None:
+                    argv += ["--reference-if-able", str(store.path)]
+                if branch:
+                    argv += ["--branch", branch]
+                exit_code = await run_logged(argv + [url, str(clone_dir)], log)
+            else:
+                if store is not None:
+                    await store.link(clone_dir, log)
+                if not branch:
+                    branch = await git_output(clone_dir, "rev-parse", "--abbrev-ref", "HEAD")
+                git = ["git", "-C", str(clone_dir)]
+                exit_code = await run_logged(
+                    git + ["fetch", "--quiet", "origin", f"+refs/heads/{branch}:refs/remotes/origin/{branch}"], log)
+                if exit_code == 0:
+                    exit_code = await run_logged(git + ["checkout", "--quiet", branch], log)
+                if exit_code == 0:
+                    exit_code = await run_logged(git + ["merge", "--ff-only", "--quiet", f"origin/{branch}"], log)
+
+        commit = await git_output(clone_dir, "rev-parse", "HEAD") if exit_code == 0 else ""
+        if exit_code == 0 and not branch:
+            branch = await git_output(clone_dir, "rev-parse", "--abbrev-ref", "HEAD")
+        wall_s = time.monotonic() - started_at
+
+    status = "ok" if exit_code == 0 and commit else "failed"
+    changed = "" if status != "ok" else ("unchanged" if commit == previous_commit else commit[:12])
+    print(f"    [{name}] {status} in {wall_s:.1f}s {changed}".rstrip(), flush=True)
+    return {
+        "name": name,
+        "url": url,
+        "branch": branch,
+        "status": status,
+        "exit_code": exit_code,
+        "commit": commit,
+        "previous_commit": previous_commit,
+        "wall_s": round(wall_s, 2),
+        "queued_s": round(started_at - queued_at, 2),
+        "log": str(log_file),
+        "finished_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+async def run_batch(repos: list, full_repo_dir: Path, args) -> list:
+    """Sync all repos concurrently; the semaphore bounds how many git processes run"""
+    slots = asyncio.Semaphore(args.jobs)
+    store = SharedStore(args.shared_store, args.filter) if args.shared_store else None
+    return await asyncio.gather(*[sync_repo(repo, full_repo_dir, slots, store, args) for repo in repos])
+
+
+def update_manifest_entries(manifest_file: Path, results: list):
+    """Record url, branch, last_synced and commit for every repo that synced (same fields as sync.sh)"""
+    synced = {
+        result["name"]: {
+            "url": result["url"],
+            "branch": result["branch"],
+            "last_synced": result["finished_at"],
+            "commit": result["commit"],
+        }
+        for result in results if result["status"] == "ok"
+    }
+    if synced:
+        with ManifestStore(manifest_file) as store:
+            store.upsert_many("repos", synced)
+
+
+def print_summary(summary: dict):
+    """Human-readable run summary"""
+    print()
+    print("=" * 70)
+    print(f"BATCH SYNC SUMMARY ({summary['repos_synced']} synced, {summary['repos_skipped']} fresh, "
+          f"{summary['wall_s']:.1f}s wall)")
+    print("=" * 70)
+    for repo in summary["repos"]:
+        icon = "✅" if repo["status"] == "ok" else "❌"
+        state = repo["commit"][:12] if repo["commit"] else "see log"
+        if repo["commit"] and repo["commit"] == repo["previous_commit"]:
+            state = "unchanged"
+        print(f"{icon} {repo['name']:<40} {repo['wall_s']:>8.1f}s  {state}")
+    print("=" * 70)
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="batch_sync.py",
+        description="Clone or update all stale repos in full-repo/MANIFEST.yaml concurrently"
+    )
+    parser.add_argument("repos", nargs="*", metavar="REPO",
+                        help="Only these manifest names; a URL adds a repo not in the manifest yet "
+                             "(default: every repo)")
+    parser.add_argument("--force", action="store_true", help="Sync fresh repos too")
+    parser.add_argument("--staleness-days", type=int, default=STALENESS_DAYS,
+                        help=f"Age after which a repo is stale (default: {STALENESS_DAYS})")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Repos syncing at once (default: {DEFAULT_JOBS})")
+    parser.add_argument("--branch", help="Branch for repos whose manifest entry has none (default: remote HEAD)")
+    parser.add_argument("--shared-store", type=Path, nargs="?", const=True, metavar="PATH",
+                        help=f"Share objects through a bare store (default PATH: full-repo/{STORE_DIR_NAME})")
+    parser.add_argument("--filter", metavar="SPEC",
+                        help="Partial clone filter for new clones and the shared store, e.g. blob:none")
+    parser.add_argument("--knowledge-root", type=Path, default=DEFAULT_KNOWLEDGE_ROOT,
+                        help=f".knowledge directory (default: {DEFAULT_KNOWLEDGE_ROOT})")
+    parser.add_argument("--dry-run", action="store_true", help="List the repos that would be synced")
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    full_repo_dir = args.knowledge_root / "full-repo"
+    manifest_file = full_repo_dir / "MANIFEST.yaml"
+    if args.shared_store is True:
+        args.shared_store = full_repo_dir / STORE_DIR_NAME
+    full_repo_dir.mkdir(parents=True, exist_ok=True)
+    with ManifestStore(manifest_file) as store:
+        repos = [repo for repo in store.entries("repos") if repo.get("url")]
+
+    if args.repos:
+        known = {repo["name"] for repo in repos}
+        selected = set()
+        for item in args.repos:
+            if "/" in item:
+                name = repo_dir_name(item)
+                if not name:
+                    print(f"ERROR: Could not parse owner/repo from URL: {item}", file=sys.stderr)
+                    sys.exit(1)
+                if name not in known:
+                    repos.append({"name": name, "url": item})
+                    known.add(name)
+                selected.add(name)
+            elif item in known:
+                selected.add(item)
+            else:
+                print(f"ERROR: Not in {manifest_file}: {item}", file=sys.stderr)
+                sys.exit(1)
+        repos = [repo for repo in repos if repo["name"] in selected]
+
+    now = datetime.now(timezone.utc)
+    stale = [repo for repo in repos
+             if args.force or is_stale(repo, full_repo_dir / repo["name"], now, args.staleness_days)]
+
+    print(f"==> {len(repos)} repo(s) selected, {len(stale)} to sync ({args.jobs} at a time)")
+    for repo in repos:
+        age = repo_age_days(repo, now)
+        state = "sync" if repo in stale else "fresh"
+        print(f"    {repo['name']:<40} {'never' if age is None else f'{age}d ago':>10}  {state}")
+
+    if args.dry_run or not stale:
+        sys.exit(0)
+
+    start = time.monotonic()
+    results = asyncio.run(run_batch(stale, full_repo_dir, args))
+
+    update_manifest_entries(manifest_file, results)
+
+    summary = {
+        "started_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "wall_s": round(time.monotonic() - start, 2),
+        "jobs": args.jobs,
+        "shared_store": str(args.shared_store) if args.shared_store else None,
+        "filter": args.filter,
+        "repos_synced": len(results),
+        "repos_skipped": len(repos) - len(stale),
+        "repos_failed": sum(1 for r in results if r["status"] != "ok"),
+        "repos": results,
+    }
+    summary_file = full_repo_dir / "batch-summary.json"
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print_summary(summary)
+    print(f"📄 Summary saved: {summary_file}")
+    sys.exit(0 if summary["repos_failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
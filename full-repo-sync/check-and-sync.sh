@@ -13,10 +13,13 @@ REPO_URL="$1"
 DEST_CURATED="$2"
 MANIFEST_PATH="/Users/MN/GITHUB/.knowledge/full-repo/MANIFEST.yaml"
 SYNC_SCRIPT="$(cd "$(dirname "$0")" && pwd)/sync.sh"
+MANIFEST_STORE="$(cd "$(dirname "$0")/../tools" && pwd)/manifest_store.py"
 
-# Parse repo name from URL (format: owner-repo)
+# Parse repo name from URL (format: owner-repo, lowercased - the manifest key sync.sh uses)
 parse_repo_name() {
-  echo "$1" | sed -E 's#^https?://github\.com/([^/]+)/([^/\.]+)(\.git)?.*$#\1-\2#'
+  local trimmed="${1%.git}"
+  trimmed="${trimmed%/}"
+  printf "%s\n" "$trimmed" | sed -E 's#.*[:/]([^/]+)/([^/]+)$#\1-\2#' | tr '[:upper:]' '[:lower:]'
 }
 
 REPO_NAME=$(parse_repo_name "$REPO_URL")
@@ -40,32 +43,12 @@ if [ ! -f "$MANIFEST_PATH" ]; then
   exec "$SYNC_SCRIPT" "$REPO_URL"
 fi
 
-# Extract last_synced date for this repo
-LAST_SYNC=$(grep -A 3 "repo_name: $REPO_NAME" "$MANIFEST_PATH" | grep "last_synced:" | awk '{print $2}' || echo "")
-
-if [ -z "$LAST_SYNC" ]; then
+# Days since last sync for this repo (indexed lookup in MANIFEST.sqlite, see tools/manifest_store.py)
+if ! DAYS_OLD=$(python3 "$MANIFEST_STORE" "$MANIFEST_PATH" age repos "$REPO_NAME"); then
   echo "⚠️  Repo not in manifest - syncing"
   exec "$SYNC_SCRIPT" "$REPO_URL"
 fi
-
-# Calculate days since sync (portable: macOS & Linux)
-# Detect OS and use appropriate date command
-if date --version >/dev/null 2>&1; then
-  # GNU date (Linux)
-  LAST_SYNC_EPOCH=$(date -d "$LAST_SYNC" "+%s" 2>/dev/null || echo "0")
-else
-  # BSD date (macOS)
-  LAST_SYNC_EPOCH=$(date -j -f "%Y-%m-%dT%H:%M:%SZ" "$LAST_SYNC" "+%s" 2>/dev/null || echo "0")
-fi
-
-NOW_EPOCH=$(date "+%s")
-DAYS_OLD=$(( (NOW_EPOCH - LAST_SYNC_EPOCH) / 86400 ))
-
-# Fallback if date parsing failed
-if [ "$LAST_SYNC_EPOCH" -eq 0 ]; then
-  echo "⚠️  Could not parse date: $LAST_SYNC - syncing to be safe"
-  exec "$SYNC_SCRIPT" "$REPO_URL"
-fi
+LAST_SYNC=$(python3 "$MANIFEST_STORE" "$MANIFEST_PATH" get repos "$REPO_NAME" last_synced)
 
 echo "Last synced: $LAST_SYNC ($DAYS_OLD days ago)"
 
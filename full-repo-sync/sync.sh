@@ -8,6 +8,7 @@ SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 KNOWLEDGE_ROOT="$(cd "$SCRIPT_DIR/../../.knowledge" && pwd)"
 FULL_REPO_DIR="$KNOWLEDGE_ROOT/full-repo"
 MANIFEST_FILE="$FULL_REPO_DIR/MANIFEST.yaml"
+MANIFEST_STORE="$SCRIPT_DIR/../tools/manifest_store.py"
 STALENESS_DAYS=7
 
 # Parse arguments
@@ -67,39 +68,15 @@ echo "    Target: $REPO_DIR"
 # Create full-repo directory if needed
 mkdir -p "$FULL_REPO_DIR"
 
-# Initialize MANIFEST.yaml if it doesn't exist
-if [ ! -f "$MANIFEST_FILE" ]; then
-  echo "repos: []" > "$MANIFEST_FILE"
-  echo "    Created MANIFEST.yaml"
-fi
-
-# Check if repo exists in manifest
+# Check if repo exists in manifest (indexed lookup in MANIFEST.sqlite, see tools/manifest_store.py)
 check_staleness() {
-  if ! command -v yq &> /dev/null; then
-    echo "    WARNING: yq not found, skipping staleness check (install with: brew install yq)" >&2
-    return 1  # Treat as stale if we can't check
-  fi
-
   local last_synced
-  last_synced=$(yq eval ".repos[] | select(.name == \"$REPO_DIR_NAME\") | .last_synced" "$MANIFEST_FILE" 2>/dev/null || echo "null")
-
-  if [ "$last_synced" = "null" ] || [ -z "$last_synced" ]; then
+  local age_days
+  if ! age_days=$(python3 "$MANIFEST_STORE" "$MANIFEST_FILE" age repos "$REPO_DIR_NAME"); then
     echo "    Not in manifest (first sync)"
     return 1  # Stale (doesn't exist)
   fi
-
-  # Calculate age in days
-  if command -v gdate &> /dev/null; then
-    DATE_CMD=gdate  # macOS with coreutils
-  else
-    DATE_CMD=date
-  fi
-
-  local last_epoch
-  local now_epoch
-  last_epoch=$($DATE_CMD -d "$last_synced" +%s 2>/dev/null || $DATE_CMD -j -f "%Y-%m-%dT%H:%M:%SZ" "$last_synced" +%s 2>/dev/null || echo "0")
-  now_epoch=$($DATE_CMD +%s)
-  local age_days=$(( (now_epoch - last_epoch) / 86400 ))
+  last_synced=$(python3 "$MANIFEST_STORE" "$MANIFEST_FILE" get repos "$REPO_DIR_NAME" last_synced)
 
   echo "    Last synced: $last_synced ($age_days days ago)"
 
@@ -170,28 +147,13 @@ echo "    Current commit: $COMMIT_SHA"
 # Update MANIFEST.yaml
 TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
 
-if command -v yq &> /dev/null; then
-  # Remove existing entry for this repo (if any)
-  yq eval -i "del(.repos[] | select(.name == \"$REPO_DIR_NAME\"))" "$MANIFEST_FILE"
+python3 "$MANIFEST_STORE" "$MANIFEST_FILE" set repos "$REPO_DIR_NAME" \
+  "url=$REPO_URL" \
+  "branch=$BRANCH" \
+  "last_synced=$TIMESTAMP" \
+  "commit=$COMMIT_SHA" \
+  --replace
 
-  # Add new entry
-  yq eval -i ".repos += [{
-    \"name\": \"$REPO_DIR_NAME\",
-    \"url\": \"$REPO_URL\",
-    \"branch\": \"$BRANCH\",
-    \"last_synced\": \"$TIMESTAMP\",
-    \"commit\": \"$COMMIT_SHA\"
-  }]" "$MANIFEST_FILE"
-
-  echo "==> Updated MANIFEST.yaml"
-else
-  echo "WARNING: yq not found, cannot update MANIFEST.yaml (install with: brew install yq)" >&2
-  echo "         Manual entry needed:" >&2
-  echo "         - name: $REPO_DIR_NAME" >&2
-  echo "           url: $REPO_URL" >&2
-  echo "           branch: $BRANCH" >&2
-  echo "           last_synced: $TIMESTAMP" >&2
-  echo "           commit: $COMMIT_SHA" >&2
-fi
+echo "==> Updated MANIFEST.yaml"
 
 echo "==> Sync complete: $REPO_DIR_NAME"
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark curated_tree.py against the original generate-manifest.sh tree export
+Builds a synthetic GitHub API tree, runs both implementations on the same decisions,
+checks the entries are identical and reports timings
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from curated_tree import build_entries
+from glob_matcher import CurationRules
+
+INCLUDE = ["d0/**", "d1/*/d2/**", "*.py", "d4/d4/*"]
+EXCLUDE = ["**/d3/**", "*.md", "**/*.snap"]
+EXTENSIONS = [".py", ".ts", ".md", ".json", ".snap"]
+
+
+def synthetic_tree(files: int, max_depth: int, fanout: int, deep: int, seed: int) -> dict:
+    """GitHub API tree of `files` blobs in a random hierarchy, plus one `deep`-level directory chain"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(files):
+        depth = rng.randint(1, max_depth)
+        dirs = "/".join(f"d{rng.randrange(fanout)}" for _ in range(depth))
+        entries.append({"path": f"{dirs}/f{i}{rng.choice(EXTENSIONS)}", "type": "blob"})
+    if deep:
+        chain = "/".join(f"deep{level}" for level in range(deep))
+        entries += [{"path": f"{chain}/f{i}.py", "type": "blob"} for i in range(3)]
+    return {"tree": entries, "truncated": False}
+
+
+def legacy_entries(decisions):
+    """The tree export as generate-manifest.sh did it before curated_tree.py (kept for comparison)"""
+    class Node:
+        __slots__ = ("name", "children", "files", "kept", "reasons")
+
+        def __init__(self, name):
+            self.name = name
+            self.children = {}
+            self.files = []
+            self.kept = 'mixed'
+            self.reasons = []
+
+    root = Node("")
+
+    def add_file(path, kept, reason):
+        parts = path.split('/')
+        node = root
+        for part in parts[:-1]:
+            node = node.children.setdefault(part, Node(part))
+        node.files.append((path, kept, reason))
+
+    for p, kept, reason in decisions:
+        add_file(p, kept, reason)
+
+    def collapse(node):
+        flags = [k for (_, k, _) in node.files]
+        reasons = [r for (_, _, r) in node.files]
+        for child in node.children.values():
+            collapse(child)
+            if child.kept == 'keep_all':
+                flags.append(True)
+                reasons.extend(child.reasons)
+            elif child.kept == 'omit_all':
+                flags.append(False)
+                reasons.extend(child.reasons)
+            else:
+                flags.append(None)
+        if not flags:
+            node.kept = 'mixed'
+        elif all(f is True for f in flags):
+            node.kept = 'keep_all'
+        elif all(f is False for f in flags):
+            node.kept = 'omit_all'
+        else:
+            node.kept = 'mixed'
+        uniq = []
+        for r in reasons:
+            if r not in uniq:
+                uniq.append(r)
+            if len(uniq) >= 3:
+                break
+        node.reasons = uniq
+
+    collapse(root)
+
+    def export_entries(node, prefix=""):
+        entries = []
+        for name in sorted(node.children.keys()):
+            child = node.children[name]
+            path = f"{prefix}{name}" if not prefix else f"{prefix}/{name}"
+            entries.append({'path': path + '/', 'node': 'dir', 'decision': child.kept, 'reasons': child.reasons})
+            if child.kept == 'mixed':
+                entries.extend(export_entries(child, path))
+        if prefix:
+            parts = prefix.split('/')
+            cur = root
+            for p in parts:
+                if not p:
+                    continue
+                cur = cur.children.get(p, cur)
+        else:
+            cur = root
+        if cur.kept == 'mixed':
+            for (p, k, r) in sorted(cur.files, key=lambda t: t[0]):
+                entries.append({'path': p, 'node': 'file', 'decision': 'keep' if k else 'omit',
+                                'reasons': [r] if r else []})
+        return entries
+
+    return export_entries(root)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args), time.perf_counter() - started
+    except RecursionError:
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="bench_curated_tree.py",
+        description="Time the curated-tree export (legacy vs curated_tree.py) on a synthetic tree"
+    )
+    parser.add_argument("--files", type=int, default=500_000, help="Blobs in the synthetic tree (default: 500000)")
+    parser.add_argument("--max-depth", type=int, default=12, help="Maximum directory depth (default: 12)")
+    parser.add_argument("--fanout", type=int, default=6, help="Directory names per level (default: 6)")
+    parser.add_argument("--deep", type=int, default=0, metavar="LEVELS",
+                        help="Add one directory chain this deep (e.g. 5000 to hit the recursion limit)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.files, args.max_depth, args.fanout, args.deep, args.seed)
+    rules = CurationRules(INCLUDE, EXCLUDE)
+    decisions = [(e["path"], *rules.decide(e["path"])) for e in tree["tree"]]
+    print(f"Synthetic tree: {len(decisions)} files, depth ≤ {max(args.max_depth, args.deep)}", file=sys.stderr)
+
+    current, current_s = timed(build_entries, decisions)
+    legacy, legacy_s = timed(legacy_entries, decisions)
+
+    result = {
+        "files": len(decisions),
+        "entries": len(current),
+        "curated_tree_s": round(current_s, 3),
+        "legacy_s": None if legacy_s is None else round(legacy_s, 3),
+    }
+    if legacy is None:
+        result["legacy_error"] = "RecursionError"
+    else:
+        result["speedup"] = round(legacy_s / current_s, 2)
+        result["identical"] = json.dumps(legacy) == json.dumps(current)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result.get("identical", True) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Curated-tree builder for curated-*-builder/tools/generate-manifest.sh
+Groups per-file keep/omit decisions into a directory tree, collapses uniform directories
+(keep_all / omit_all) and exports the curated-tree.json entries, all in linear time
+"""
+
+import gc
+
+MAX_REASONS = 3  # reasons kept per directory entry
+
+
+def load_sparse_patterns(path):
+    """Include globs from a sparse-checkout file (comments and blank lines skipped, leading '/' dropped)"""
+    pats = []
+    with open(path, 'r') as f:
+        for line in f:
+            s = line.strip()
+            if not s or s.startswith('#'):
+                continue
+            if s.startswith('/'):
+                s = s[1:]
+            pats.append(s)
+    return pats
+
+
+def load_globs(lst):
+    """Exclude globs from curation.yaml (quotes and leading '/' dropped, non-strings ignored)"""
+    pats = []
+    for s in lst or []:
+        if isinstance(s, str):
+            s = s.strip().strip('"').strip("'")
+            if s.startswith('/'):
+                s = s[1:]
+            pats.append(s)
+    return pats
+
+
+class Node:
+    """One directory: child directories in first-seen order and its direct files"""
+    __slots__ = ("name", "children", "files", "kept", "reasons")
+
+    def __init__(self, name):
+        self.name = name
+        self.children = {}
+        self.files = []  # list[(path, keep:bool, reason:str)]
+        self.kept = 'mixed'
+        self.reasons = []
+
+
+class CuratedTree:
+    """
+    Directory tree of file decisions
+
+    Every directory is created once and remembered by its path, so adding a
+    file is a dict lookup rather than a walk down from the root; every pass
+    after that is iterative, so depth is bounded by memory, not the
+    recursion limit.
+    """
+
+    def __init__(self):
+        self.root = Node("")
+        self.dirs = {"": self.root}
+        self.nodes = [self.root]  # creation order: parents before children
+
+    def _dir(self, path):
+        node = self.dirs.get(path)
+        if node is not None:
+            return node
+
+        # Create the missing ancestors top-down so siblings keep first-seen order
+        missing = []
+        while node is None:
+            missing.append(path)
+            path = path.rpartition('/')[0]
+            node = self.dirs.get(path)
+        for path in reversed(missing):
+            child = Node(path.rpartition('/')[2])
+            node.children[child.name] = child
+            self.dirs[path] = child
+            self.nodes.append(child)
+            node = child
+        return node
+
+    def add_file(self, path, kept, reason):
+        self._dir(path.rpartition('/')[0]).files.append((path, kept, reason))
+
+    def collapse(self):
+        """
+        Mark each directory keep_all, omit_all or mixed, with its first MAX_REASONS distinct reasons
+
+        Nodes are visited children-first (reverse creation order). A
+        directory is uniform when all its files and child directories are;
+        reasons come from its files, then its uniform children, in order.
+        """
+        for node in reversed(self.nodes):
+            has_keep = has_omit = has_mixed = False
+            for _, kept, _ in node.files:
+                if kept:
+                    has_keep = True
+                else:
+                    has_omit = True
+            for child in node.children.values():
+                if child.kept == 'keep_all':
+                    has_keep = True
+                elif child.kept == 'omit_all':
+                    has_omit = True
+                else:
+                    has_mixed = True
+
+            if has_mixed or has_keep == has_omit:
+                node.kept = 'mixed'
+            else:
+                node.kept = 'keep_all' if has_keep else 'omit_all'
+
+            reasons = []
+            for _, _, reason in node.files:
+                if reason not in reasons:
+                    reasons.append(reason)
+                    if len(reasons) >= MAX_REASONS:
+                        break
+            if len(reasons) < MAX_REASONS:
+                for child in node.children.values():
+                    if child.kept == 'mixed':
+                        continue
+                    for reason in child.reasons:
+                        if reason not in reasons:
+                            reasons.append(reason)
+                            if len(reasons) >= MAX_REASONS:
+                                break
+                    if len(reasons) >= MAX_REASONS:
+                        break
+            node.reasons = reasons
+
+    def iter_entries(self):
+        """
+        Yield curated-tree.json entries in export order (depth-first, children sorted by name)
+
+        A directory gets one entry; a mixed directory is expanded into its
+        children, followed by its own files sorted by path.
+        """
+        stack = [(self.root, "", iter(sorted(self.root.children)))]
+        while stack:
+            node, prefix, names = stack[-1]
+            name = next(names, None)
+            if name is None:
+                stack.pop()
+                if node.kept == 'mixed':
+                    for (p, k, r) in sorted(node.files, key=lambda t: t[0]):
+                        yield {
+                            'path': p,
+                            'node': 'file',
+                            'decision': 'keep' if k else 'omit',
+                            'reasons': [r] if r else []
+                        }
+                continue
+
+            child = node.children[name]
+            path = f"{prefix}/{name}" if prefix else name
+            yield {'path': path + '/', 'node': 'dir', 'decision': child.kept, 'reasons': child.reasons}
+            if child.kept == 'mixed':
+                stack.append((child, path, iter(sorted(child.children))))
+
+
+def build_entries(decisions):
+    """
+    curated-tree.json entries for (path, kept, reason) file decisions
+
+    The tree is millions of small objects with no reference cycles, so the
+    cyclic garbage collector is paused while it is built: otherwise its
+    repeated full scans cost more than the build itself.
+    """
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        curated = CuratedTree()
+        for path, kept, reason in decisions:
+            curated.add_file(path, kept, reason)
+        curated.collapse()
+        return list(curated.iter_entries())
+    finally:
+        if paused:
+            gc.enable()
+
+
+def curated_entries(tree, rules):
+    """
+    curated-tree.json entries for a GitHub API tree
+
+    Args:
+        tree: GitHub API tree response ({"tree": [{"path", "type", ...}]})
+        rules: glob_matcher.CurationRules deciding keep/omit per blob
+
+    Returns:
+        List of entry dicts
+    """
+    return build_entries(
+        (e['path'], *rules.decide(e['path']))
+        for e in tree.get('tree', []) if e.get('type') == 'blob'
+    )
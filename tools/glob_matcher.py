@@ -0,0 +1,93 @@
+"""
+Compiled glob matching for curated-tree generation (curated-*-builder/tools/generate-manifest.sh)
+Answers "which pattern, in file order, is the first to fnmatch this path" in one lookup
+instead of a Python loop over every pattern, with results identical to fnmatch
+"""
+
+import re
+from fnmatch import translate
+
+_GLOB_CHARS = re.compile(r'[*?\[]')
+
+
+class GlobMatcher:
+    """
+    First-matching-pattern lookup over an ordered list of fnmatch patterns
+
+    Patterns are indexed by their literal head (the text before the first
+    wildcard), a prefix table over the path, so a path only meets patterns
+    that could match it:
+    - literal paths ("README.md"): one dict lookup
+    - literal prefix + trailing stars ("docs/*", "src/**"): one dict lookup
+      per distinct prefix length
+    - other globs: grouped by literal head ("" for leading wildcards), each
+      group compiled into one regex whose alternatives keep file order, so
+      its first matching alternative is the group's first matching pattern
+    Like fnmatch on POSIX, '*' also matches '/' and matching is case-sensitive.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.literals = {}
+        self.prefixes = {}
+        groups = {}
+        for index, pattern in enumerate(self.patterns):
+            stem = pattern.rstrip('*')
+            if not _GLOB_CHARS.search(stem):
+                table = self.prefixes if stem != pattern else self.literals
+                table.setdefault(stem, index)
+            else:
+                head = pattern[:_GLOB_CHARS.search(pattern).start()]
+                groups.setdefault(head, []).append(index)
+
+        self.globs = {
+            head: (indexes[0], re.compile('|'.join(f"(?P<p{i}>{translate(self.patterns[i])})" for i in indexes)))
+            for head, indexes in groups.items()
+        }
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        self.glob_lengths = sorted({len(head) for head in self.globs})
+
+    def match(self, path: str):
+        """The first pattern (in list order) that fnmatches path, or None"""
+        best = self.literals.get(path)
+        for length in self.prefix_lengths:
+            if length > len(path):
+                break
+            index = self.prefixes.get(path[:length])
+            if index is not None and (best is None or index < best):
+                best = index
+        for length in self.glob_lengths:
+            if length > len(path):
+                break
+            group = self.globs.get(path[:length])
+            if group is not None and (best is None or group[0] < best):
+                m = group[1].match(path)
+                if m is not None:
+                    index = int(m.lastgroup[1:])
+                    if best is None or index < best:
+                        best = index
+        return None if best is None else self.patterns[best]
+
+
+class CurationRules:
+    """Sparse-checkout include globs plus curation.yaml exclude globs, decided in one lookup per path"""
+
+    def __init__(self, include_patterns, exclude_patterns):
+        self.include = GlobMatcher(include_patterns)
+        self.exclude = GlobMatcher(exclude_patterns)
+
+    def decide(self, path: str):
+        """
+        Keep/omit decision for one blob and the reason recorded in curated-tree.json
+
+        Returns:
+            (kept, reason): kept if an include pattern matches and no exclude
+            pattern does; the reason names the first matching pattern
+        """
+        included = self.include.match(path)
+        excluded = self.exclude.match(path)
+        if included is not None and excluded is None:
+            return True, f"Included by pattern '{included}'"
+        if excluded is not None:
+            return False, f"Excluded by pattern '{excluded}'"
+        return False, "Outside include patterns"
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed store for the .knowledge MANIFEST.yaml files
+Entries are rows keyed by (collection, name) in a WAL-mode database next to the YAML
+(MANIFEST.yaml -> MANIFEST.sqlite), so a freshness check is one indexed lookup and
+concurrent syncs update their own entries without losing each other's writes.
+MANIFEST.yaml is re-exported after every change for people to read, and hand edits
+to it are imported the next time the store is opened.
+
+Collections are dotted paths into the YAML document: "repos" (full-repo),
+"websites" (full-docs-website), "curated_resources.code_repos" (curated manifest).
+Other top-level scalars ("last_updated") are kept as meta values.
+
+Usage (shell scripts):
+  manifest_store.py <MANIFEST.yaml> get <collection> <name> [field]
+  manifest_store.py <MANIFEST.yaml> age <collection> <name>
+  manifest_store.py <MANIFEST.yaml> set <collection> <name> key=value... [--replace] [--meta key=value]
+  manifest_store.py <MANIFEST.yaml> delete <collection> <name>
+  manifest_store.py <MANIFEST.yaml> export | import
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+BUSY_TIMEOUT_S = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (collection, name)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def format_timestamp(value: datetime) -> str:
+    """UTC timestamp in the manifests' format (2025-01-31T12:00:00Z)"""
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value) -> datetime:
+    """last_synced as an aware datetime (None if missing or unparseable)"""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value), TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _plain(value):
+    """YAML-loaded value with datetimes turned back into the strings the scripts write"""
+    if isinstance(value, datetime):
+        return format_timestamp(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+class ManifestStore:
+    """
+    One manifest: YAML for people, SQLite for the scripts
+
+    Writes run in BEGIN IMMEDIATE transactions, so read-modify-write of an
+    entry is atomic across processes, and the YAML export happens inside the
+    same transaction, so exports land in commit order.
+    """
+
+    def __init__(self, yaml_path, db_path=None):
+        self.yaml_path = Path(yaml_path)
+        self.db_path = Path(db_path) if db_path else self.yaml_path.with_suffix(".sqlite")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._import_if_edited()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _write(self):
+        """Exclusive write transaction (waits up to BUSY_TIMEOUT_S for other writers)"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # Reads
+
+    def get(self, collection: str, name: str):
+        """Entry dict, or None if the collection has no entry with this name"""
+        row = self.conn.execute(
+            "SELECT data FROM entries WHERE collection = ? AND name = ?", (collection, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def entries(self, collection: str) -> list:
+        """All entries of a collection in manifest order"""
+        rows = self.conn.execute("SELECT data FROM entries WHERE collection = ? ORDER BY seq", (collection,))
+        return [json.loads(data) for (data,) in rows]
+
+    def meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def age_days(self, collection: str, name: str, now: datetime = None):
+        """Whole days since the entry's last_synced (None if not in the manifest or never synced)"""
+        entry = self.get(collection, name)
+        last_synced = parse_timestamp(entry.get("last_synced")) if entry else None
+        if last_synced is None:
+            return None
+        return ((now or datetime.now(timezone.utc)) - last_synced).days
+
+    def is_stale(self, collection: str, name: str, staleness_days: int, now: datetime = None) -> bool:
+        """Same rule as the sync scripts: never synced, or synced more than staleness_days ago"""
+        age = self.age_days(collection, name, now)
+        return age is None or age > staleness_days
+
+    # Writes
+
+    def upsert(self, collection: str, name: str, fields: dict, replace: bool = False, meta: dict = None) -> dict:
+        """
+        Merge fields into an entry (created at the end of the collection if new)
+
+        Args:
+            collection, name: Entry key
+            fields: Values to set; 'name' is always the key
+            replace: Drop fields not given instead of keeping them
+            meta: Top-level values to set in the same transaction (e.g. last_updated)
+
+        Returns:
+            The stored entry
+        """
+        return self.upsert_many(collection, {name: fields}, replace, meta)[name]
+
+    def upsert_many(self, collection: str, updates: dict, replace: bool = False, meta: dict = None) -> dict:
+        """upsert() for many entries of one collection in a single transaction; returns {name: entry}"""
+        stored = {}
+        with self._write():
+            self._ensure_collection(collection)
+            for name, fields in updates.items():
+                entry = {} if replace else (self.get(collection, name) or {})
+                entry = {"name": name, **{k: v for k, v in entry.items() if k != "name"}}
+                entry.update({k: v for k, v in fields.items() if k != "name"})
+                self.conn.execute(
+                    "INSERT INTO entries (collection, name, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT (collection, name) DO UPDATE SET data = excluded.data",
+                    (collection, name, json.dumps(entry))
+                )
+                stored[name] = entry
+            for key, value in (meta or {}).items():
+                self._set_meta(key, value)
+            self._export()
+        return stored
+
+    def delete(self, collection: str, name: str) -> bool:
+        """Remove an entry; False if it was not there"""
+        with self._write():
+            deleted = self.conn.execute(
+                "DELETE FROM entries WHERE collection = ? AND name = ?", (collection, name)
+            ).rowcount
+            if deleted:
+                self._export()
+        return bool(deleted)
+
+    def export_yaml(self):
+        """Rewrite MANIFEST.yaml from the database"""
+        with self._write():
+            self._export()
+
+    def import_yaml(self):
+        """Replace the database contents with MANIFEST.yaml"""
+        with self._write():
+            self._import()
+
+    def _ensure_collection(self, collection):
+        self.conn.execute("INSERT OR IGNORE INTO collections (name) VALUES (?)", (collection,))
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    def _state(self, key):
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _yaml_stamp(self):
+        """Identity of the YAML file on disk (mtime + size), '' if missing"""
+        try:
+            st = self.yaml_path.stat()
+        except FileNotFoundError:
+            return ""
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+    def _import_if_edited(self):
+        """Import MANIFEST.yaml if it changed since the store last wrote or read it"""
+        if yaml is None or self._yaml_stamp() == (self._state("yaml_stamp") or ""):
+            return
+        with self._write():
+            # Another process may have imported it while we waited for the lock
+            if self._yaml_stamp() != (self._state("yaml_stamp") or ""):
+                self._import()
+
+    def _import(self):
+        if yaml is None:
+            raise RuntimeError("PyYAML is required to import MANIFEST.yaml (pip install pyyaml)")
+        document = {}
+        if self.yaml_path.exists():
+            with open(self.yaml_path) as f:
+                document = _plain(yaml.safe_load(f) or {})
+
+        self.conn.execute("DELETE FROM entries")
+        self.conn.execute("DELETE FROM collections")
+        self.conn.execute("DELETE FROM meta")
+        for key, value in document.items():
+            if isinstance(value, list):
+                self._import_collection(key, value)
+            elif isinstance(value, dict) and all(isinstance(v, list) for v in value.values()):
+                for sub, items in value.items():
+                    self._import_collection(f"{key}.{sub}", items)
+            else:
+                self._set_meta(key, value)
+        self._record_stamp()
+
+    def _import_collection(self, collection, items):
+        self._ensure_collection(collection)
+        for item in items:
+            if not isinstance(item, dict) or not item.get("name"):
+                print(f"WARNING: {self.yaml_path}: skipping {collection} entry without a name: {item!r}",
+                      file=sys.stderr)
+                continue
+            self.conn.execute(
+                "INSERT INTO entries (collection, name, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, name) DO UPDATE SET data = excluded.data",
+                (collection, str(item["name"]), json.dumps(item))
+            )
+
+    def _export(self):
+        if yaml is None:
+            print(f"WARNING: PyYAML not installed, {self.yaml_path} not updated (pip install pyyaml)",
+                  file=sys.stderr)
+            return
+        document = {}
+        for (collection,) in self.conn.execute("SELECT name FROM collections ORDER BY seq").fetchall():
+            *parents, leaf = collection.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = self.entries(collection)
+        for key, value in self.conn.execute("SELECT key, value FROM meta ORDER BY seq"):
+            document.setdefault(key, json.loads(value))
+
+        fd, tmp_path = tempfile.mkstemp(prefix=self.yaml_path.name + ".", dir=self.yaml_path.parent)
+        try:
+            mode = self.yaml_path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.fchmod(fd, mode)  # mkstemp creates 0600
+        with os.fdopen(fd, 'w') as f:
+            yaml.safe_dump(document, f, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, self.yaml_path)
+        self._record_stamp()
+
+    def _record_stamp(self):
+        self.conn.execute(
+            "INSERT INTO state (key, value) VALUES ('yaml_stamp', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (self._yaml_stamp(),)
+        )
+
+
+def _parse_assignment(text: str):
+    """key=value from the command line; true/false become booleans"""
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    if value in ("true", "false"):
+        return key, value == "true"
+    return key, value
+
+
+def main():
+    """CLI entry point for the shell scripts"""
+    parser = argparse.ArgumentParser(prog="manifest_store.py", description="Query and update a MANIFEST.yaml")
+    parser.add_argument("manifest", type=Path, help="MANIFEST.yaml (the database sits next to it)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="Print an entry (JSON) or one field; exit 1 if missing")
+    get.add_argument("collection")
+    get.add_argument("name")
+    get.add_argument("field", nargs="?")
+
+    age = commands.add_parser("age", help="Print days since last_synced; exit 1 if never synced")
+    age.add_argument("collection")
+    age.add_argument("name")
+
+    put = commands.add_parser("set", help="Create or update an entry")
+    put.add_argument("collection")
+    put.add_argument("name")
+    put.add_argument("fields", nargs="*", type=_parse_assignment, metavar="KEY=VALUE")
+    put.add_argument("--replace", action="store_true", help="Drop fields that are not given")
+    put.add_argument("--meta", action="append", type=_parse_assignment, default=[], metavar="KEY=VALUE",
+                     help="Also set a top-level value (repeatable)")
+
+    delete = commands.add_parser("delete", help="Remove an entry")
+    delete.add_argument("collection")
+    delete.add_argument("name")
+
+    commands.add_parser("export", help="Rewrite MANIFEST.yaml from the database")
+    commands.add_parser("import", help="Reload the database from MANIFEST.yaml")
+    args = parser.parse_args()
+
+    with ManifestStore(args.manifest) as store:
+        if args.command == "get":
+            entry = store.get(args.collection, args.name)
+            if entry is None or (args.field and args.field not in entry):
+                sys.exit(1)
+            value = entry[args.field] if args.field else entry
+            print(value if isinstance(value, str) else json.dumps(value))
+        elif args.command == "age":
+            days = store.age_days(args.collection, args.name)
+            if days is None:
+                sys.exit(1)
+            print(days)
+        elif args.command == "set":
+            store.upsert(args.collection, args.name, dict(args.fields), args.replace, dict(args.meta))
+        elif args.command == "delete":
+            sys.exit(0 if store.delete(args.collection, args.name) else 1)
+        elif args.command == "export":
+            store.export_yaml()
+        elif args.command == "import":
+            store.import_yaml()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Tree snapshot and chunking for pattern analysis (steps 3 + 4.0-4.2 of the curator prompts)
+Streams `git ls-tree -z` once, classifies (docs vs code) and pre-filters in the same pass,
+then packs the filtered tree into directory-aware chunks balanced by estimated tokens
+"""
+
+import argparse
+import math
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Target ~100k tokens per agent (50% of 200k limit for safety), at most 10 agents
+TOKENS_PER_AGENT = 100_000
+MAX_AGENTS = 10
+# Tree lines are mostly hex SHAs and path fragments, which tokenize densely
+CHARS_PER_TOKEN = 3
+READ_BLOCK = 1 << 20
+
+# The patterns grep -E used, applied to the path only (they can't match the mode/type/sha columns)
+DOCS_RE = re.compile(r'(docs?/|documentation/|content/|\.mdx?$)')
+CODE_RE = re.compile(r'\.(js|ts|py|go|rs|java|c|cpp|h)$')
+# Docs pre-filter: remove build artifacts, node_modules, but keep docs
+DOCS_EXCLUDE_RE = re.compile(
+    r'(node_modules/|\.git/|dist/|build/|\.next/|\.docusaurus/|\.cache/|vendor/|__pycache__/|\.min\.|\.map$'
+    r'|\.woff|\.ttf|\.eot|package-lock\.json|yarn\.lock|pnpm-lock\.yaml)')
+# Code pre-filter: remove build artifacts, docs, media files
+CODE_EXCLUDE_RE = re.compile(
+    r'(node_modules/|\.git/|dist/|build/|\.next/|\.cache/|vendor/|__pycache__/|\.min\.|\.map$'
+    r'|\.png$|\.jpg$|\.svg$|\.ico$|\.woff|\.ttf|docs?/|documentation/|website/)')
+
+# Path bytes `git ls-tree` (without -z, core.quotePath=true) would C-quote
+_NEEDS_QUOTING = re.compile(rb'[\x00-\x1f"\\\x7f-\xff]')
+_C_ESCAPES = {7: 'a', 8: 'b', 9: 't', 10: 'n', 11: 'v', 12: 'f', 13: 'r', 34: '"', 92: '\\'}
+
+GREEN = '\033[0;32m'
+BLUE = '\033[0;34m'
+YELLOW = '\033[1;33m'
+NC = '\033[0m'
+RULE = "━" * 54
+
+
+def quote_path(raw: bytes) -> str:
+    """Path as `git ls-tree` prints it without -z, so the text snapshots keep their format"""
+    if not _NEEDS_QUOTING.search(raw):
+        return raw.decode('ascii')
+    out = []
+    for byte in raw:
+        if byte in _C_ESCAPES:
+            out.append('\\' + _C_ESCAPES[byte])
+        elif byte < 0x20 or byte >= 0x7f:
+            out.append(f'\\{byte:03o}')
+        else:
+            out.append(chr(byte))
+    return '"' + ''.join(out) + '"'
+
+
+def stream_tree(repo_path):
+    """
+    Yield (header, path) for every entry of HEAD, trees included, from one `git ls-tree -z` run
+
+    header is "<mode> <type> <sha>" and path is quoted as in the text output.
+    """
+    proc = subprocess.Popen(
+        ["git", "-C", str(repo_path), "ls-tree", "-r", "-t", "-z", "--full-tree", "HEAD"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    pending = b''
+    while True:
+        block = proc.stdout.read(READ_BLOCK)
+        if not block:
+            break
+        records = (pending + block).split(b'\0')
+        pending = records.pop()
+        for record in records:
+            header, _, path = record.partition(b'\t')
+            yield header.decode('ascii'), quote_path(path)
+
+    stderr = proc.stderr.read().decode(errors='replace').strip()
+    if proc.wait() != 0:
+        raise RuntimeError(stderr or f"git ls-tree exited with {proc.returncode}")
+
+
+def snapshot_and_filter(repo_path, tree_file: Path) -> dict:
+    """
+    Write the full tree snapshot while classifying and pre-filtering every entry
+
+    Both pre-filters are evaluated during the single pass because the repo
+    type is only known once every entry has been counted.
+
+    Returns:
+        Dict with total, docs_count, code_count and entries: a list of
+        (line, keep_if_docs, keep_if_code) in tree order
+    """
+    entries = []
+    docs_count = code_count = 0
+    with open(tree_file, 'w', encoding='utf-8', newline='\n') as out:
+        for header, path in stream_tree(repo_path):
+            line = f"{header}\t{path}"
+            out.write(line + "\n")
+            docs_count += DOCS_RE.search(path) is not None
+            code_count += CODE_RE.search(path) is not None
+            entries.append((line, DOCS_EXCLUDE_RE.search(path) is None, CODE_EXCLUDE_RE.search(path) is None))
+    return {"total": len(entries), "docs_count": docs_count, "code_count": code_count, "entries": entries}
+
+
+def estimate_tokens(line: str) -> int:
+    return math.ceil((len(line) + 1) / CHARS_PER_TOKEN)
+
+
+class DirNode:
+    """A directory of the filtered tree: its tree-order items and subtree token total"""
+    __slots__ = ("items", "tokens", "start", "end")
+
+    def __init__(self, start: int):
+        self.items = []   # entry indexes (int) and child DirNodes, in tree order
+        self.tokens = 0
+        self.start = start
+        self.end = start
+
+
+def build_dir_tree(lines: list, tokens: list) -> DirNode:
+    """
+    Group the filtered entries (in `git ls-tree -r -t` order) into directory nodes
+
+    A directory's own tree line is the first item of its node, so a whole
+    node always covers one contiguous range of lines.
+    """
+    root = DirNode(0)
+    nodes = {"": root}
+    created = [root]
+
+    def node_for(directory: str, index: int) -> DirNode:
+        # Directories whose tree line was filtered out still group their children
+        node = nodes.get(directory)
+        if node is None:
+            parent = node_for(directory.rpartition('/')[0], index)
+            node = nodes[directory] = DirNode(index)
+            parent.items.append(node)
+            created.append(node)
+        return node
+
+    for index, line in enumerate(lines):
+        header, _, path = line.partition('\t')
+        if header.split(' ', 2)[1] == 'tree':
+            parent = node_for(path.rpartition('/')[0], index)
+            node = nodes[path] = DirNode(index)
+            parent.items.append(node)
+            created.append(node)
+            node.items.append(index)
+        else:
+            node_for(path.rpartition('/')[0], index).items.append(index)
+
+    # Children are created after their parents: one reverse sweep sums every subtree
+    for node in reversed(created):
+        for item in node.items:
+            if isinstance(item, DirNode):
+                node.tokens += item.tokens
+                node.end = max(node.end, item.end)
+            else:
+                node.tokens += tokens[item]
+                node.end = max(node.end, item + 1)
+    return root
+
+
+def pack_chunks(root: DirNode, tokens: list, budget: int) -> list:
+    """
+    Cut the tree into contiguous (start, end) line ranges of at most ~budget tokens
+
+    Whole directories are kept together when they fit; a directory larger
+    than the budget is split at its children, recursively. Single entries
+    larger than the budget get a chunk of their own.
+    """
+    chunks = []
+    start = end = 0
+    used = 0
+    stack = [iter(root.items)]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        if isinstance(item, DirNode):
+            cost, item_start, item_end = item.tokens, item.start, item.end
+        else:
+            cost, item_start, item_end = tokens[item], item, item + 1
+        if not cost:
+            continue
+
+        if used + cost <= budget:
+            end, used = item_end, used + cost
+        elif isinstance(item, DirNode) and cost > budget:
+            stack.append(iter(item.items))
+        else:
+            if used:
+                chunks.append((start, end))
+            start, end, used = item_start, item_end, cost
+    if used:
+        chunks.append((start, end))
+    return chunks
+
+
+def plan_chunks(lines: list, tokens_per_agent: int = TOKENS_PER_AGENT, max_agents: int = MAX_AGENTS):
+    """
+    Directory-aware, token-balanced chunking capped at max_agents
+
+    Returns:
+        (chunks, tokens, budget): (start, end) line ranges, the per-line token
+        estimates and the token budget used
+    """
+    tokens = [estimate_tokens(line) for line in lines]
+    root = build_dir_tree(lines, tokens)
+    total = root.tokens
+    budget = max(tokens_per_agent, math.ceil(total / max_agents))
+    chunks = pack_chunks(root, tokens, budget)
+    # Keeping directories whole leaves some slack per chunk: widen the budget until the cap holds
+    while len(chunks) > max_agents:
+        budget = math.ceil(budget * 1.1)
+        chunks = pack_chunks(root, tokens, budget)
+    return chunks, tokens, budget
+
+
+def chunk_suffix(n: int) -> str:
+    """split(1)-style suffix: aa, ab, ..., zz"""
+    return chr(ord('a') + n // 26) + chr(ord('a') + n % 26)
+
+
+def prepare_analysis(repo_path: Path, snapshot_dir: Path) -> bool:
+    """
+    Generate github-api-tree.txt, filtered-tree.txt, analysis-metadata.txt and tree-chunk-*
+
+    Returns:
+        True if successful, False otherwise
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    (snapshot_dir / "pattern-analysis").mkdir(exist_ok=True)
+
+    print(RULE)
+    print("SNAPSHOT & CHUNKING PREPARATION")
+    print(f"Repository: {repo_path}")
+    print(f"Snapshot: {snapshot_dir}")
+    print(RULE)
+
+    # Step 3 + 4.0 in one pass
+    print("\nStep 3: Generating git tree snapshot (classifying and pre-filtering in the same pass)...")
+    print("-" * 87)
+    try:
+        scan = snapshot_and_filter(repo_path, snapshot_dir / "github-api-tree.txt")
+    except (OSError, RuntimeError) as e:
+        print(f"ERROR: Failed to generate git tree snapshot: {e}", file=sys.stderr)
+        return False
+
+    total = scan["total"]
+    print(f"{GREEN}✅ Generated tree snapshot: {total} entries{NC}")
+    if total == 0:
+        print("ERROR: Empty git tree - repository may be empty or HEAD not set", file=sys.stderr)
+        return False
+
+    repo_type = "docs" if scan["docs_count"] > scan["code_count"] else "code"
+    keep = 1 if repo_type == "docs" else 2
+    lines = [entry[0] for entry in scan["entries"] if entry[keep]]
+    del scan["entries"]
+
+    with open(snapshot_dir / "filtered-tree.txt", 'w', encoding='utf-8', newline='\n') as f:
+        f.writelines(line + "\n" for line in lines)
+
+    filtered = len(lines)
+    if filtered == 0:
+        print("ERROR: Filtered tree is empty - pre-filter may be too aggressive", file=sys.stderr)
+        print(f"Check {snapshot_dir / 'github-api-tree.txt'} for content", file=sys.stderr)
+        return False
+
+    reduction_pct = (total - filtered) * 100 // total
+    print(f"{GREEN}✅ Pre-filter complete:{NC}")
+    print(f"   Repository type: {BLUE}{repo_type}{NC} ({scan['docs_count']} docs / {scan['code_count']} code paths)")
+    print(f"   {total} → {filtered} entries ({reduction_pct}% reduction)")
+
+    # Step 4.1
+    print("\nStep 4.1: Calculating agent distribution...")
+    print("-" * 43)
+    chunks, tokens, budget = plan_chunks(lines)
+    chunk_tokens = [sum(tokens[start:end]) for start, end in chunks]
+    num_agents = len(chunks)
+    estimated_tokens = sum(tokens)
+    if budget > TOKENS_PER_AGENT:
+        print(f"{YELLOW}⚠️  Capping agents at {MAX_AGENTS} (large repository): ~{budget // 1000}k tokens per chunk{NC}")
+
+    print(f"{GREEN}✅ Distribution calculated:{NC}")
+    print(f"   Agents: {BLUE}{num_agents}{NC}")
+    print(f"   Estimated tokens: ~{estimated_tokens // 1000}k total, ~{max(chunk_tokens) // 1000}k in the largest chunk")
+
+    metadata = {
+        "total_entries": total,
+        "filtered_entries": filtered,
+        "reduction_pct": reduction_pct,
+        "repo_type": repo_type,
+        "num_agents": num_agents,
+        "entries_per_agent": max(end - start for start, end in chunks),
+        "estimated_tokens": estimated_tokens,
+        "tokens_per_agent": budget,
+        "generated_at": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
+    with open(snapshot_dir / "analysis-metadata.txt", 'w') as f:
+        f.writelines(f"{key}={value}\n" for key, value in metadata.items())
+
+    # Step 4.2
+    print("\nStep 4.2: Splitting tree into chunks for parallel analysis...")
+    print("-" * 61)
+    for old_chunk in snapshot_dir.glob("tree-chunk-*"):
+        old_chunk.unlink()
+
+    print(f"{GREEN}✅ Created {num_agents} chunks{NC}\n")
+    print("Chunks created:")
+    for n, ((start, end), chunk_total) in enumerate(zip(chunks, chunk_tokens)):
+        name = f"tree-chunk-{chunk_suffix(n)}"
+        with open(snapshot_dir / name, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(line + "\n" for line in lines[start:end])
+        first_path = lines[start].partition('\t')[2]
+        last_path = lines[end - 1].partition('\t')[2]
+        print(f"  - {name}: {end - start} entries, ~{chunk_total // 1000}k tokens ({first_path} … {last_path})")
+
+    print(f"\n{RULE}")
+    print(f"{GREEN}✅ SNAPSHOT & CHUNKING COMPLETE{NC}\n")
+    print("Summary:")
+    print(f"  - Total entries: {total}")
+    print(f"  - Filtered entries: {filtered} ({reduction_pct}% reduction)")
+    print(f"  - Repository type: {repo_type}")
+    print(f"  - Agents to launch: {num_agents}")
+    print(f"  - Chunks created: {num_agents}\n")
+    print("Next steps:")
+    print(f"  1. Launch {num_agents} pattern analysis agents in parallel")
+    print(f"  2. Each agent analyzes one chunk: {snapshot_dir}/tree-chunk-*")
+    print(f"  3. Agents save results to: {snapshot_dir}/pattern-analysis/")
+    print(RULE)
+    return True
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        prog="prepare_analysis.py",
+        description="Prepare repository snapshot and chunking for pattern analysis"
+    )
+    parser.add_argument("full_repo_path", help="Path to pristine full repository clone")
+    parser.add_argument("snapshot_dir", help="Directory to store analysis artifacts")
+    args = parser.parse_args()
+
+    repo_path = Path(args.full_repo_path)
+    if not repo_path.is_dir():
+        print(f"ERROR: Repository path does not exist: {repo_path}", file=sys.stderr)
+        sys.exit(1)
+    if not (repo_path / ".git").exists():
+        print(f"ERROR: Not a git repository: {repo_path}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.exit(0 if prepare_analysis(repo_path, Path(args.snapshot_dir)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Repository tree sources for curated-*-builder/tools/generate-manifest.sh
+Produces the GitHub API recursive-tree JSON from the pristine full-repo-sync clone when one
+exists (falling back to the API), and caches every tree by commit SHA under snapshots/
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import urllib.request
+from pathlib import Path
+
+API_ROOT = "https://api.github.com"
+SNAPSHOT_FILE = "github-api-tree.json"
+READ_BLOCK = 1 << 20
+_SHA_RE = re.compile(r'^[0-9a-f]{40}$')
+
+
+def gh_api(path):
+    """GET an API path through the gh CLI (authenticated), falling back to anonymous HTTPS"""
+    try:
+        r = subprocess.run(['gh', 'api', path], check=True, capture_output=True, text=True)
+        return json.loads(r.stdout)
+    except Exception:
+        with urllib.request.urlopen(API_ROOT + path) as resp:
+            return json.load(resp)
+
+
+def clone_dir_for(knowledge_root, owner, repo) -> Path:
+    """Where full-repo-sync/sync.sh keeps the pristine clone (<owner>-<repo>, lowercased)"""
+    return Path(knowledge_root) / "full-repo" / f"{owner}-{repo}".lower()
+
+
+class GitHubApiTreeSource:
+    """Trees and commits from the GitHub REST API (rate-limited; very large trees come back truncated)"""
+
+    name = "github-api"
+
+    def __init__(self, owner, repo):
+        self.owner = owner
+        self.repo = repo
+
+    def default_branch(self):
+        return gh_api(f"/repos/{self.owner}/{self.repo}").get('default_branch', 'main')
+
+    def resolve(self, branch):
+        return gh_api(f"/repos/{self.owner}/{self.repo}/commits/{branch}").get('sha')
+
+    def tree(self, commit):
+        return gh_api(f"/repos/{self.owner}/{self.repo}/git/trees/{commit}?recursive=1")
+
+
+class LocalCloneTreeSource:
+    """
+    The same tree JSON built from a local clone with one `git ls-tree -r -t --long -z` run
+
+    Branches are resolved by reading HEAD, loose refs and packed-refs
+    directly, so finding out that a cached snapshot is still current costs
+    no git process at all.
+    """
+
+    name = "local-clone"
+
+    def __init__(self, owner, repo, clone_dir):
+        self.owner = owner
+        self.repo = repo
+        self.clone_dir = Path(clone_dir)
+        self.git_dir = self.clone_dir / ".git"
+
+    def available(self) -> bool:
+        return (self.git_dir / "HEAD").is_file()
+
+    def _git(self, *args) -> str:
+        return subprocess.run(["git", "-C", str(self.clone_dir), *args],
+                              check=True, capture_output=True, text=True).stdout.strip()
+
+    def _read_ref(self, ref):
+        """SHA a ref points at (following symbolic refs), from the ref files; None if not found"""
+        for _ in range(5):  # symbolic ref depth
+            loose = self.git_dir / ref
+            if loose.is_file():
+                value = loose.read_text().strip()
+                if value.startswith("ref: "):
+                    ref = value[5:]
+                    continue
+                return value if _SHA_RE.match(value) else None
+            packed = self.git_dir / "packed-refs"
+            if packed.is_file():
+                with open(packed) as f:
+                    for line in f:
+                        sha, _, name = line.strip().partition(' ')
+                        if name == ref and _SHA_RE.match(sha):
+                            return sha
+            return None
+        return None
+
+    def default_branch(self):
+        head = (self.git_dir / "HEAD").read_text().strip()
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        return self._git("rev-parse", "--abbrev-ref", "origin/HEAD").partition('/')[2] or 'main'
+
+    def resolve(self, branch):
+        """Commit SHA for a branch (local, then origin's), tag or SHA; None if the clone lacks it"""
+        if _SHA_RE.match(branch):
+            return branch
+        for ref in (f"refs/heads/{branch}", f"refs/remotes/origin/{branch}", f"refs/tags/{branch}"):
+            sha = self._read_ref(ref)
+            if sha:
+                if ref.startswith("refs/tags/"):
+                    break  # may be an annotated tag: let git peel it
+                return sha
+        try:
+            return self._git("rev-parse", "--verify", "--quiet", f"{branch}^{{commit}}")
+        except subprocess.CalledProcessError:
+            return None
+
+    def _url(self, kind, sha):
+        return f"{API_ROOT}/repos/{self.owner}/{self.repo}/git/{kind}/{sha}"
+
+    def tree(self, commit):
+        """
+        Recursive tree of a commit in the GitHub API shape
+
+        Entries come in the API's order (each tree before its contents) with
+        path, mode, type, sha, size (blobs only) and url (blobs and trees).
+        """
+        root_sha = self._git("rev-parse", f"{commit}^{{tree}}")
+        proc = subprocess.Popen(
+            ["git", "-C", str(self.clone_dir), "ls-tree", "-r", "-t", "--long", "-z", "--full-tree", commit],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        entries = []
+        pending = b''
+        while True:
+            block = proc.stdout.read(READ_BLOCK)
+            if not block:
+                break
+            records = (pending + block).split(b'\0')
+            pending = records.pop()
+            for record in records:
+                header, _, path = record.partition(b'\t')
+                mode, kind, sha, size = header.decode('ascii').split()
+                entry = {"path": path.decode('utf-8', errors='surrogateescape'), "mode": mode, "type": kind, "sha": sha}
+                if kind == "blob":
+                    entry["size"] = int(size)
+                    entry["url"] = self._url("blobs", sha)
+                elif kind == "tree":
+                    entry["url"] = self._url("trees", sha)
+                entries.append(entry)
+
+        stderr = proc.stderr.read().decode(errors='replace').strip()
+        if proc.wait() != 0:
+            raise RuntimeError(stderr or f"git ls-tree exited with {proc.returncode}")
+        return {"sha": root_sha, "url": self._url("trees", root_sha), "tree": entries, "truncated": False}
+
+
+def load_tree(owner, repo, branch, snapshots_root, knowledge_root=None, source="auto"):
+    """
+    Recursive tree for owner/repo at branch, from the snapshot cache when the commit is unchanged
+
+    Args:
+        owner, repo: Repository on GitHub
+        branch: Branch, tag or commit ('' or None = default branch)
+        snapshots_root: Builder snapshots/ directory; trees are cached as
+                        <owner>-<repo>/<commit>/github-api-tree.json
+        knowledge_root: .knowledge directory holding full-repo/ clones (None = API only)
+        source: 'auto' (local clone if it has the branch, else API), 'local' or 'api'
+
+    Returns:
+        (tree, branch, commit, snapshot_path, origin): origin is 'snapshot'
+        or the name of the source the tree was built from
+    """
+    sources = []
+    if source in ("auto", "local") and knowledge_root:
+        local = LocalCloneTreeSource(owner, repo, clone_dir_for(knowledge_root, owner, repo))
+        if local.available():
+            sources.append(local)
+        elif source == "local":
+            raise SystemExit(f"No local clone at {local.clone_dir} (run full-repo-sync/sync.sh first)")
+    if source in ("auto", "api"):
+        sources.append(GitHubApiTreeSource(owner, repo))
+
+    for tree_source in sources:
+        resolved_branch = branch or tree_source.default_branch()
+        commit = tree_source.resolve(resolved_branch)
+        if not commit:
+            print(f"    {tree_source.name}: {resolved_branch} not found, trying next source", file=sys.stderr)
+            continue
+
+        snapshot_path = Path(snapshots_root) / f"{owner}-{repo}" / commit / SNAPSHOT_FILE
+        if snapshot_path.is_file():
+            with open(snapshot_path) as f:
+                return json.load(f), resolved_branch, commit, snapshot_path, "snapshot"
+
+        tree = tree_source.tree(commit)
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            # Write bytes as-is: no sorting, no pretty prints
+            f.write(json.dumps(tree))
+        os.replace(tmp_path, snapshot_path)
+        return tree, resolved_branch, commit, snapshot_path, tree_source.name
+
+    raise SystemExit(f"Cannot resolve {owner}/{repo} at {branch or 'default branch'}")